@@ -0,0 +1,5 @@
+"""
+Farmer problem, a two-stage stochastic program, and the methods that
+solve it. the methods are in their own subpackages like farmer.benders
+so importing this package does not import numpy or the solvers.
+"""
@@ -0,0 +1,5 @@
+"""
+LP/QP backends that models of all methods are built on.
+"""
+
+from .backend import Backend, Work, create
@@ -0,0 +1,201 @@
+"""
+Backend is a minimization model that is built and updated with arrays.
+Variables and constraints are referenced by their indices,
+constraints are given in blocks of sparse matrices so a block for
+all scenarios of a crop is added with a single call.
+"""
+
+import abc
+import dataclasses
+import typing
+
+import numpy as np
+import scipy.sparse as sparse
+
+Coefficients = typing.Union[np.ndarray, sparse.spmatrix, list]
+Term = typing.Tuple[np.ndarray, Coefficients]
+
+INFINITY = float("inf")
+
+
+@dataclasses.dataclass
+class Work:
+    """
+    Work is the effort of an engine, the number of optimize calls and
+    their iterations. active set QP iterations count as simplex ones.
+    """
+
+    calls: int = 0
+    simplex_iterations: int = 0
+    barrier_iterations: int = 0
+
+    def __add__(self, other: "Work") -> "Work":
+        return Work(
+            self.calls + other.calls,
+            self.simplex_iterations + other.simplex_iterations,
+            self.barrier_iterations + other.barrier_iterations,
+        )
+
+
+class Backend(abc.ABC):
+    """
+    Backend is the common interface of LP/QP engines.
+    work is updated by each optimize call.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self.variables = 0
+        self.constraints = 0
+        self.work = Work()
+
+    def add_variables(
+        self, count: int, lb=0.0, ub=INFINITY, obj=0.0, integer: bool = False
+    ) -> np.ndarray:
+        """
+        add_variables adds count continuous (or integer) variables and
+        returns their indices. bounds and objective coefficients are scalars
+        or arrays with count elements. a model with integer variables is
+        solved as a MIP and it has no duals.
+        """
+        indices = np.arange(self.variables, self.variables + count)
+        self.variables += count
+
+        self._add_variables(
+            count,
+            np.broadcast_to(np.asarray(lb, dtype=float), (count,)),
+            np.broadcast_to(np.asarray(ub, dtype=float), (count,)),
+            np.broadcast_to(np.asarray(obj, dtype=float), (count,)),
+            integer,
+        )
+
+        return indices
+
+    def add_constraints(
+        self, terms: typing.Sequence[Term], sense: str, rhs
+    ) -> np.ndarray:
+        """
+        add_constraints adds rows of sum(coefficients @ x[indices]) sense rhs
+        for the given (indices, coefficients) terms and returns their indices.
+        sense is one of "<", ">" or "=" and rhs is a scalar or an array.
+        """
+        blocks = [sparse.coo_matrix(coefficients) for _, coefficients in terms]
+        count = blocks[0].shape[0]
+
+        rows = []
+        columns = []
+        values = []
+        for (indices, _), block in zip(terms, blocks):
+            rows.append(block.row)
+            columns.append(np.asarray(indices)[block.col])
+            values.append(block.data)
+
+        matrix = sparse.csr_matrix(
+            (
+                np.concatenate(values).astype(float),
+                (np.concatenate(rows), np.concatenate(columns)),
+            ),
+            shape=(count, self.variables),
+        )
+
+        indices = np.arange(self.constraints, self.constraints + count)
+        self.constraints += count
+
+        self._add_constraints(
+            matrix,
+            sense,
+            np.broadcast_to(np.asarray(rhs, dtype=float), (count,)),
+        )
+
+        return indices
+
+    @abc.abstractmethod
+    def _add_variables(
+        self,
+        count: int,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        obj: np.ndarray,
+        integer: bool,
+    ):
+        pass
+
+    @abc.abstractmethod
+    def _add_constraints(
+        self, matrix: sparse.csr_matrix, sense: str, rhs: np.ndarray
+    ):
+        pass
+
+    @abc.abstractmethod
+    def remove_constraints(self, indices: np.ndarray):
+        """
+        remove_constraints removes the constraints from the model,
+        indices of the other constraints do not change.
+        """
+
+    @abc.abstractmethod
+    def set_objective(self, indices: np.ndarray, values):
+        """
+        set_objective changes linear objective coefficients of the variables.
+        """
+
+    @abc.abstractmethod
+    def set_objective_constant(self, value: float):
+        """
+        set_objective_constant changes the objective constant.
+        """
+
+    @abc.abstractmethod
+    def set_quadratic(self, indices: np.ndarray, values):
+        """
+        set_quadratic changes the objective to have values * x ** 2
+        for the given variables as its only quadratic terms.
+        """
+
+    @abc.abstractmethod
+    def set_rhs(self, indices: np.ndarray, values):
+        """
+        set_rhs changes right-hand sides of the constraints.
+        """
+
+    @abc.abstractmethod
+    def set_bounds(self, indices: np.ndarray, lb, ub):
+        """
+        set_bounds changes bounds of the variables.
+        """
+
+    @abc.abstractmethod
+    def optimize(self) -> float:
+        """
+        optimize solves the model from its previous solution if there is any
+        and returns the optimal objective value.
+        """
+
+    @abc.abstractmethod
+    def values(self, indices: np.ndarray) -> np.ndarray:
+        """
+        values returns the optimal values of the variables.
+        """
+
+    @abc.abstractmethod
+    def duals(self, indices: np.ndarray) -> np.ndarray:
+        """
+        duals returns the dual values of the constraints that are
+        the objective changes for a unit increase in their right-hand sides.
+        """
+
+
+def create(name: str, model: str = "") -> Backend:
+    """
+    create returns a new model of the given backend, engines are imported
+    here so only the selected one needs to be installed.
+    """
+    if name == "gurobi":
+        from .gurobi import Gurobi  # pylint: disable=import-outside-toplevel
+
+        return Gurobi(model)
+    if name == "highs":
+        from .highs import Highs  # pylint: disable=import-outside-toplevel
+
+        return Highs(model)
+    raise ValueError(f"unknown backend {name}")
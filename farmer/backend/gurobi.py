@@ -0,0 +1,117 @@
+"""
+Gurobi backend that uses the gurobipy matrix interface.
+"""
+
+import numpy as np
+import scipy.sparse as sparse
+from gurobipy import GRB, Model, QuadExpr, quicksum
+
+from .backend import Backend
+
+
+class Gurobi(Backend):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.model = Model(name)
+        self.vars: list = []
+        self.constrs: list = []
+
+    def _add_variables(
+        self,
+        count: int,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        obj: np.ndarray,
+        integer: bool,
+    ):
+        self.vars.extend(
+            self.model.addMVar(
+                count,
+                lb=lb,
+                ub=ub,
+                obj=obj,
+                vtype=GRB.INTEGER if integer else GRB.CONTINUOUS,
+            ).tolist()
+        )
+
+    def _add_constraints(
+        self, matrix: sparse.csr_matrix, sense: str, rhs: np.ndarray
+    ):
+        self.constrs.extend(
+            self.model.addMConstr(matrix, self.vars, sense, rhs).tolist()
+        )
+
+    def remove_constraints(self, indices: np.ndarray):
+        self.model.remove(self._select(self.constrs, indices))
+        for i in np.atleast_1d(indices):
+            self.constrs[i] = None
+
+    def _select(self, items: list, indices: np.ndarray) -> list:
+        return [items[i] for i in np.atleast_1d(indices)]
+
+    def set_objective(self, indices: np.ndarray, values):
+        variables = self._select(self.vars, indices)
+        self.model.setAttr(
+            "Obj", variables, np.broadcast_to(values, len(variables)).tolist()
+        )
+
+    def set_objective_constant(self, value: float):
+        self.model.ObjCon = value
+
+    def set_quadratic(self, indices: np.ndarray, values):
+        # gurobi can only replace the whole objective so linear
+        # coefficients are read and set again with the new quadratic terms.
+        self.model.update()
+        obj = self.model.getAttr("Obj", self.vars)
+        constant = self.model.ObjCon
+
+        variables = self._select(self.vars, indices)
+        values = np.broadcast_to(values, len(variables)).tolist()
+        self.model.setObjective(
+            QuadExpr(
+                quicksum(
+                    value * variable * variable
+                    for value, variable in zip(values, variables)
+                )
+            ),
+            GRB.MINIMIZE,
+        )
+        self.model.setAttr("Obj", self.vars, obj)
+        self.model.ObjCon = constant
+
+    def set_rhs(self, indices: np.ndarray, values):
+        constrs = self._select(self.constrs, indices)
+        self.model.setAttr(
+            "RHS", constrs, np.broadcast_to(values, len(constrs)).tolist()
+        )
+
+    def set_bounds(self, indices: np.ndarray, lb, ub):
+        variables = self._select(self.vars, indices)
+        self.model.setAttr(
+            "LB", variables, np.broadcast_to(lb, len(variables)).tolist()
+        )
+        self.model.setAttr(
+            "UB", variables, np.broadcast_to(ub, len(variables)).tolist()
+        )
+
+    def optimize(self) -> float:
+        self.model.optimize()
+        self.work.calls += 1
+        self.work.simplex_iterations += int(self.model.IterCount)
+        self.work.barrier_iterations += self.model.BarIterCount
+        if self.model.Status != GRB.OPTIMAL:
+            raise RuntimeError(
+                f"{self.name} is not solved to optimality, "
+                f"status {self.model.Status}"
+            )
+        return self.model.ObjVal
+
+    def values(self, indices: np.ndarray) -> np.ndarray:
+        return np.array(
+            self.model.getAttr("X", self._select(self.vars, indices))
+        )
+
+    def duals(self, indices: np.ndarray) -> np.ndarray:
+        return np.array(
+            self.model.getAttr("Pi", self._select(self.constrs, indices))
+        )
@@ -0,0 +1,203 @@
+"""
+HiGHS backend, an open-source LP/QP engine that needs no license.
+"""
+
+import typing
+
+import highspy
+import numpy as np
+import scipy.sparse as sparse
+
+from .backend import Backend
+
+EMPTY = np.array([], dtype=np.int32)
+
+
+def _indices(indices: np.ndarray) -> np.ndarray:
+    return np.atleast_1d(np.asarray(indices, dtype=np.int32))
+
+
+def _bounds(sense: np.ndarray, rhs: np.ndarray):
+    lower = np.where(sense == "<", -highspy.kHighsInf, rhs)
+    upper = np.where(sense == ">", highspy.kHighsInf, rhs)
+    return lower, upper
+
+
+class Highs(Backend):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.model = highspy.Highs()
+        self.model.setOptionValue("output_flag", False)
+
+        # constraints are referenced by their indices in the order of
+        # addition and rows maps them to their current row in highs.
+        self.rows = np.array([], dtype=np.int32)
+        self.senses = np.array([], dtype="<U1")
+        self.hessian = np.array([], dtype=float)
+        self.hessian_changed = False
+
+        # the active set qp solver starts from scratch on each run and
+        # takes thousands of iterations on proximal problems even with
+        # a few crops, so qp solves start from the last optimal solution
+        # and basis when the model still has their size.
+        self.model.setOptionValue("qp_allow_hot_start", True)
+        self.start: typing.Optional[
+            typing.Tuple[highspy.HighsSolution, highspy.HighsBasis]
+        ] = None
+
+    def _add_variables(
+        self,
+        count: int,
+        lb: np.ndarray,
+        ub: np.ndarray,
+        obj: np.ndarray,
+        integer: bool,
+    ):
+        start = self.model.getNumCol()
+        self.model.addCols(
+            count,
+            np.ascontiguousarray(obj),
+            np.ascontiguousarray(np.maximum(lb, -highspy.kHighsInf)),
+            np.ascontiguousarray(np.minimum(ub, highspy.kHighsInf)),
+            0,
+            EMPTY,
+            EMPTY,
+            np.array([], dtype=float),
+        )
+        if integer:
+            self.model.changeColsIntegrality(
+                count,
+                np.arange(start, start + count, dtype=np.int32),
+                np.full(count, highspy.HighsVarType.kInteger),
+            )
+        self.hessian = np.concatenate([self.hessian, np.zeros(count)])
+        self.hessian_changed = self.hessian_changed or self.hessian.any()
+
+    def _add_constraints(
+        self, matrix: sparse.csr_matrix, sense: str, rhs: np.ndarray
+    ):
+        senses = np.full(matrix.shape[0], sense)
+        self.senses = np.concatenate([self.senses, senses])
+        self.rows = np.concatenate(
+            [
+                self.rows,
+                np.arange(
+                    self.model.getNumRow(),
+                    self.model.getNumRow() + matrix.shape[0],
+                    dtype=np.int32,
+                ),
+            ]
+        )
+
+        lower, upper = _bounds(senses, rhs)
+        self.model.addRows(
+            matrix.shape[0],
+            lower,
+            upper,
+            matrix.nnz,
+            matrix.indptr[:-1].astype(np.int32),
+            matrix.indices.astype(np.int32),
+            matrix.data,
+        )
+
+    def remove_constraints(self, indices: np.ndarray):
+        indices = _indices(indices)
+        rows = np.sort(self.rows[indices])
+        self.model.deleteRows(len(rows), rows)
+
+        # later rows move up by the number of removed rows before them
+        self.rows -= np.searchsorted(rows, self.rows).astype(np.int32)
+        self.rows[indices] = -1
+
+    def set_objective(self, indices: np.ndarray, values):
+        indices = _indices(indices)
+        self.model.changeColsCost(
+            len(indices),
+            indices,
+            np.broadcast_to(
+                np.asarray(values, dtype=float), len(indices)
+            ).copy(),
+        )
+
+    def set_objective_constant(self, value: float):
+        self.model.changeObjectiveOffset(value)
+
+    def set_quadratic(self, indices: np.ndarray, values):
+        self.hessian[:] = 0
+        self.hessian[_indices(indices)] = values
+        self.hessian_changed = True
+
+    def set_rhs(self, indices: np.ndarray, values):
+        indices = _indices(indices)
+        lower, upper = _bounds(
+            self.senses[indices],
+            np.broadcast_to(np.asarray(values, dtype=float), len(indices)),
+        )
+        self.model.changeRowsBounds(
+            len(indices), self.rows[indices], lower, upper
+        )
+
+    def set_bounds(self, indices: np.ndarray, lb, ub):
+        indices = _indices(indices)
+        self.model.changeColsBounds(
+            len(indices),
+            indices,
+            np.broadcast_to(np.asarray(lb, dtype=float), len(indices)).copy(),
+            np.broadcast_to(np.asarray(ub, dtype=float), len(indices)).copy(),
+        )
+
+    def _pass_hessian(self):
+        # hessian of highs is lower triangular and the objective has
+        # its half so diagonal is stored twice as the quadratic terms.
+        columns = np.flatnonzero(self.hessian).astype(np.int32)
+        starts = np.searchsorted(columns, np.arange(len(self.hessian)))
+        self.model.passHessian(
+            len(self.hessian),
+            len(columns),
+            highspy.HessianFormat.kTriangular,
+            starts.astype(np.int32),
+            columns,
+            2 * self.hessian[columns],
+        )
+        self.hessian_changed = False
+
+    def _run(self) -> highspy.HighsModelStatus:
+        self.model.run()
+        info = self.model.getInfo()
+        self.work.simplex_iterations += max(
+            info.simplex_iteration_count, 0
+        ) + max(info.qp_iteration_count, 0)
+        self.work.barrier_iterations += max(info.ipm_iteration_count, 0)
+        return self.model.getModelStatus()
+
+    def optimize(self) -> float:
+        if self.hessian_changed:
+            self._pass_hessian()
+
+        if self.hessian.any() and self.start is not None:
+            solution, basis = self.start
+            if (
+                len(solution.col_value) == self.model.getNumCol()
+                and len(solution.row_value) == self.model.getNumRow()
+            ):
+                self.model.setSolution(solution)
+                self.model.setBasis(basis)
+
+        self.work.calls += 1
+        status = self._run()
+        if status != highspy.HighsModelStatus.kOptimal:
+            raise RuntimeError(
+                f"{self.name} is not solved to optimality, status {status}"
+            )
+
+        if self.hessian.any():
+            self.start = (self.model.getSolution(), self.model.getBasis())
+        return self.model.getInfo().objective_function_value
+
+    def values(self, indices: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.getSolution().col_value)[indices]
+
+    def duals(self, indices: np.ndarray) -> np.ndarray:
+        return np.asarray(self.model.getSolution().row_dual)[
+            self.rows[indices]
+        ]
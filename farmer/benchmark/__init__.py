@@ -0,0 +1,5 @@
+"""
+Benchmarks of the farmer solvers.
+"""
+
+from .benchmark import SOLVERS, Case, run, compare
@@ -0,0 +1,65 @@
+"""
+Runs the benchmarks, for example:
+
+    python -m farmer.benchmark --sizes 3 100 10000 --output results.json
+    python -m farmer.benchmark --sizes 3 100 --compare results.json
+    python -m farmer.benchmark --sizes 3 10 30 --solvers extensive pha --package 1
+"""
+
+import argparse
+
+from .benchmark import SOLVERS, Case, compare, read, run, write
+
+
+def report(case: Case):
+    print(
+        f"{case.solver:12} {case.size:8} {case.wall_time:10.3f}s "
+        f"{case.iterations:6} {case.peak_rss:10}KiB "
+        f"{case.z_star:14.3f} {case.difference:.2e} {case.error}",
+        flush=True,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument(
+        "--sizes",
+        type=int,
+        nargs="+",
+        default=[3, 100, 1000, 10 * 1000, 100 * 1000],
+    )
+    parser.add_argument(
+        "--solvers", nargs="+", choices=list(SOLVERS), default=list(SOLVERS)
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--backend", default="highs")
+    parser.add_argument("--package", type=float, default=0)
+    parser.add_argument("--output", default="")
+    parser.add_argument("--compare", default="")
+    args = parser.parse_args()
+
+    cases = run(
+        args.sizes,
+        args.solvers,
+        args.seed,
+        args.backend,
+        report,
+        args.package,
+    )
+
+    if args.output:
+        write(args.output, cases)
+
+    if args.compare:
+        for row in compare(read(args.compare), cases):
+            print(
+                f"{row['solver']:12} {row['size']:8} "
+                f"time x{row['wall_time']:.2f} "
+                f"memory x{row['peak_rss']:.2f} "
+                f"iterations {row['iterations']:+d} "
+                f"value {row['z_star']:.2e}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+"""
+Benchmark runs the solvers on sampled farmer instances with fixed seeds.
+Each case runs in a new process so its peak memory is its own and
+the results are written as JSON to be compared between commits.
+"""
+
+import concurrent.futures
+import dataclasses
+import json
+import math
+import multiprocessing
+import platform
+import resource
+import subprocess
+import sys
+import time
+import typing
+
+import numpy as np
+
+from farmer.config import Config
+from farmer.saa import NormalYields
+from farmer.solver import Solver
+
+from farmer.benders import Benders
+from farmer.extensive import Extensive
+from farmer.lagrange import Lagrange, Parameters as LagrangeParameters
+from farmer.pha import PHA, Parameters as PHAParameters
+
+
+def _lagrange(cfg: Config, backend: str) -> Solver:
+    return Lagrange(
+        cfg,
+        LagrangeParameters(float("-inf"), 0, 4, 1000),
+        recourse="parametric",
+        backend=backend,
+        strategy="level",
+    )
+
+
+def _pha(cfg: Config, backend: str) -> Solver:
+    # integer base problems only agree when rou grows without a bound
+    if cfg.integer:
+        return PHA(
+            cfg,
+            PHAParameters(0.01, lambda rou: 1.1 * rou, 200),
+            backend=backend,
+        )
+    return PHA(
+        cfg,
+        PHAParameters(0.01, lambda rou: min(1.1 * rou, 100)),
+        backend=backend,
+    )
+
+
+# solver factories with the largest number of scenarios they can solve
+# in a reasonable time on one core.
+SOLVERS: typing.Dict[
+    str, typing.Tuple[typing.Callable[[Config, str], Solver], int]
+] = {
+    "extensive": (
+        lambda cfg, backend: Extensive(cfg, backend=backend),
+        10 * 1000,
+    ),
+    "benders": (
+        lambda cfg, backend: Benders(
+            cfg, groups=10, recourse="oracle", backend=backend
+        ),
+        100 * 1000,
+    ),
+    "benders-lp": (
+        lambda cfg, backend: Benders(cfg, groups=10, backend=backend),
+        10 * 1000,
+    ),
+    "lagrange": (_lagrange, 100 * 1000),
+    "pha": (_pha, 100),
+}
+
+
+@dataclasses.dataclass
+class Case:
+    """
+    Case is the result of a solver on an instance, times are in seconds,
+    solver calls and iterations are the work of its LP/QP engine
+    and peak_rss is the peak resident memory of its process in KiB.
+    package is the trade package size of integer recourse instances.
+    error is set instead of the solution when the solver fails.
+    """
+
+    solver: str
+    size: int
+    seed: int
+    backend: str
+    package: float = 0
+    wall_time: float = math.nan
+    build_time: float = math.nan
+    solve_time: float = math.nan
+    iterations: int = 0
+    solver_calls: int = 0
+    simplex_iterations: int = 0
+    barrier_iterations: int = 0
+    peak_rss: int = 0
+    z_star: float = math.nan
+    x: typing.Tuple[float, ...] = ()
+    difference: float = math.nan
+    error: str = ""
+
+
+def instance(size: int, seed: int, package: float = 0) -> Config:
+    """
+    instance returns the farmer problem with size scenarios
+    that are sampled with the given seed.
+    """
+    return Config(
+        scenarios=NormalYields().sample(size, np.random.default_rng(seed)),
+        package=package,
+    )
+
+
+def _run(
+    solver: str, size: int, seed: int, backend: str, package: float
+) -> Case:
+    case = Case(solver, size, seed, backend, package)
+    cfg = instance(size, seed, package)
+
+    start = time.perf_counter()
+    try:
+        method = SOLVERS[solver][0](cfg, backend)
+        result = method.solve()
+    except Exception as error:  # pylint: disable=broad-except
+        case.error = f"{type(error).__name__}: {error}"
+        return case
+    case.wall_time = time.perf_counter() - start
+
+    case.iterations = len(method.recorder)
+    case.build_time = method.profile.times.get("build", 0.0)
+    case.solve_time = case.wall_time - case.build_time
+    case.solver_calls = method.profile.work.calls
+    case.simplex_iterations = method.profile.work.simplex_iterations
+    case.barrier_iterations = method.profile.work.barrier_iterations
+    case.peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    case.z_star = result.z_star
+    case.x = result.x
+
+    return case
+
+
+def run(
+    sizes: typing.Sequence[int],
+    solvers: typing.Sequence[str],
+    seed: int = 0,
+    backend: str = "highs",
+    callback: typing.Optional[typing.Callable[[Case], None]] = None,
+    package: float = 0,
+) -> typing.List[Case]:
+    """
+    run solves each instance with the solvers that can handle its size,
+    difference is the relative difference of the optimal value from the
+    first solver of the instance. callback is called with each case
+    when it is done. instances have integer recourse when package
+    is positive.
+    """
+    cases = []
+    for size in sizes:
+        reference = math.nan
+        for solver in solvers:
+            if size > SOLVERS[solver][1]:
+                continue
+
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                case = executor.submit(
+                    _run, solver, size, seed, backend, package
+                )
+                case = case.result()
+
+            if math.isnan(reference):
+                reference = case.z_star
+            case.difference = abs(case.z_star - reference) / max(
+                abs(reference), 1
+            )
+            cases.append(case)
+            if callback is not None:
+                callback(case)
+
+    return cases
+
+
+def _commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"],
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ""
+
+
+def write(path: str, cases: typing.List[Case]):
+    """
+    write writes the cases with the commit and platform they ran on.
+    """
+    with open(path, "w") as file:
+        json.dump(
+            {
+                "commit": _commit(),
+                "python": sys.version,
+                "platform": platform.platform(),
+                "cases": [dataclasses.asdict(case) for case in cases],
+            },
+            file,
+            indent=2,
+        )
+
+
+def read(path: str) -> typing.List[Case]:
+    with open(path) as file:
+        return [
+            Case(**{**case, "x": tuple(case["x"])})
+            for case in json.load(file)["cases"]
+        ]
+
+
+def compare(
+    old: typing.List[Case], new: typing.List[Case]
+) -> typing.List[typing.Dict[str, typing.Any]]:
+    """
+    compare matches the cases of two runs and returns
+    their time ratios and optimal value differences.
+    """
+
+    def key(case: Case) -> typing.Tuple:
+        return (case.solver, case.size, case.seed, case.backend, case.package)
+
+    previous = {key(case): case for case in old}
+    rows = []
+    for case in new:
+        before = previous.get(key(case))
+        if before is None:
+            continue
+        rows.append(
+            {
+                "solver": case.solver,
+                "size": case.size,
+                "wall_time": case.wall_time / before.wall_time,
+                "peak_rss": case.peak_rss / max(before.peak_rss, 1),
+                "iterations": case.iterations - before.iterations,
+                "z_star": abs(case.z_star - before.z_star)
+                / max(abs(before.z_star), 1),
+            }
+        )
+    return rows
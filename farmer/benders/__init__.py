@@ -1 +1,2 @@
 from .benders import Benders
+from .cut_store import CutStore
@@ -1,61 +1,231 @@
+import functools
 import math
+import time
 import typing
 
-from config import Config
-from solver import Solver, Result
-from .sub_problem import SubProblem
+import numpy as np
+
+from farmer.config import Config
+from farmer.backend import Work
+from farmer.solver import Solver, Result, Recorder, Profile, crop_columns
+from farmer.solver.pool import ShardPool, split
+from farmer.recourse import Recourse
+from .sub_problem import SubProblem, CheckedSubProblem
 from .master_problem import MasterProblem
+from .cut_store import CutStore
+
+# fraction of the predicted decrease that makes a serious step and
+# the number of worse iterates that shrink the trust region
+SERIOUS_STEP = 0.1
+NULL_STEPS = 3
+
+RECOURSES = {
+    "lp": SubProblem,
+    "check": CheckedSubProblem,
+}
 
 
 class Benders(Solver):
-    def __init__(self, cfg: Config, epsilon: float = 0.01):
+    """
+    L-shaped method. scenarios are divided into groups and each group
+    has its own sub problem and its own cut in each iteration,
+    one group is the classic single cut and one group per scenario
+    is the multi-cut version. sub problems are solved in the given
+    number of worker processes or in the current one when it is zero.
+    recourse selects how sub problems are solved, "lp" solves them
+    with the LP backend, "oracle" uses the closed form recourse and "check"
+    uses both and fails when they are different.
+    backend is the name of the LP engine, "gurobi" or "highs".
+    max_age is the number of master solves that a cut can be inactive
+    before it is retired from the master problem, cuts are never retired
+    when it is None.
+    trust_region is the initial radius of the box around the best solution
+    that the next iterate is chosen in, it is plain cutting planes
+    when it is None.
+    cuts of the runs with the same recourse and groups are loaded from
+    and saved into the given cut_store so a run that only changes
+    plant costs or the area starts with the cuts of the previous ones.
+    the method stops when the lower bound is epsilon close to the best
+    upper bound, when their relative gap is at most gap or after
+    time_limit seconds and returns the best solution.
+    iterations are recorded with the given recorder or
+    with a new one that keeps all of them.
+    the build, master, sub_problems and cuts phases are timed
+    with the given profile or a new one that is attached to the result.
+    cuts are only valid for a convex recourse so integer recourse
+    is rejected, its continuous relaxation has package zero.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        epsilon: float = 0.01,
+        groups: int = 1,
+        workers: int = 0,
+        recourse: str = "lp",
+        backend: str = "gurobi",
+        max_age: typing.Optional[int] = None,
+        trust_region: typing.Optional[float] = None,
+        gap: typing.Optional[float] = None,
+        time_limit: typing.Optional[float] = None,
+        cut_store: typing.Optional[CutStore] = None,
+        recorder: typing.Optional[Recorder] = None,
+        profile: typing.Optional[Profile] = None,
+    ):
+        if cfg.integer:
+            raise ValueError("benders does not support integer recourse")
+
         self.cfg = cfg
         self.epsilon = epsilon
-        self.iterations: typing.Dict[str, typing.List[float]] = {
-            "k": [],
-            "x_1": [],
-            "x_2": [],
-            "x_3": [],
-            "z_lb": [],
-            "z_ub": [],
-            "pi_1": [],
-            "pi_2": [],
-            "pi_3": [],
-        }
+        self.groups = groups
+        self.workers = workers
+        self.recourse = recourse
+        self.backend = backend
+        self.max_age = max_age
+        self.trust_region = trust_region
+        self.gap = gap
+        self.time_limit = time_limit
+        self.cut_store = cut_store
+        self.recorder = recorder if recorder is not None else Recorder()
+        self.profile = profile if profile is not None else Profile()
+
+    def build(self) -> typing.Tuple[MasterProblem, ShardPool]:
+        """
+        build returns the master problem and the pool of sub problems.
+        """
+        groups = split(range(len(self.cfg.scenarios)), self.groups)
+        master_problem = MasterProblem(
+            self.cfg, len(groups), self.backend, self.max_age
+        )
+        if self.cut_store is not None:
+            for lhs, pi, group in self.cut_store.load(self.cfg, len(groups)):
+                master_problem.add_cut(lhs, pi, group)
+
+        if self.recourse == "oracle":
+            factory = functools.partial(Recourse, self.cfg)
+        else:
+            factory = functools.partial(
+                RECOURSES[self.recourse], self.cfg, backend=self.backend
+            )
+
+        return master_problem, ShardPool(factory, groups, self.workers)
 
     def solve(self) -> Result:
-        master_problem = MasterProblem(self.cfg)
+        begin = time.perf_counter()
+        with self.profile.phase("build"):
+            master_problem, sub_problems = self.build()
+
+        with sub_problems:
+            return self.iterate(
+                master_problem, sub_problems, time.perf_counter() - begin
+            )
+
+    def iterate(
+        self,
+        master_problem: MasterProblem,
+        sub_problems: ShardPool,
+        build_time: float = 0.0,
+    ) -> Result:
+        """
+        iterate runs the benders iterations with the built problems.
+        the master problem keeps its cuts so problems can be reused for
+        another configuration with the same recourse, its costs and area
+        are set with master_problem.update.
+        """
+        begin = time.perf_counter()
+        plant_cost = self.cfg.crop_arrays().plant_cost
+
         k = 0
+        best = Result(math.inf, np.zeros(len(plant_cost)))
+        radius = self.trust_region
+        null_steps = 0
 
         while True:
             k += 1
-            self.iterations["k"].append(k)
-
-            z_lb, x_1, x_2, x_3 = master_problem.solve()
 
-            self.iterations["x_1"].append(x_1)
-            self.iterations["x_2"].append(x_2)
-            self.iterations["x_3"].append(x_3)
-            self.iterations["z_lb"].append(z_lb)
+            # master problem without the trust region gives
+            # the lower bound and the first iterate.
+            with self.profile.phase("master"):
+                z_lb, x = master_problem.solve()
+                z_model = z_lb
+                if radius is not None and k > 1:
+                    master_problem.set_trust_region(best.x, radius)
+                    z_model, x = master_problem.solve()
+                    master_problem.set_trust_region(None)
 
-            z_star, pi_1, pi_2, pi_3 = SubProblem(self.cfg).solve(
-                x_1, x_2, x_3
-            )
-            z_ub = (
-                z_star
-                + self.cfg.wheat.plant_cost * x_1
-                + self.cfg.corn.plant_cost * x_2
-                + self.cfg.beet.plant_cost * x_3
+            row = {"k": k}
+            row.update(crop_columns("x", x))
+            row.update(
+                {
+                    "z_lb": z_lb,
+                    "cuts": master_problem.cuts,
+                    "retired": master_problem.retired,
+                    "master_time": master_problem.solve_time,
+                    "radius": radius,
+                }
             )
 
-            self.iterations["pi_1"].append(pi_1)
-            self.iterations["pi_2"].append(pi_2)
-            self.iterations["pi_3"].append(pi_3)
-            self.iterations["z_ub"].append(z_ub)
+            start = time.perf_counter()
+            with self.profile.phase("sub_problems"):
+                solutions = sub_problems.broadcast("solve", x)
+            solve_time = time.perf_counter() - start
 
-            if math.isclose(z_lb, z_ub, abs_tol=self.epsilon):
-                return Result(z_ub, x_1, x_2, x_3)
+            z_star = sum(z_s for z_s, _ in solutions)
+            z_ub = z_star + plant_cost @ x
 
-            master_problem.add_cut(
-                z_star - pi_1 * x_1 - pi_2 * x_2 - pi_3 * x_3, pi_1, pi_2, pi_3
-            )
+            if radius is not None and k > 1:
+                # serious step when the iterate achieves enough of
+                # the decrease that the model predicts, the region
+                # grows when the step reaches its boundary and shrinks
+                # when iterates keep getting worse than the incumbent.
+                step = np.abs(x - best.x).max()
+                if best.z_star - z_ub >= SERIOUS_STEP * (
+                    best.z_star - z_model
+                ):
+                    null_steps = 0
+                    if step >= radius * (1 - 1e-6):
+                        radius = min(2 * radius, self.cfg.area)
+                elif z_ub > best.z_star:
+                    null_steps += 1
+                    if null_steps == NULL_STEPS:
+                        radius = radius / 2
+                        null_steps = 0
+
+            if z_ub < best.z_star:
+                best = Result(z_ub, x)
+
+            gap = (best.z_star - z_lb) / max(abs(best.z_star), 1)
+
+            row.update(crop_columns("pi", sum(pi for _, pi in solutions)))
+            row["z_ub"] = z_ub
+            row["gap"] = gap
+            row["build_time"] = build_time
+            row["solve_time"] = solve_time
+            self.recorder.record(row)
+
+            # sub problems are built only once, later iterations
+            # just update their right-hand sides.
+            build_time = 0.0
+
+            if (
+                math.isclose(z_lb, best.z_star, abs_tol=self.epsilon)
+                or (self.gap is not None and gap <= self.gap)
+                or (
+                    self.time_limit is not None
+                    and time.perf_counter() - begin >= self.time_limit
+                )
+            ):
+                self.profile.bounds(z_lb, best.z_star)
+                self.profile.work = master_problem.model.work + sum(
+                    sub_problems.broadcast("work"), Work()
+                )
+                best.profile = self.profile
+                if self.cut_store is not None:
+                    self.cut_store.save(
+                        self.cfg, len(master_problem.phi), master_problem.pool
+                    )
+                return best
+
+            with self.profile.phase("cuts"):
+                for group, (z_s, pi) in enumerate(solutions):
+                    master_problem.add_cut(z_s - pi @ x, pi, group)
@@ -0,0 +1,92 @@
+"""
+Pool of the benders optimality cuts phi[group] >= lhs + pi @ x.
+first stage solutions are in {x >= 0, sum(x) <= area} so a cut
+dominates another one when its difference from it is non-negative
+on the vertices of this set, that are zero and area on each axis.
+"""
+
+import numpy as np
+
+
+class CutPool:
+    """
+    CutPool keeps the cuts with their master problem constraint index
+    (row) that is -1 for a retired cut and how many consecutive
+    iterations each of them has been inactive (age).
+    """
+
+    def __init__(self, area: float, crops: int, tolerance: float = 1e-6):
+        self.area = area
+        self.tolerance = tolerance
+
+        self.lhs = np.empty(0)
+        self.pi = np.empty((0, crops))
+        self.group = np.empty(0, dtype=int)
+        self.row = np.empty(0, dtype=int)
+        self.age = np.empty(0, dtype=int)
+        self.slack = np.empty(0)
+
+    def __len__(self) -> int:
+        return len(self.lhs)
+
+    def _margin(self, lhs, pi, other_lhs, other_pi) -> np.ndarray:
+        # the least value of cut - other on the first stage set
+        difference = pi - other_pi
+        return (
+            lhs
+            - other_lhs
+            + self.area * np.minimum(difference.min(axis=-1), 0)
+        )
+
+    def dominated(self, lhs: float, pi: np.ndarray, group: int) -> bool:
+        """
+        dominated returns true when a cut of the group is at least
+        the given cut on all first stage solutions,
+        that includes the duplicates of it.
+        """
+        same = self.group == group
+        margin = self._margin(self.lhs[same], self.pi[same], lhs, pi)
+        return bool((margin >= -self.tolerance * (1 + abs(lhs))).any())
+
+    def dominates(self, lhs: float, pi: np.ndarray, group: int) -> np.ndarray:
+        """
+        dominates returns the mask of the cuts that the given cut
+        dominates them.
+        """
+        margin = self._margin(lhs, pi, self.lhs, self.pi)
+        return (self.group == group) & (
+            margin >= -self.tolerance * (1 + np.abs(self.lhs))
+        )
+
+    def add(self, lhs: float, pi: np.ndarray, group: int, row: int):
+        self.lhs = np.append(self.lhs, lhs)
+        self.pi = np.vstack([self.pi, pi])
+        self.group = np.append(self.group, group)
+        self.row = np.append(self.row, row)
+        self.age = np.append(self.age, 0)
+        self.slack = np.append(self.slack, 0.0)
+
+    def drop(self, mask: np.ndarray):
+        """
+        drop removes the cuts from the pool.
+        """
+        keep = ~mask
+        self.lhs = self.lhs[keep]
+        self.pi = self.pi[keep]
+        self.group = self.group[keep]
+        self.row = self.row[keep]
+        self.age = self.age[keep]
+        self.slack = self.slack[keep]
+
+    def update(self, x: np.ndarray, phi: np.ndarray) -> np.ndarray:
+        """
+        update computes the cuts slacks on the given master solution
+        and ages the inactive ones. it returns the mask of the violated cuts.
+        """
+        self.slack = phi[self.group] - self.lhs - self.pi @ x
+        tolerance = self.tolerance * (1 + np.abs(phi[self.group]))
+
+        active = self.slack <= tolerance
+        self.age = np.where(active, 0, self.age + 1)
+
+        return self.slack < -tolerance
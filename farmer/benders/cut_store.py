@@ -0,0 +1,56 @@
+"""
+Store of benders cuts on disk. cuts only depend on the recourse so the
+cuts of a run stay valid for another run with different plant costs or
+area, they are kept in a file for each recourse digest and number of
+groups and are loaded into the master problem of the next run.
+"""
+
+import os
+import typing
+
+import numpy as np
+
+from farmer.config import Config
+
+from .cut_pool import CutPool
+
+Cut = typing.Tuple[float, np.ndarray, int]
+
+
+class CutStore:
+    """
+    CutStore keeps the cut pools of the runs in the given directory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, cfg: Config, groups: int) -> str:
+        return os.path.join(
+            self.directory, f"{cfg.recourse_digest()}-{groups}.npz"
+        )
+
+    def load(self, cfg: Config, groups: int) -> typing.List[Cut]:
+        """
+        load returns the stored cuts of the configuration recourse,
+        it is empty when there is no stored cut or the file is damaged.
+        """
+        try:
+            with np.load(self.path(cfg, groups)) as data:
+                return list(zip(data["lhs"], data["pi"], data["group"]))
+        except (OSError, ValueError, KeyError):
+            return []
+
+    def save(self, cfg: Config, groups: int, pool: CutPool):
+        """
+        save replaces the stored cuts of the configuration recourse
+        with the cuts of the pool, retired ones included.
+        the file is written next to its place and then moved
+        so readers never see a partial one.
+        """
+        path = self.path(cfg, groups)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez(file, lhs=pool.lhs, pi=pool.pi, group=pool.group)
+        os.replace(temporary, path)
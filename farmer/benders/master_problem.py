@@ -1,59 +1,164 @@
-from config import Config
-from gurobipy import GRB, Model, LinExpr
+import time
+import typing
+
+import numpy as np
+
+from farmer.backend import create
+from farmer.config import Config
+
+from .cut_pool import CutPool
 
 
 class MasterProblem:
     """
     Benders's master problem.
     In each iteration a new cut will be added into this.
+    There is one recourse variable (phi) for each group of scenarios
+    so having more than one group gives the multi-cut version.
+    Cuts are kept in a pool, duplicate and dominated cuts are rejected and
+    when max_age is given a cut that has been inactive for max_age solves
+    is retired from the model until it is violated again.
     """
 
-    def __init__(self, cfg: Config):
-        self.model = Model("benders_master_porblem")
+    def __init__(
+        self,
+        cfg: Config,
+        groups: int = 1,
+        backend: str = "gurobi",
+        max_age: typing.Optional[int] = None,
+    ):
+        self.model = create(backend, "benders_master_porblem")
         self.cfg = cfg
+        self.max_age = max_age
+        crops = cfg.crop_arrays()
+        self.pool = CutPool(cfg.area, len(crops))
 
-        self.x_1 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_1")
-        self.x_2 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_2")
-        self.x_3 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_3")
+        # statistics of the last solve
+        self.solve_time = 0.0
+        self.resolves = 0
 
-        self.phi = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=-100 * 100 * 100, name="phi"
-        )
+        self.x = self.model.add_variables(len(crops), obj=crops.plant_cost)
 
-        self.model.addConstr(
-            self.x_1 + self.x_2 + self.x_3 <= cfg.area, name="area_constraint"
+        self.phi = self.model.add_variables(groups, lb=-100 * 100 * 100, obj=1)
+
+        self.area = self.model.add_constraints(
+            [(self.x, np.ones((1, len(crops))))], "<", cfg.area
         )
 
-        self.model.setObjective(
-            self.x_1 * cfg.wheat.plant_cost
-            + self.x_2 * cfg.corn.plant_cost
-            + self.x_3 * cfg.beet.plant_cost
-            + self.phi,
-            GRB.MINIMIZE,
+    def update(self, cfg: Config):
+        """
+        update changes the plant costs and the area to the given ones,
+        cuts stay valid as long as the recourse does not change.
+        """
+        self.cfg = cfg
+        self.pool.area = cfg.area
+
+        self.model.set_objective(self.x, cfg.crop_arrays().plant_cost)
+        self.model.set_rhs(self.area, cfg.area)
+        self.set_trust_region(None)
+
+    def _add_row(self, lhs, pi: np.ndarray, group: int) -> int:
+        return int(
+            self.model.add_constraints(
+                [
+                    (self.phi[[group]], np.ones((1, 1))),
+                    (self.x, -pi[np.newaxis, :]),
+                ],
+                ">",
+                lhs,
+            )[0]
         )
 
-    def add_cut(self, lhs, pi_1, pi_2, pi_3):
+    def add_cut(self, lhs: float, pi: np.ndarray, group: int = 0) -> bool:
         """
         add_cut adds new cuts to master problem based
         on given dual values and constant.
         these parameters come from the sub problem
         optimal solution in each benders iteration.
+        it returns false when the cut is rejected because
+        the pool has a cut that dominates it.
+        """
+        pi = np.asarray(pi, dtype=float)
+        if self.pool.dominated(lhs, pi, group):
+            return False
+
+        dominated = self.pool.dominates(lhs, pi, group)
+        rows = self.pool.row[dominated]
+        if (rows >= 0).any():
+            self.model.remove_constraints(rows[rows >= 0])
+        self.pool.drop(dominated)
+
+        self.pool.add(lhs, pi, group, self._add_row(lhs, pi, group))
+        return True
+
+    def set_trust_region(
+        self,
+        center: typing.Optional[typing.Sequence[float]],
+        radius: float = 0.0,
+    ):
         """
-        self.model.addConstr(
-            lhs
-            <= self.phi - self.x_1 * pi_1 - self.x_2 * pi_2 - self.x_3 * pi_3,
-            name="cut",
+        set_trust_region bounds x to the box with the given center and
+        radius, the box is removed when center is None.
+        """
+        if center is None:
+            self.model.set_bounds(self.x, 0, self.cfg.area)
+            return
+
+        center = np.asarray(center, dtype=float)
+        self.model.set_bounds(
+            self.x,
+            np.maximum(center - radius, 0),
+            np.minimum(center + radius, self.cfg.area),
         )
 
+    @property
+    def cuts(self) -> int:
+        """
+        cuts is the number of cuts in the model.
+        """
+        return int((self.pool.row >= 0).sum())
+
+    @property
+    def retired(self) -> int:
+        """
+        retired is the number of cuts in the pool that are not in the model.
+        """
+        return int((self.pool.row < 0).sum())
+
     def solve(self):
         """
-        solve solves master problem and returns the optimal solution
+        solve solves master problem and returns the optimal value
+        and solution.
+        retired cuts that the solution violates are added back and
+        the master problem is solved again until none is violated.
         """
-        self.model.optimize()
+        start = time.perf_counter()
+        self.resolves = 0
 
-        return (
-            self.model.objVal,
-            self.x_1.x,
-            self.x_2.x,
-            self.x_3.x,
-        )
+        while True:
+            objective = self.model.optimize()
+            x = self.model.values(self.x)
+            violated = self.pool.update(x, self.model.values(self.phi))
+
+            retired = violated & (self.pool.row < 0)
+            if not retired.any():
+                break
+
+            for index in np.flatnonzero(retired):
+                self.pool.row[index] = self._add_row(
+                    self.pool.lhs[index],
+                    self.pool.pi[index],
+                    self.pool.group[index],
+                )
+                self.pool.age[index] = 0
+            self.resolves += 1
+
+        if self.max_age is not None:
+            aged = (self.pool.age >= self.max_age) & (self.pool.row >= 0)
+            if aged.any():
+                self.model.remove_constraints(self.pool.row[aged])
+                self.pool.row[aged] = -1
+
+        self.solve_time = time.perf_counter() - start
+
+        return objective, x
@@ -1,116 +1,99 @@
-from config import Config
-from gurobipy import GRB, Model, LinExpr
+import math
+import typing
+
+import numpy as np
+import scipy.sparse as sparse
+
+from farmer.backend import Work, create
+from farmer.config import Config
+from farmer.recourse import Recourse, add_recourse
 
 BIG_M = 100 * 100 * 100
 
 
 class SubProblem:
-    def __init__(self, cfg: Config):
-        self.model = Model("benders_sub_porblem")
+    """
+    Benders's sub problem over the given scenarios (all of them by default).
+    Its objective is the scenarios share of the expected recourse cost so
+    sub problems over disjoint groups of scenarios sum up to the whole.
+    Variables and constraints of all crops are added for all scenarios
+    at once.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        scenarios: typing.Optional[typing.List[int]] = None,
+        backend: str = "gurobi",
+    ):
+        self.model = create(backend, "benders_sub_porblem")
         self.cfg = cfg
 
-        self.x_1 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_1")
-        self.x_2 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_2")
-        self.x_3 = self.model.addVar(vtype=GRB.CONTINUOUS, lb=0, name="x_3")
-
-        self.objective = LinExpr()
-
-        probability = 1 / len(self.cfg.scenarios)
-        for index, scenario in enumerate(self.cfg.scenarios):
-            self._wheat_variables_constraint(index, scenario, probability)
-            self._corn_variables_constraint(index, scenario, probability)
-            self._beet_variables_constraints(index, scenario, probability)
-
-        self.model.setObjective(self.objective, GRB.MINIMIZE)
-
-    def solve(self, x_1, x_2, x_3):
-        """
-        Solve the sub problem with given values for xs.
-        """
-        x_hat_1 = self.model.addConstr(self.x_1 == x_1, name="x_hat_1")
-        x_hat_2 = self.model.addConstr(self.x_2 == x_2, name="x_hat_2")
-        x_hat_3 = self.model.addConstr(self.x_3 == x_3, name="x_hat_3")
-
-        self.model.optimize()
-
-        return (
-            self.model.objVal,
-            x_hat_1.pi,
-            x_hat_2.pi,
-            x_hat_3.pi,
-        )
-
-    def _wheat_variables_constraint(self, index, scenario, probability):
-        y_11 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"y_11_{index}"
-        )
-        y_12 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"y_12_{index}"
-        )
-        v_1 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"v_1_{index}"
-        )
-
-        self.model.addConstr(
-            self.cfg.wheat.requirement
-            <= self.x_1 * self.cfg.wheat.produce_rate * (1 + scenario)
-            + y_11
-            - y_12
-            + v_1,
-            name="wheat_produce_constraint",
-        )
-
-        self.objective.add(y_11 * self.cfg.wheat.buy_price * probability)
-        self.objective.add(y_12 * -self.cfg.wheat.sell_price * probability)
-        self.objective.add(v_1 * BIG_M)
-
-    def _corn_variables_constraint(self, index, scenario, probability):
-        y_21 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"y_21_{index}"
-        )
-        y_22 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"y_22_{index}"
-        )
-        v_2 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"v_2_{index}"
-        )
-
-        self.model.addConstr(
-            self.cfg.corn.requirement
-            <= self.x_2 * self.cfg.corn.produce_rate * (1 + scenario)
-            + y_21
-            - y_22
-            + v_2,
-            name="corn_produce_constraint",
-        )
+        crops = self.cfg.crop_arrays()
+        self.x = self.model.add_variables(len(crops))
 
-        self.objective.add(y_21 * self.cfg.corn.buy_price * probability)
-        self.objective.add(y_22 * -self.cfg.corn.sell_price * probability)
-        self.objective.add(v_2 * BIG_M)
+        if scenarios is None:
+            scenarios = list(range(len(self.cfg.scenarios)))
 
-    def _beet_variables_constraints(self, index, scenario, probability):
-        y_32 = self.model.addVar(
-            vtype=GRB.CONTINUOUS,
-            lb=0,
-            ub=self.cfg.beet.max_demand,
-            name=f"y_32_{index}",
-        )
-        y_33 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"y_33_{index}"
-        )
-        v_3 = self.model.addVar(
-            vtype=GRB.CONTINUOUS, lb=0, name=f"v_3_{index}"
+        add_recourse(
+            self.model,
+            self.x,
+            crops,
+            self.cfg.yields()[:, scenarios],
+            self.cfg.scenario_probabilities()[scenarios],
+            penalty=BIG_M,
         )
 
-        self.model.addConstr(
-            self.x_3 * self.cfg.beet.produce_rate * (1 + scenario)
-            - y_32
-            - y_33
-            + v_3
-            >= 0,
-            name="beet_produce_constraint",
+        # first stage values are fixed with these constraints and only
+        # their right-hand sides change between benders iterations.
+        self.x_hat = self.model.add_constraints(
+            [(self.x, sparse.identity(len(crops)))], "=", 0
         )
 
-        self.objective.add(y_32 * -self.cfg.beet.sell_price_high * probability)
-        self.objective.add(y_33 * -self.cfg.beet.sell_price_low * probability)
-        self.objective.add(v_3 * BIG_M)
+    def solve(self, x: np.ndarray) -> typing.Tuple[float, np.ndarray]:
+        """
+        Solve the sub problem with given values for xs,
+        it returns the objective value and the duals of xs.
+        The model is kept between calls so it is re-solved
+        from the previous basis.
+        """
+        self.model.set_rhs(self.x_hat, x)
+
+        objective = self.model.optimize()
+        return objective, self.model.duals(self.x_hat)
+
+    def work(self) -> Work:
+        return self.model.work
+
+
+class CheckedSubProblem(SubProblem):
+    """
+    CheckedSubProblem solves the sub problem with both its backend and
+    the closed form recourse and fails when their costs are different.
+    subgradients are not compared because on kinks any of them is valid.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        scenarios: typing.Optional[typing.List[int]] = None,
+        backend: str = "gurobi",
+        rel_tol: float = 1e-6,
+    ):
+        super().__init__(cfg, scenarios, backend)
+        self.recourse = Recourse(cfg, scenarios)
+        self.rel_tol = rel_tol
+
+    def solve(self, x: np.ndarray) -> typing.Tuple[float, np.ndarray]:
+        solution = super().solve(x)
+        expected, _ = self.recourse.solve(x)
+
+        if not math.isclose(
+            solution[0], expected, rel_tol=self.rel_tol, abs_tol=self.rel_tol
+        ):
+            raise ValueError(
+                f"recourse cost {expected} is different from "
+                f"sub problem cost {solution[0]} on {tuple(x)}"
+            )
+
+        return solution
@@ -0,0 +1,166 @@
+"""
+farmer command, it solves a configuration with one of the methods and
+writes its iterations and result as JSON lines, for example:
+
+    farmer --method benders --config farmer.json --scenarios yields.csv \
+        --option recourse=oracle --option groups=10
+
+numpy and the solvers are imported after the arguments are parsed and only
+the selected method is imported, so short runs start quickly.
+"""
+
+import argparse
+import json
+import sys
+import time
+import typing
+
+# solver.METHODS, it is repeated so --help does not import numpy
+METHODS = ("benders", "lagrange", "pha")
+
+
+def _option(text: str) -> typing.Tuple[str, typing.Any]:
+    name, separator, value = text.partition("=")
+    if not separator:
+        raise argparse.ArgumentTypeError(f"{text} is not name=value")
+    try:
+        return name, json.loads(value)
+    except ValueError:
+        return name, value
+
+
+def _array(path: str):
+    """
+    _array reads a JSON, CSV or NPY file of numbers,
+    CSV files have a row for each scenario and may have # comments.
+    """
+    # pylint: disable=import-outside-toplevel
+    import numpy as np
+
+    if path.endswith(".npy"):
+        return np.load(path)
+    if path.endswith(".csv"):
+        return np.loadtxt(path, delimiter=",", ndmin=1)
+    with open(path) as file:
+        return np.asarray(json.load(file), dtype=float)
+
+
+def parser() -> argparse.ArgumentParser:
+    arguments = argparse.ArgumentParser(
+        prog="farmer",
+        description=__doc__,
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+    )
+    arguments.add_argument("--method", choices=METHODS, default="benders")
+    arguments.add_argument(
+        "--config", help="JSON file of Config fields, seeds and crops"
+    )
+    arguments.add_argument(
+        "--scenarios", help="JSON, CSV or NPY file of yield deviations"
+    )
+    arguments.add_argument(
+        "--probabilities", help="JSON, CSV or NPY file of probabilities"
+    )
+    arguments.add_argument("--backend", default="highs")
+    arguments.add_argument(
+        "--option",
+        type=_option,
+        action="append",
+        default=[],
+        help="solver option as name=value, values are read as JSON",
+    )
+    arguments.add_argument(
+        "--cache", help="directory of a solver.Cache for the results"
+    )
+    arguments.add_argument(
+        "--output", default="-", help="file of the JSON lines or -"
+    )
+    arguments.add_argument(
+        "--quiet", action="store_true", help="write only the result"
+    )
+    return arguments
+
+
+def main(argv: typing.Optional[typing.Sequence[str]] = None) -> int:
+    args = parser().parse_args(argv)
+    start = time.perf_counter()
+
+    output = sys.stdout if args.output == "-" else open(args.output, "w")
+    try:
+        try:
+            cfg = _config(args)
+        except (OSError, TypeError, ValueError) as error:
+            _write(output, {"type": "error", "error": repr(error)})
+            return 1
+        return _solve(args, cfg, output, start)
+    finally:
+        if output is not sys.stdout:
+            output.close()
+
+
+def _config(args: argparse.Namespace) -> typing.Any:
+    # pylint: disable=import-outside-toplevel
+    from farmer.config import Config
+
+    data = {}
+    if args.config:
+        with open(args.config) as file:
+            data = json.load(file)
+    if args.scenarios:
+        data["scenarios"] = _array(args.scenarios)
+    if args.probabilities:
+        data["probabilities"] = _array(args.probabilities)
+    return Config.from_dict(data)
+
+
+def _write(output: typing.TextIO, message: typing.Dict[str, typing.Any]):
+    output.write(json.dumps(message, default=float) + "\n")
+    output.flush()
+
+
+def _solve(
+    args: argparse.Namespace,
+    cfg: typing.Any,
+    output: typing.TextIO,
+    start: float,
+) -> int:
+    # pylint: disable=import-outside-toplevel
+    from farmer.solver import Cache, Recorder, create
+
+    def write(message: typing.Dict[str, typing.Any]):
+        _write(output, message)
+
+    callbacks = []
+    if not args.quiet:
+        callbacks.append(lambda row: write({"type": "iteration", **row}))
+    # iterations are only kept for the cache
+    recorder = Recorder(
+        capacity=None if args.cache else 0, callbacks=callbacks
+    )
+
+    try:
+        solver = create(
+            args.method, cfg, args.backend, dict(args.option), recorder
+        )
+        if args.cache:
+            result = Cache(args.cache).solve(solver)
+        else:
+            result = solver.solve()
+    except (OSError, TypeError, ValueError, RuntimeError) as error:
+        write({"type": "error", "error": repr(error)})
+        return 1
+
+    profile = result.profile
+    write(
+        {
+            "type": "result",
+            "method": args.method,
+            "z_star": result.z_star,
+            "x": list(result.x),
+            "lower_bound": profile.lower_bound if profile else None,
+            "upper_bound": profile.upper_bound if profile else None,
+            "iterations": recorder.count,
+            "time": time.perf_counter() - start,
+        }
+    )
+    return 0
@@ -1 +1,9 @@
-from .config import Config, RequiredSeed, NonrequiredSeed
+from .config import (
+    Config,
+    Crops,
+    RequiredSeed,
+    NonrequiredSeed,
+    WHEAT,
+    CORN,
+    BEET,
+)
@@ -4,8 +4,16 @@ here we can configure the number of available seeds and their price.
 """
 
 import dataclasses
+import hashlib
 import typing
 
+import numpy as np
+
+# crop indices of the default crops in arrays that have a value for each crop
+WHEAT = 0
+CORN = 1
+BEET = 2
+
 
 @dataclasses.dataclass
 class RequiredSeed:
@@ -33,17 +41,251 @@ class NonrequiredSeed:
     sell_price_high: int
 
 
+Seed = typing.Union[RequiredSeed, NonrequiredSeed]
+
+
+def _digest(*values) -> str:
+    # arrays are hashed with their type and shape so equal data in
+    # different layouts has different digests
+    digest = hashlib.sha256()
+    for value in values:
+        array = np.ascontiguousarray(value)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    return digest.hexdigest()
+
+
+@dataclasses.dataclass
+class Crops:
+    """
+    Crops has the data of all crops in arrays with an element for each crop.
+    required crops must meet their requirement (threshold), their shortfall
+    is bought in price and their surplus is sold in surplus_price.
+    other crops are only sold, in price up to their demand (threshold)
+    and in surplus_price after it.
+    """
+
+    names: typing.Sequence[str]
+    plant_cost: np.ndarray
+    produce_rate: np.ndarray
+    required: np.ndarray
+    threshold: np.ndarray
+    price: np.ndarray
+    surplus_price: np.ndarray
+
+    def __post_init__(self):
+        self.names = tuple(self.names)
+        self.plant_cost = np.asarray(self.plant_cost, dtype=float)
+        self.produce_rate = np.asarray(self.produce_rate, dtype=float)
+        self.required = np.asarray(self.required, dtype=bool)
+        self.threshold = np.asarray(self.threshold, dtype=float)
+        self.price = np.asarray(self.price, dtype=float)
+        self.surplus_price = np.asarray(self.surplus_price, dtype=float)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def __getitem__(self, indices) -> "Crops":
+        """
+        crops[indices] returns the crops with the given indices.
+        """
+        indices = np.atleast_1d(indices)
+        return Crops(
+            [self.names[index] for index in indices],
+            self.plant_cost[indices],
+            self.produce_rate[indices],
+            self.required[indices],
+            self.threshold[indices],
+            self.price[indices],
+            self.surplus_price[indices],
+        )
+
+    def index(self, name: str) -> int:
+        return self.names.index(name)
+
+    @classmethod
+    def from_seeds(cls, seeds: typing.Mapping[str, Seed]) -> "Crops":
+        """
+        from_seeds returns the crops of the named seeds in their order.
+        """
+        rows = []
+        for seed in seeds.values():
+            if isinstance(seed, RequiredSeed):
+                rows.append(
+                    (
+                        seed.plant_cost,
+                        seed.produce_rate,
+                        True,
+                        seed.requirement,
+                        seed.buy_price,
+                        seed.sell_price,
+                    )
+                )
+            else:
+                rows.append(
+                    (
+                        seed.plant_cost,
+                        seed.produce_rate,
+                        False,
+                        seed.max_demand,
+                        seed.sell_price_high,
+                        seed.sell_price_low,
+                    )
+                )
+        return cls(list(seeds), *zip(*rows))
+
+
 @dataclasses.dataclass
 class Config:
     """
-    Config contains the configuration of farmer problem
+    Config contains the configuration of farmer problem.
+    crops are the crops data, when it is None the crops are
+    wheat, corn and beet with the data of their fields.
+    Each scenario is the yield deviation of all crops or a sequence of
+    deviations for each crop, so scenarios can also be
+    an array with a row for each scenario.
+    probabilities are the scenarios probabilities, they are equal
+    when it is empty.
+    package is the trade package size, when it is positive crops are
+    bought and sold only in whole packages (1 is a package of 1000 kg)
+    and the recourse is integer.
     """
 
-    scenarios: typing.List[float] = dataclasses.field(default_factory=list)
+    scenarios: typing.Sequence[
+        typing.Union[float, typing.Sequence[float]]
+    ] = dataclasses.field(default_factory=list)
+
+    probabilities: typing.Sequence[float] = dataclasses.field(
+        default_factory=list
+    )
 
     area: int = 500
 
-    wheat: RequiredSeed = RequiredSeed(150, 2.5, 200, 238, 170)
-    corn: RequiredSeed = RequiredSeed(230, 3, 240, 210, 150)
+    package: float = 0
+
+    wheat: RequiredSeed = dataclasses.field(
+        default_factory=lambda: RequiredSeed(150, 2.5, 200, 238, 170)
+    )
+    corn: RequiredSeed = dataclasses.field(
+        default_factory=lambda: RequiredSeed(230, 3, 240, 210, 150)
+    )
+
+    beet: NonrequiredSeed = dataclasses.field(
+        default_factory=lambda: NonrequiredSeed(260, 20, 6000, 10, 36)
+    )
+
+    crops: typing.Optional[Crops] = None
+
+    @classmethod
+    def from_dict(cls, data: typing.Mapping[str, typing.Any]) -> "Config":
+        """
+        from_dict returns the configuration of a JSON like mapping,
+        seeds are mappings of the fields that change their defaults
+        and crops is a mapping of Crops fields to lists.
+        """
+        cfg = cls()
+        changes: typing.Dict[str, typing.Any] = {}
+        for name, value in data.items():
+            if name in ("wheat", "corn", "beet"):
+                changes[name] = dataclasses.replace(
+                    getattr(cfg, name), **value
+                )
+            elif name == "crops":
+                changes[name] = Crops(**value)
+            else:
+                changes[name] = value
+        return dataclasses.replace(cfg, **changes)
+
+    def crop_arrays(self) -> Crops:
+        """
+        crop_arrays returns the crops data.
+        """
+        if self.crops is not None:
+            return self.crops
+        return Crops.from_seeds(
+            {"wheat": self.wheat, "corn": self.corn, "beet": self.beet}
+        )
+
+    @property
+    def integer(self) -> bool:
+        """
+        integer is true when the recourse has integer trades.
+        """
+        return self.package > 0
+
+    def deviations(self) -> np.ndarray:
+        """
+        deviations returns the yield deviation of each crop in each scenario
+        as an array with a row for each scenario.
+        """
+        count = len(self.crop_arrays())
+        deviations = np.asarray(self.scenarios, dtype=float)
+        if deviations.ndim == 1:
+            return np.repeat(deviations[:, np.newaxis], count, axis=1)
+        if deviations.shape[1] != count:
+            raise ValueError(
+                f"{deviations.shape[1]} deviations for {count} crops"
+            )
+        return deviations
+
+    def yields(self) -> np.ndarray:
+        """
+        yields returns the produced weight of a unit of area of each crop
+        in each scenario as an array with a row for each crop.
+        """
+        rate = self.crop_arrays().produce_rate
+        return np.ascontiguousarray(
+            rate[:, np.newaxis] * (1 + self.deviations().T)
+        )
+
+    def scenario_probabilities(self) -> np.ndarray:
+        """
+        scenario_probabilities returns the probability of each scenario
+        and raises ValueError when there are no scenarios or the given
+        probabilities are not a distribution over the scenarios.
+        """
+        count = len(self.scenarios)
+        if count == 0:
+            raise ValueError("there are no scenarios")
+        if len(self.probabilities) == 0:
+            return np.full(count, 1 / count)
+
+        probabilities = np.asarray(self.probabilities, dtype=float)
+        if probabilities.shape != (count,):
+            raise ValueError(
+                f"{len(probabilities)} probabilities for {count} scenarios"
+            )
+        if (probabilities < 0).any() or not np.isclose(
+            probabilities.sum(), 1
+        ):
+            raise ValueError("probabilities must be a distribution")
+        return probabilities
+
+    def recourse_digest(self) -> str:
+        """
+        recourse_digest returns a hash of the data that the recourse
+        depends on, configurations that only differ in plant costs and
+        the area have the same digest.
+        """
+        crops = self.crop_arrays()
+        return _digest(
+            self.yields(),
+            self.scenario_probabilities(),
+            crops.required,
+            crops.threshold,
+            crops.price,
+            crops.surplus_price,
+            float(self.package),
+        )
 
-    beet: NonrequiredSeed = NonrequiredSeed(260, 20, 6000, 10, 36)
+    def digest(self) -> str:
+        """
+        digest returns a hash of the problem data, configurations that
+        describe the same problem like seeds and their crops have
+        the same digest.
+        """
+        return _digest(
+            self.crop_arrays().plant_cost,
+            float(self.area),
+            self.recourse_digest(),
+        )
@@ -0,0 +1,5 @@
+"""
+Extensive form (deterministic equivalent) of the farmer problem.
+"""
+
+from .extensive import Extensive
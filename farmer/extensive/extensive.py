@@ -0,0 +1,78 @@
+"""
+Here-and-now formulation of the farmer problem with all scenarios
+in one model. the second stage of all crops and scenarios is one block
+of variables and constraints so the model is built from a few
+sparse matrices.
+With integer recourse the trade variables are the number of packages
+and the model is a MIP that grows with the scenarios.
+"""
+
+import time
+import typing
+
+import numpy as np
+
+from farmer.backend import create
+from farmer.config import Config
+from farmer.recourse import add_recourse
+from farmer.solver import Solver, Result, Recorder, Profile
+
+
+class Extensive(Solver):
+    """
+    Extensive solves the deterministic equivalent in one shot.
+    backend is the name of the LP/MIP engine, "gurobi" or "highs".
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        backend: str = "gurobi",
+        recorder: typing.Optional[Recorder] = None,
+        profile: typing.Optional[Profile] = None,
+    ):
+        self.cfg = cfg
+        self.backend = backend
+        self.recorder = recorder if recorder is not None else Recorder()
+        self.profile = profile if profile is not None else Profile()
+
+    def _build(self):
+        model = create(self.backend, "extensive")
+        crops = self.cfg.crop_arrays()
+
+        x = model.add_variables(len(crops), obj=crops.plant_cost)
+        model.add_constraints(
+            [(x, np.ones((1, len(crops))))], "<", self.cfg.area
+        )
+
+        add_recourse(
+            model,
+            x,
+            crops,
+            self.cfg.yields(),
+            self.cfg.scenario_probabilities(),
+            self.cfg.package,
+        )
+
+        return model, x
+
+    def solve(self) -> Result:
+        start = time.perf_counter()
+        with self.profile.phase("build"):
+            model, x = self._build()
+        build_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        with self.profile.phase("solve"):
+            z_star = model.optimize()
+            x = model.values(x)
+        self.recorder.record(
+            {
+                "build_time": build_time,
+                "solve_time": time.perf_counter() - start,
+            }
+        )
+
+        self.profile.bounds(z_star, z_star)
+        self.profile.work = model.work
+        return Result(z_star, x, self.profile)
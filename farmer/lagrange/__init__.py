@@ -1,4 +1,4 @@
 """
 Lagrange method package.
 """
-from .lagrange import Lagrange, Parameters
+from .lagrange import Lagrange, Parameters, expected_value_bound
@@ -1,36 +1,101 @@
 """
 Lagrangian main loop with its parameters.
-Here we use subgradient method to calculate lambdas.
+Here we use subgradient method or level method to calculate lambdas.
 """
 
 import dataclasses
+import time
 import typing
 
-from config import Config
-from solver import Solver
+import numpy as np
 
-from .sub_problems import WheatSubProblem, CornSubProblem, BeetSubProblem
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.solver import Solver, Result, Recorder, Profile, crop_columns
+from farmer.recourse import Recourse
+
+from .sub_problems import (
+    CropSubProblem,
+    RecourseSubProblem,
+    ParametricSubProblem,
+)
+from .level import LevelModel
 
 
 @dataclasses.dataclass
 class Parameters:
     """
-    Lagrange subgradient method parameters.
+    Lagrange method parameters.
+    k_1_bound is only used by the subgradient method, gap is the relative
+    duality gap that stops the level method and level is the fraction
+    of the model gap that its level is above the best lower bound.
     """
 
     lower_bound: float
     upper_bound: float
     k_1_bound: int
     k_bound: int
+    gap: float = 1e-6
+    level: float = 0.5
+
+
+def expected_value_bound(cfg: Config, backend: str = "highs") -> float:
+    """
+    expected_value_bound returns the expected cost of the solution of
+    the problem with the expected yields, it is a feasible solution
+    so its cost is an upper bound of the optimal value.
+    """
+    deviation = cfg.scenario_probabilities() @ cfg.deviations()
+    expected = dataclasses.replace(
+        cfg, scenarios=[deviation.tolist()], probabilities=[]
+    )
+    x = np.array(Extensive(expected, backend).solve().x)
+
+    recourse = Recourse(cfg)
+    plant_cost = cfg.crop_arrays().plant_cost
+    return float(plant_cost @ x + recourse.costs(x) @ recourse.probability)
 
 
 class Lagrange(Solver):
     """
-    Lagrange subgradient method implementation
+    Lagrange method implementation, strategy selects how lambda is updated
+    "subgradient" uses subgradient steps and "level" uses the level method
+    that stops on the duality gap.
+    recourse selects how sub-problems are solved, "lp" solves them
+    with the given LP backend, "oracle" uses the closed form recourse
+    and "parametric" precomputes the sub-problems optimal solutions
+    for all lambdas so each iteration is a binary search.
+    backend is the LP engine of the "lp" sub-problems and the level
+    model, by default it is "gurobi" with the "lp" recourse and
+    the license-free "highs" with the others.
+    iterations are recorded with the given recorder or
+    with a new one that keeps all of them.
+    the build, sub_problems and update phases are timed
+    with the given profile or a new one that is attached to the result.
+    after solve, k is the number of iterations, time is the solve time
+    and gap is the relative gap of the best lower bound and upper_bound.
+    sub-problems are continuous so integer recourse is rejected.
     """
 
-    def __init__(self, cfg: Config, param: Parameters):
+    def __init__(
+        self,
+        cfg: Config,
+        param: Parameters,
+        recourse: str = "lp",
+        backend: typing.Optional[str] = None,
+        strategy: str = "subgradient",
+        recorder: typing.Optional[Recorder] = None,
+        profile: typing.Optional[Profile] = None,
+    ):
+        if cfg.integer:
+            raise ValueError("lagrange does not support integer recourse")
+
         self.cfg = cfg
+        self.recourse = recourse
+        if backend is None:
+            backend = "gurobi" if recourse == "lp" else "highs"
+        self.backend = backend
+        self.strategy = strategy
         self.k = 1
         self.k_1 = 0
         self.tau = 2.0
@@ -39,35 +104,92 @@ class Lagrange(Solver):
         self.upper_bound = param.upper_bound
         self.k_1_bound = param.k_1_bound
         self.k_bound = param.k_bound
+        self.gap_bound = param.gap
+        self.level = param.level
+
+        self.time = 0.0
+        self.gap = float("inf")
+
+        self.recorder = recorder if recorder is not None else Recorder()
+        self.profile = profile if profile is not None else Profile()
+
+    def solve(self) -> Result:
+        start = time.perf_counter()
+
+        with self.profile.phase("build"):
+            crops = range(len(self.cfg.crop_arrays()))
+            if self.recourse in ("oracle", "parametric"):
+                recourse = Recourse(self.cfg)
+                sub_problem = (
+                    RecourseSubProblem
+                    if self.recourse == "oracle"
+                    else ParametricSubProblem
+                )
+                plant_cost = self.cfg.crop_arrays().plant_cost
+                sub_problems = [
+                    sub_problem(self.cfg, recourse, crop, plant_cost[crop])
+                    for crop in crops
+                ]
+            else:
+                sub_problems = [
+                    CropSubProblem(self.cfg, crop, self.backend)
+                    for crop in crops
+                ]
+
+        if self.strategy == "level":
+            return self._level(sub_problems, start)
+        return self._subgradient(sub_problems, start)
+
+    def _evaluate(self, sub_problems, start: float):
+        """
+        _evaluate solves the sub-problems with the current lambda and
+        returns the dual function value, its solution, its subgradient
+        and the iteration row.
+        """
+        with self.profile.phase("sub_problems"):
+            solutions = [
+                sub_problem.solve(self._lambda) for sub_problem in sub_problems
+            ]
+        x = np.array([x_i for _, x_i in solutions])
+        z_lb = sum(z_i for z_i, _ in solutions) - self.cfg.area * self._lambda
+        omega = float(x.sum()) - self.cfg.area
+
+        self.time = time.perf_counter() - start
+        row = {"k": self.k}
+        row.update(crop_columns("x", x))
+        row.update(
+            {
+                "z_lb": z_lb,
+                "omega": omega,
+                "lambda": self._lambda,
+                "time": self.time,
+            }
+        )
 
-        self.iterations: typing.Dict[str, typing.List[float]] = {
-            "k": [],
-            "x_1": [],
-            "x_2": [],
-            "x_3": [],
-            "z_lb": [],
-            "omega": [],
-            "teta": [],
-            "lambda": [],
-        }
-
-    def solve(self):
-        wheat_sub_problem = WheatSubProblem(self.cfg)
-        corn_sub_problem = CornSubProblem(self.cfg)
-        beet_sub_problem = BeetSubProblem(self.cfg)
+        return z_lb, x, omega, row
 
+    def _profiled(
+        self, result: Result, upper_bound: float, problems: typing.List
+    ) -> Result:
+        """
+        _profiled attaches the profile with the bounds and the work of
+        the problems that are solved with an LP backend to the result.
+        """
+        self.profile.bounds(self.lower_bound, upper_bound)
+        for problem in problems:
+            model = getattr(problem, "model", None)
+            if model is not None:
+                self.profile.work += model.work
+
+        result.profile = self.profile
+        return result
+
+    def _gap(self, upper_bound: float) -> float:
+        return (upper_bound - self.lower_bound) / max(abs(upper_bound), 1)
+
+    def _subgradient(self, sub_problems, start: float) -> Result:
         while True:
-            z_1, x_1 = wheat_sub_problem.solve(self._lambda)
-            z_2, x_2 = corn_sub_problem.solve(self._lambda)
-            z_3, x_3 = beet_sub_problem.solve(self._lambda)
-            z_lb = z_1 + z_2 + z_3 - self.cfg.area * self._lambda
-
-            self.iterations["k"].append(self.k)
-            self.iterations["x_1"].append(x_1)
-            self.iterations["x_2"].append(x_2)
-            self.iterations["x_3"].append(x_3)
-            self.iterations["z_lb"].append(z_lb)
-            self.iterations["lambda"].append(self._lambda)
+            z_lb, x, omega, row = self._evaluate(sub_problems, start)
 
             if z_lb > self.lower_bound:
                 self.lower_bound = z_lb
@@ -81,16 +203,86 @@ class Lagrange(Solver):
 
             self.k += 1
 
-            omega = x_1 + x_2 + x_3 - self.cfg.area
-
-            teta = self.tau * (self.upper_bound - z_lb) / (omega ** 2)
+            teta = self.tau * (self.upper_bound - z_lb) / (omega**2)
 
-            self.iterations["teta"].append(teta)
-            self.iterations["omega"].append(omega)
+            self.gap = self._gap(self.upper_bound)
+            row["teta"] = teta
+            row["gap"] = self.gap
+            self.recorder.record(row)
 
             if (omega <= 0 and self._lambda * omega == 0) or (
                 self.k == self.k_bound
             ):
-                return (z_lb, x_1, x_2, x_3)
+                return self._profiled(
+                    Result(z_lb, x),
+                    self.upper_bound,
+                    sub_problems,
+                )
+
+            with self.profile.phase("update"):
+                self._lambda = max(0, self._lambda + teta * omega)
+
+    def _lambda_bound(self) -> float:
+        """
+        _lambda_bound returns a lambda that no crop is planted with it,
+        the recourse cost decreases at most by the highest price
+        of the crop for each unit of its highest yield.
+        """
+        recourse = Recourse(self.cfg)
+        plant_cost = self.cfg.crop_arrays().plant_cost
+        price = -np.minimum(recourse.below, recourse.above)
+        return max(
+            float(np.max(price * recourse.yields.max(axis=1) - plant_cost)), 0
+        )
+
+    def _level(self, sub_problems, start: float) -> Result:
+        """
+        _level maximizes the dual function with the level method.
+        the cutting plane model maximum is an upper bound of the dual
+        so the method stops when the best lower bound is close to it
+        or to upper_bound.
+        """
+        model = LevelModel(self._lambda_bound(), self.backend)
+        best = Result(float("-inf"), ())
+
+        while True:
+            z_lb, x, omega, row = self._evaluate(sub_problems, start)
+
+            if z_lb > best.z_star:
+                best = Result(z_lb, x)
+            self.lower_bound = max(self.lower_bound, z_lb)
+
+            with self.profile.phase("update"):
+                model.add_cut(self._lambda, z_lb, omega)
+                z_model = model.solve()
+
+            self.gap = self._gap(min(self.upper_bound, z_model))
+            self.k += 1
+
+            # x is feasible and complementary so lambda is optimal
+            optimal = omega <= 0 and self._lambda * omega == 0
+            if optimal or self.gap <= self.gap_bound or self.k == self.k_bound:
+                row["teta"] = 0
+                row["gap"] = self.gap
+                self.recorder.record(row)
+                if optimal:
+                    best = Result(z_lb, x)
+                self.gap = self._gap(self.upper_bound)
+                return self._profiled(
+                    best,
+                    min(self.upper_bound, z_model),
+                    sub_problems + [model],
+                )
+
+            with self.profile.phase("update"):
+                _lambda = model.project(
+                    self._lambda,
+                    self.lower_bound
+                    + self.level * (z_model - self.lower_bound),
+                )
 
-            self._lambda = max(0, self._lambda + teta * omega)
+            # teta is the subgradient step length that gives the same lambda
+            row["teta"] = (_lambda - self._lambda) / omega
+            row["gap"] = self.gap
+            self.recorder.record(row)
+            self._lambda = _lambda
@@ -0,0 +1,59 @@
+"""
+Cutting plane model of the lagrangian dual function for the level method.
+"""
+
+import typing
+
+import numpy as np
+
+from farmer.backend import create
+
+
+class LevelModel:
+    """
+    LevelModel keeps the cuts z_k + omega_k * (lambda - lambda_k)
+    of the concave dual function over [0, upper]. its maximum is an upper
+    bound of the dual optimal value and its level sets give the next lambda.
+    """
+
+    def __init__(self, upper: float, backend: str = "gurobi"):
+        self.model = create(backend, "lagrange_level_model")
+        self.upper = upper
+
+        self._lambda = self.model.add_variables(1, ub=upper)
+        self.theta = self.model.add_variables(1, lb=-np.inf, obj=-1)
+
+        self.cuts: typing.List[typing.Tuple[float, float, float]] = []
+
+    def add_cut(self, _lambda: float, z: float, omega: float):
+        """
+        add_cut adds the cut of the dual function value z
+        and its subgradient omega at the given lambda.
+        """
+        self.cuts.append((_lambda, z, omega))
+        self.model.add_constraints(
+            [(self.theta, [[1]]), (self._lambda, [[-omega]])],
+            "<",
+            z - omega * _lambda,
+        )
+
+    def solve(self) -> float:
+        """
+        solve returns the maximum of the cutting plane model.
+        """
+        return -self.model.optimize()
+
+    def project(self, _lambda: float, level: float) -> float:
+        """
+        project returns the closest lambda to the given one that
+        the model is at least level on it.
+        each cut bounds lambda from one side so the level set is an interval.
+        """
+        lower, upper = 0.0, self.upper
+        for _lambda_k, z_k, omega_k in self.cuts:
+            if omega_k > 0:
+                lower = max(lower, _lambda_k + (level - z_k) / omega_k)
+            elif omega_k < 0:
+                upper = min(upper, _lambda_k + (level - z_k) / omega_k)
+
+        return min(max(_lambda, lower), upper)
@@ -2,124 +2,91 @@
 lagrangian decomposition of the farmer problem
 creates the following sub-problems.
 """
-from gurobipy import Model
+import bisect
 
-from config import Config
+from farmer.backend import create
+from farmer.config import Config
+from farmer.recourse import Recourse, add_recourse
 
 
-class WheatSubProblem:
-    def __init__(self, cfg: Config):
-        self.cfg = cfg
+class CropSubProblem:
+    """
+    CropSubProblem is the sub-problem of a crop that is solved with
+    the given LP backend, its variables and constraints are added
+    for all scenarios at once.
+    """
 
-        # model.ModelSense is minimization by default
-        self.model = Model("wheat_sub_problem")
+    def __init__(self, cfg: Config, crop: int, backend: str = "gurobi"):
+        self.cfg = cfg
+        crops = self.cfg.crop_arrays()[crop]
+        self.plant_cost = float(crops.plant_cost[0])
 
-        self.x_1 = self.model.addVar(ub=self.cfg.area, name="x_1")
+        self.model = create(backend, f"{crops.names[0]}_sub_problem")
 
-        probability = 1 / len(self.cfg.scenarios)
-        for index, scenario in enumerate(self.cfg.scenarios):
-            self._variables_constraint(index, scenario, probability)
+        self.x = self.model.add_variables(1, ub=self.cfg.area)
 
-    def _variables_constraint(self, index, scenario, probability):
-        y_11 = self.model.addVar(
-            name=f"y_11_{index}", obj=self.cfg.wheat.buy_price * probability
-        )
-        y_12 = self.model.addVar(
-            name=f"y_12_{index}", obj=-self.cfg.wheat.sell_price * probability
-        )
-
-        self.model.addConstr(
-            self.cfg.wheat.requirement
-            <= self.x_1 * self.cfg.wheat.produce_rate * (1 + scenario)
-            + y_11
-            - y_12,
-            name="wheat_produce_constraint",
+        add_recourse(
+            self.model,
+            self.x,
+            crops,
+            self.cfg.yields()[[crop]],
+            self.cfg.scenario_probabilities(),
         )
 
     def solve(self, _lambda):
-        self.x_1.obj = _lambda + self.cfg.wheat.plant_cost
-        self.model.optimize()
+        self.model.set_objective(self.x, _lambda + self.plant_cost)
+        objective = self.model.optimize()
 
         return (
-            self.model.objVal,
-            self.x_1.x,
+            objective,
+            float(self.model.values(self.x)[0]),
         )
 
 
-class CornSubProblem:
-    def __init__(self, cfg: Config):
-        self.cfg = cfg
-
-        # model.ModelSense is minimization by default
-        self.model = Model("corn_sub_problem")
+class RecourseSubProblem:
+    """
+    RecourseSubProblem is a crop sub-problem that is solved with
+    the closed form recourse instead of gurobi.
+    """
 
-        self.x_2 = self.model.addVar(ub=self.cfg.area, name="x_2")
-
-        probability = 1 / len(self.cfg.scenarios)
-        for index, scenario in enumerate(self.cfg.scenarios):
-            self._variables_constraint(index, scenario, probability)
-
-    def _variables_constraint(self, index, scenario, probability):
-        y_21 = self.model.addVar(
-            name=f"y_21_{index}", obj=self.cfg.corn.buy_price * probability
-        )
-        y_22 = self.model.addVar(
-            name=f"y_22_{index}", obj=-self.cfg.corn.sell_price * probability
-        )
-
-        self.model.addConstr(
-            self.cfg.corn.requirement
-            <= self.x_2 * self.cfg.corn.produce_rate * (1 + scenario)
-            + y_21
-            - y_22,
-            name="cron_produce_constraint",
-        )
+    def __init__(
+        self, cfg: Config, recourse: Recourse, crop: int, plant_cost: float
+    ):
+        self.cfg = cfg
+        self.recourse = recourse
+        self.crop = crop
+        self.plant_cost = plant_cost
 
     def solve(self, _lambda):
-        self.x_2.obj = _lambda + self.cfg.corn.plant_cost
-        self.model.optimize()
-
-        return (
-            self.model.objVal,
-            self.x_2.x,
+        return self.recourse.minimize(
+            self.crop, _lambda + self.plant_cost, self.cfg.area
         )
 
 
-class BeetSubProblem:
-    def __init__(self, cfg: Config):
-        self.cfg = cfg
-
-        # model.ModelSense is minimization by default
-        self.model = Model("beet_sub_problem")
-
-        self.x_3 = self.model.addVar(ub=self.cfg.area, name="x_3")
-
-        probability = 1 / len(self.cfg.scenarios)
-        for index, scenario in enumerate(self.cfg.scenarios):
-            self._variables_constraint(index, scenario, probability)
+class ParametricSubProblem:
+    """
+    ParametricSubProblem is a crop sub-problem that its optimal solution
+    is found with a binary search over the precomputed breakpoints of the
+    recourse cost. the objective of x in [0, area] is
+    (lambda + plant_cost) * x plus the recourse cost so the optimal x is
+    the first breakpoint that the recourse right derivative on it is
+    at least -(lambda + plant_cost).
+    """
 
-    def _variables_constraint(self, index, scenario, probability):
-        y_32 = self.model.addVar(
-            ub=self.cfg.beet.max_demand,
-            name=f"y_32_{index}",
-            obj=-self.cfg.beet.sell_price_high * probability,
-        )
-        y_33 = self.model.addVar(
-            name=f"y_33_{index}",
-            obj=-self.cfg.beet.sell_price_low * probability,
-        )
+    def __init__(
+        self, cfg: Config, recourse: Recourse, crop: int, plant_cost: float
+    ):
+        self.cfg = cfg
+        self.plant_cost = plant_cost
 
-        self.model.addConstr(
-            self.x_3 * self.cfg.beet.produce_rate * (1 + scenario)
-            >= y_32 + y_33,
-            name="beet_produce_constraint",
-        )
+        points, values, slopes = recourse.breakpoints(crop, self.cfg.area)
+        self.points = points.tolist()
+        self.values = values.tolist()
+        self.slopes = slopes.tolist()
 
     def solve(self, _lambda):
-        self.x_3.obj = _lambda + self.cfg.beet.plant_cost
-        self.model.optimize()
+        cost = _lambda + self.plant_cost
+        index = bisect.bisect_left(self.slopes, -cost)
+        x = self.points[index]
 
-        return (
-            self.model.objVal,
-            self.x_3.x,
-        )
+        return cost * x + self.values[index], x
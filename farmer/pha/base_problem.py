@@ -1,122 +1,205 @@
 """
 Base problem of PHA. It is a master problem for an specific scenario.
 """
+
 import typing
 
-from gurobipy import Model, QuadExpr
+import numpy as np
+
+from farmer.backend import Work, create
+from farmer.config import Config
+from farmer.recourse import add_recourse
 
-from config import Config
+# tangent points of the linearized proximal term as fractions of the area
+TANGENTS = np.concatenate(
+    [[0], 2.0 ** -np.arange(20), -(2.0 ** -np.arange(20))]
+)
 
 
 class BaseProblem:
+    """
+    The objective is kept in the backend between iterations, lambda and x_hat
+    only change linear coefficients of xs and the objective constant
+    so they are updated in place and the quadratic terms are set again
+    only when rou changes. rou has a value for each crop.
+    The objective of scenario s with probability p_s is
+    p_s * (c x + Q_s(x) + N * (lambda x + rou / 2 * (x - x_hat) ** 2))
+    with N scenarios, like the costs the multipliers and the proximal term
+    are weighted with the probability so the multipliers that PHA updates
+    keep a zero expectation and its fixed point is optimal with
+    non-uniform probabilities, and N keeps rou of equal probabilities
+    as it was. the model has this objective without p_s, that is only
+    applied to its optimal value, so its scale does not shrink with
+    the number of scenarios.
+    With integer recourse the trade variables count packages and
+    the model is a MIP, the proximal term is linearized for it since
+    highs does not solve MIQPs: u = x - x_hat and t >= u ** 2 / 2 is
+    approximated with its tangents at a few points so rou and x_hat
+    only change the objective coefficient of t and the rhs of u rows.
+    """
+
     def __init__(
-        self, index: int, scenario: float, probability: float, cfg: Config
+        self,
+        index: int,
+        scenario: typing.Sequence[float],
+        probability: float,
+        cfg: Config,
+        backend: str = "gurobi",
     ):
         self.cfg = cfg
 
         self.probability = probability
         self.index = index
-        self.scenario = scenario
-
-        self.objective = QuadExpr()
+        self.scenario = np.asarray(scenario, dtype=float)
 
-        # model.ModelSense is minimization by default
-        self.model = Model(f"base_problem_{self.index}")
+        self.rou: typing.Optional[np.ndarray] = None
 
-        self.x_1 = self.model.addVar(ub=self.cfg.area, name="x_1")
-        self.x_2 = self.model.addVar(ub=self.cfg.area, name="x_2")
-        self.x_3 = self.model.addVar(ub=self.cfg.area, name="x_3")
+        self.model = create(backend, f"base_problem_{self.index}")
 
-        self.model.addConstr(self.x_1 + self.x_2 + self.x_3 <= self.cfg.area)
+        crops = self.cfg.crop_arrays()
+        self.x = self.model.add_variables(len(crops), ub=self.cfg.area)
 
-        self.objective.add(
-            self.x_1 * self.cfg.wheat.plant_cost * self.probability
+        self.area = self.model.add_constraints(
+            [(self.x, np.ones((1, len(crops))))], "<", self.cfg.area
         )
-        self.objective.add(
-            self.x_2 * self.cfg.corn.plant_cost * self.probability
-        )
-        self.objective.add(
-            self.x_3 * self.cfg.beet.plant_cost * self.probability
-        )
-
-        self._corn_variables_constraint()
-        self._wheat_variables_constraint()
-        self._beet_variables_constraint()
 
-    def _wheat_variables_constraint(self):
-        y_11 = self.model.addVar(name=f"y_11_{self.index}")
-        y_12 = self.model.addVar(name=f"y_12_{self.index}")
-
-        self.objective.add(y_11 * self.cfg.wheat.buy_price * self.probability)
-        self.objective.add(
-            y_12 * -self.cfg.wheat.sell_price * self.probability
+        self.costs = crops.plant_cost
+        # weight of the multipliers and the proximal term
+        self.weight = len(self.cfg.scenarios)
+
+        block = add_recourse(
+            self.model,
+            self.x,
+            crops,
+            (crops.produce_rate * (1 + self.scenario))[:, np.newaxis],
+            np.ones(1),
+            self.cfg.package,
         )
 
-        self.model.addConstr(
-            self.cfg.wheat.requirement
-            <= self.x_1 * self.cfg.wheat.produce_rate * (1 + self.scenario)
-            + y_11
-            - y_12,
-            name="wheat_produce_constraint",
+        # buying more than the requirement is never optimal, the bound
+        # keeps the active set QP solver of highs from reporting some
+        # proximal problems as unbounded and makes it faster.
+        required = np.flatnonzero(crops.required)
+        self.model.set_bounds(
+            block.t_1[required],
+            0,
+            np.ceil(crops.threshold[required] / (self.cfg.package or 1)),
         )
 
-    def _corn_variables_constraint(self):
-        y_21 = self.model.addVar(name=f"y_21_{self.index}")
-        y_22 = self.model.addVar(name=f"y_22_{self.index}")
+        # crops that are fixed and their areas
+        self.fixed = np.zeros(0, dtype=int)
+        self.fixed_values = np.zeros(0)
 
-        self.objective.add(y_21 * self.cfg.corn.buy_price * self.probability)
-        self.objective.add(y_22 * -self.cfg.corn.sell_price * self.probability)
+        self.integer = self.cfg.integer
+        if self.integer:
+            self._proximal_variables_constraint()
 
-        self.model.addConstr(
-            self.cfg.corn.requirement
-            <= self.x_2 * self.cfg.corn.produce_rate * (1 + self.scenario)
-            + y_21
-            - y_22,
-            name="cron_produce_constraint",
-        )
+    def _proximal_variables_constraint(self):
+        count = len(self.x)
+        self.u = self.model.add_variables(count, lb=-self.cfg.area)
+        self.t = self.model.add_variables(count)
 
-    def _beet_variables_constraint(self):
-        y_32 = self.model.addVar(
-            ub=self.cfg.beet.max_demand, name=f"y_32_{self.index}",
+        self.deviation = self.model.add_constraints(
+            [(self.x, np.identity(count)), (self.u, -np.identity(count))],
+            "=",
+            0,
         )
-        y_33 = self.model.addVar(name=f"y_33_{self.index}")
 
-        self.objective.add(
-            y_32 * -self.cfg.beet.sell_price_high * self.probability
-        )
-        self.objective.add(
-            y_33 * -self.cfg.beet.sell_price_low * self.probability
+        # t >= d * u - d ** 2 / 2 for each tangent point d
+        points = TANGENTS * self.cfg.area
+        tangents = np.kron(np.identity(count), np.ones((len(points), 1)))
+        self.model.add_constraints(
+            [
+                (self.t, tangents),
+                (self.u, -np.tile(points, count)[:, np.newaxis] * tangents),
+            ],
+            ">",
+            np.tile(-(points**2) / 2, count),
         )
 
-        self.model.addConstr(
-            self.x_3 * self.cfg.beet.produce_rate * (1 + self.scenario)
-            >= y_32 + y_33,
-            name="beet_produce_constraint",
-        )
+    def update(self, cfg: Config):
+        """
+        update changes the plant costs and the area to the given ones,
+        the recourse of cfg must be the same.
+        """
+        self.cfg = cfg
+        self.costs = cfg.crop_arrays().plant_cost
+        self.model.set_bounds(self.x, 0, cfg.area)
+        self.model.set_rhs(self.area, cfg.area)
+        self.fixed = np.zeros(0, dtype=int)
+        self.fixed_values = np.zeros(0)
+
+    def fix(self, indices: np.ndarray, values: np.ndarray):
+        """
+        fix fixes the planted area of the crops at indices to values
+        until the next update.
+        """
+        self.model.set_bounds(self.x[indices], values, values)
+        self.fixed = np.concatenate([self.fixed, indices])
+        self.fixed_values = np.concatenate([self.fixed_values, values])
+
+    def bound(self, _lambda: np.ndarray) -> float:
+        """
+        bound returns the optimal value of the base problem with the given
+        multipliers, without the proximal term and the fixed crops.
+        its sum over the scenarios is a lower bound of the optimal value
+        when the multipliers of each crop have a zero expectation.
+        """
+        fixed = self.x[self.fixed]
+        self.model.set_bounds(fixed, 0, self.cfg.area)
+        zeros = np.zeros(len(self.x))
+        z, _ = self.solve(_lambda, zeros, zeros)
+        self.model.set_bounds(fixed, self.fixed_values, self.fixed_values)
+        return z
+
+    def work(self) -> Work:
+        return self.model.work
 
     def solve(
         self,
-        _lambda: typing.Tuple[float, float, float],
-        rou: float,
-        x_hat_1: float,
-        x_hat_2: float,
-        x_hat_3: float,
-    ):
-        obj = self.objective.copy(1)
-
-        obj.add(_lambda[0] * self.x_1)
-        obj.add(_lambda[1] * self.x_2)
-        obj.add(_lambda[2] * self.x_3)
-        obj.add(rou / 2 * (self.x_1 - x_hat_1) * (self.x_1 - x_hat_1))
-        obj.add(rou / 2 * (self.x_2 - x_hat_2) * (self.x_2 - x_hat_2))
-        obj.add(rou / 2 * (self.x_3 - x_hat_3) * (self.x_3 - x_hat_3))
-
-        self.model.setObjective(obj)
-        self.model.optimize()
-
-        return (
-            self.model.objVal,
-            self.x_1.x,
-            self.x_2.x,
-            self.x_3.x,
+        _lambda: np.ndarray,
+        rou: np.ndarray,
+        x_hat: np.ndarray,
+    ) -> typing.Tuple[float, np.ndarray]:
+        """
+        solve returns the optimal value and solution of the base problem
+        with the given multipliers, penalty and consensus.
+        """
+        x_hat = np.asarray(x_hat, dtype=float)
+        if self.integer:
+            return self._solve_linearized(_lambda, rou, x_hat)
+
+        weight = self.weight
+        if not np.array_equal(rou, self.rou):
+            self.rou = np.array(rou, dtype=float)
+            self.model.set_quadratic(self.x, weight * rou / 2)
+
+        # rou / 2 * (x - x_hat) ** 2 is expanded into
+        # rou / 2 * x ** 2 - rou * x_hat * x + rou / 2 * x_hat ** 2
+        self.model.set_objective(
+            self.x, self.costs + weight * (np.asarray(_lambda) - rou * x_hat)
+        )
+        self.model.set_objective_constant(weight * (rou * x_hat) @ x_hat / 2)
+
+        return self._optimize()
+
+    def _solve_linearized(
+        self,
+        _lambda: np.ndarray,
+        rou: np.ndarray,
+        x_hat: np.ndarray,
+    ) -> typing.Tuple[float, np.ndarray]:
+        if not np.array_equal(rou, self.rou):
+            self.rou = np.array(rou, dtype=float)
+            self.model.set_objective(self.t, self.weight * rou)
+
+        self.model.set_objective(
+            self.x, self.costs + self.weight * np.asarray(_lambda)
         )
+        self.model.set_rhs(self.deviation, x_hat)
+
+        return self._optimize()
+
+    def _optimize(self) -> typing.Tuple[float, np.ndarray]:
+        objective = self.model.optimize()
+        return self.probability * objective, self.model.values(self.x)
@@ -3,116 +3,311 @@ Main loop of PHA algorithm.
 """
 
 import dataclasses
+import functools
 import typing
 import math
 
-from config import Config
-from solver import Solver
+import numpy as np
+
+from farmer.config import Config
+from farmer.backend import Work
+from farmer.recourse import Recourse
+from farmer.solver import Solver, Result, Recorder, Profile, crop_columns
+from farmer.solver.pool import ShardPool
 
 from .base_problem import BaseProblem
 
+# iterations between the rebalancing of rou with Parameters.balance
+BALANCE_PERIOD = 10
+
 
 @dataclasses.dataclass
 class Parameters:
     """
-    PHA method parameters
+    PHA method parameters, max_iterations limits the number of iterations
+    that is needed with integer recourse because PHA is only a heuristic
+    for it and may not converge.
+    rou is the same for all crops and starts at 0.1 after the first
+    iteration by default. with cost_rou the rou of each crop starts
+    proportional to plant cost / (spread of its first solutions + 1)
+    with the same mean, so crops that cost more and that scenarios agree
+    on are pulled to their consensus harder.
+    rou_transform is applied to the rou of each crop and with balance
+    every BALANCE_PERIOD iterations the rou of a crop is doubled when
+    its distance to the consensus is balance times larger than
+    the change of its consensus times its rou and halved in
+    the opposite case.
+    with fix_after a crop whose solutions and consensus stay within
+    fix_tolerance of its consensus for fix_after iterations in a row is
+    fixed to it in all base problems.
+    with gap PHA keeps the bounds of the optimal value and stops when
+    their relative gap is at most gap. the upper bound is the cost of
+    the best x_hat, that is rounded with integer recourse, and
+    every bound_period iterations the base problems are solved again
+    without the proximal term and the fixed crops for a lower bound.
+    with integer recourse the lower bound is only as tight as the MIP gap
+    of the backend. the result is then the best x_hat with its cost.
     """
 
     epsilon: float
     rou_transform: typing.Callable[[float], float]
+    max_iterations: typing.Optional[int] = None
+    cost_rou: bool = False
+    balance: typing.Optional[float] = None
+    fix_after: typing.Optional[int] = None
+    fix_tolerance: float = 1e-4
+    gap: typing.Optional[float] = None
+    bound_period: int = 10
+
+
+def _base_problem(
+    cfg: Config,
+    backend: str,
+    item: typing.Tuple[int, typing.Sequence[float], float],
+) -> BaseProblem:
+    index, scenario, probability = item
+    return BaseProblem(index, scenario, probability, cfg, backend)
 
 
 class PHA(Solver):
-    def __init__(self, cfg: Config, param: Parameters):
+    """
+    Progressive hedging. base problems are independent in each iteration
+    so they are solved in the given number of worker processes,
+    each worker keeps its share of base problems for the whole run
+    and only receives lambda, rou and x_hat. with zero workers
+    base problems are solved in the current process.
+    backend is the name of the QP engine, "gurobi" or "highs".
+    with integer recourse base problems are MIPs and their consensus
+    is rounded at the end: x_hat is rounded down to the closest point
+    that the recourse cost changes on and the trades of each scenario
+    are rounded to whole packages so the result is a feasible solution
+    and its cost.
+    iterations are recorded with the given recorder or
+    with a new one that keeps all of them.
+    the build, base_problems and update phases are timed
+    with the given profile or a new one that is attached to the result.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        param: Parameters,
+        workers: int = 0,
+        backend: str = "gurobi",
+        recorder: typing.Optional[Recorder] = None,
+        profile: typing.Optional[Profile] = None,
+    ):
         self.cfg = cfg
+        self.workers = workers
+        self.backend = backend
 
         self.eplison = param.epsilon
         self.rou_transform = param.rou_transform
+        self.max_iterations = param.max_iterations
+        self.cost_rou = param.cost_rou
+        self.balance = param.balance
+        self.fix_after = param.fix_after
+        self.fix_tolerance = param.fix_tolerance
+        self.gap = param.gap
+        self.bound_period = param.bound_period
 
-        self.iterations: typing.Dict[str, typing.List[float]] = {
-            "k": [],
-            "x_hat_1": [],
-            "x_hat_2": [],
-            "x_hat_3": [],
-            "rou": [],
-            "z": [],
-            "difference": [],
-        }
-
-    def solve(self):
-        base_problems: typing.List[BaseProblem] = []
-        _lambda: typing.List[typing.Tuple[float, float, float]] = []
-        rou = 0
-        x_hat_1 = 0
-        x_hat_2 = 0
-        x_hat_3 = 0
-        k = 0
+        self.recorder = recorder if recorder is not None else Recorder()
+        self.profile = profile if profile is not None else Profile()
 
-        probability = 1 / len(self.cfg.scenarios)
-        for index, scenario in enumerate(self.cfg.scenarios):
-            base_problems.append(
-                BaseProblem(index, scenario, probability, self.cfg)
-            )
-            _lambda.append((0, 0, 0))
+    def build(self) -> ShardPool:
+        """
+        build returns the pool of base problems.
+        """
+        return ShardPool(
+            functools.partial(_base_problem, self.cfg, self.backend),
+            [
+                (index, scenario, probability)
+                for index, (scenario, probability) in enumerate(
+                    zip(
+                        self.cfg.deviations(),
+                        self.cfg.scenario_probabilities(),
+                    )
+                )
+            ],
+            self.workers,
+        )
 
-        while True:
-            z_total = 0
-            x_total_1 = 0
-            x_total_2 = 0
-            x_total_3 = 0
+    def solve(self) -> Result:
+        with self.profile.phase("build"):
+            base_problems = self.build()
 
-            difference = 0
+        with base_problems:
+            return self.iterate(base_problems)
 
-            x_s_1 = []
-            x_s_2 = []
-            x_s_3 = []
+    def iterate(self, base_problems: ShardPool) -> Result:
+        """
+        iterate runs the PHA iterations with the built base problems,
+        they can be reused for another configuration with the same
+        recourse after base_problems.broadcast("update", cfg).
+        """
+        result = self._solve(base_problems, self.cfg.scenario_probabilities())
+        self.profile.work = sum(base_problems.broadcast("work"), Work())
 
-            for base_problem in base_problems:
-                z, x_1, x_2, x_3 = base_problem.solve(
-                    _lambda[base_problem.index], rou, x_hat_1, x_hat_2, x_hat_3
-                )
+        result.profile = self.profile
+        return result
 
-                x_s_1.append(x_1)
-                x_s_2.append(x_2)
-                x_s_3.append(x_3)
-
-                z_total += z
-                x_total_1 += base_problem.probability * x_1
-                x_total_2 += base_problem.probability * x_2
-                x_total_3 += base_problem.probability * x_3
-
-                difference += base_problem.probability * (x_1 - x_hat_1) ** 2
-                difference += base_problem.probability * (x_2 - x_hat_2) ** 2
-                difference += base_problem.probability * (x_3 - x_hat_3) ** 2
-
-            x_hat_1 = x_total_1
-            x_hat_2 = x_total_2
-            x_hat_3 = x_total_3
-
-            for base_problem in base_problems:
-                _lambda[base_problem.index] = (
-                    _lambda[base_problem.index][0]
-                    + rou * (x_s_1[base_problem.index] - x_hat_1),
-                    _lambda[base_problem.index][1]
-                    + rou * (x_s_2[base_problem.index] - x_hat_2),
-                    _lambda[base_problem.index][2]
-                    + rou * (x_s_3[base_problem.index] - x_hat_3),
+    def _solve(
+        self, base_problems: ShardPool, probabilities: np.ndarray
+    ) -> Result:
+        crops = len(self.cfg.crop_arrays())
+        # multipliers and solutions have a row for each scenario
+        _lambda = np.zeros((len(probabilities), crops))
+        rou = np.zeros(crops)
+        x_hat = np.zeros(crops)
+        # iterations in a row that each crop has agreed on its consensus
+        agreed = np.zeros(crops, dtype=int)
+        fixed = np.zeros(crops, dtype=bool)
+        recourse = Recourse(self.cfg)
+        best = Result(math.inf, x_hat)
+        z_lb = -math.inf
+        k = 0
+
+        while True:
+            with self.profile.phase("base_problems"):
+                solutions = base_problems.scatter(
+                    "solve",
+                    [
+                        (_lambda[index], rou, x_hat)
+                        for index in range(len(_lambda))
+                    ],
                 )
 
-            if k == 0:
-                rou = 0.1
-            else:
-                rou = self.rou_transform(rou)
+            z_total = sum(z for z, _ in solutions)
+            x_s = np.array([x for _, x in solutions])
 
-            self.iterations["k"].append(k)
-            self.iterations["x_hat_1"].append(x_hat_1)
-            self.iterations["x_hat_2"].append(x_hat_2)
-            self.iterations["x_hat_3"].append(x_hat_3)
-            self.iterations["rou"].append(rou)
-            self.iterations["z"].append(z_total)
-            self.iterations["difference"].append(difference)
+            difference = float(
+                probabilities @ ((x_s - x_hat) ** 2).sum(axis=1)
+            )
+            x_hat, previous = probabilities @ x_s, x_hat
+
+            with self.profile.phase("update"):
+                _lambda += rou * (x_s - x_hat)
+                rou = self._rou(k, rou, x_s, x_hat, previous, probabilities)
+                if self.fix_after is not None:
+                    distance = np.maximum(
+                        np.abs(x_s - x_hat).max(axis=0),
+                        np.abs(x_hat - previous),
+                    )
+                    agreed = np.where(
+                        distance <= self.fix_tolerance, agreed + 1, 0
+                    )
+                    fixing = (agreed >= self.fix_after) & ~fixed
+                    if fixing.any():
+                        fixed |= fixing
+                        base_problems.broadcast(
+                            "fix", np.flatnonzero(fixing), x_hat[fixing]
+                        )
+
+            row = {"k": k}
+            row.update(crop_columns("x_hat", x_hat))
+            row.update(
+                {
+                    "rou": float(rou.mean()),
+                    "z": z_total,
+                    "difference": difference,
+                    "fixed": int(fixed.sum()),
+                }
+            )
+
+            if self.gap is not None:
+                with self.profile.phase("bounds"):
+                    candidate = self._round(x_hat, recourse)
+                    if candidate.z_star < best.z_star:
+                        best = candidate
+                    if k % self.bound_period == 0:
+                        bound = self._lower_bound(
+                            k, z_total, base_problems, _lambda, probabilities
+                        )
+                        z_lb = max(z_lb, bound)
+                self.profile.bounds(z_lb, best.z_star)
+                row.update(
+                    {
+                        "z_lb": z_lb,
+                        "z_ub": best.z_star,
+                        "gap": self.profile.gap,
+                    }
+                )
+            self.recorder.record(row)
+
+            if self.gap is not None and self.profile.gap <= self.gap:
+                return best
 
-            if math.isclose(difference ** 0.5, 0, abs_tol=self.eplison):
-                return z_total, x_hat_1, x_hat_2, x_hat_3
+            converged = math.isclose(
+                difference ** 0.5, 0, abs_tol=self.eplison
+            )
+            if converged or k + 1 == self.max_iterations:
+                if self.gap is not None:
+                    return best
+                if self.cfg.integer:
+                    return self._round(x_hat, recourse)
+                return Result(z_total, x_hat)
 
             k += 1
+
+    def _rou(
+        self,
+        k: int,
+        rou: np.ndarray,
+        x_s: np.ndarray,
+        x_hat: np.ndarray,
+        previous: np.ndarray,
+        probabilities: np.ndarray,
+    ) -> np.ndarray:
+        """
+        _rou returns the rou of each crop for the next iteration.
+        """
+        if k == 0:
+            if not self.cost_rou:
+                return np.full(len(rou), 0.1)
+            spread = x_s.max(axis=0) - x_s.min(axis=0)
+            weights = self.cfg.crop_arrays().plant_cost / (spread + 1)
+            return 0.1 * weights / weights.mean()
+
+        if self.balance is not None and k % BALANCE_PERIOD == 0:
+            primal = np.sqrt(probabilities @ (x_s - x_hat) ** 2)
+            dual = rou * np.abs(x_hat - previous)
+            rou = np.where(primal > self.balance * dual, 2 * rou, rou)
+            rou = np.where(dual > self.balance * primal, rou / 2, rou)
+        return np.array([self.rou_transform(value) for value in rou])
+
+    def _lower_bound(
+        self,
+        k: int,
+        z_total: float,
+        base_problems: ShardPool,
+        _lambda: np.ndarray,
+        probabilities: np.ndarray,
+    ) -> float:
+        """
+        _lower_bound returns the lagrangian bound of the multipliers,
+        they are shifted so each crop has a zero expectation over
+        the scenarios as the base problems weight them with probabilities.
+        the first iteration has no multipliers and proximal term
+        so its base problems already give the bound.
+        """
+        if k == 0:
+            return z_total
+        _lambda = _lambda - probabilities @ _lambda
+        return sum(
+            base_problems.scatter(
+                "bound", [(_lambda[index],) for index in range(len(_lambda))]
+            )
+        )
+
+    def _round(self, x_hat: np.ndarray, recourse: Recourse) -> Result:
+        """
+        _round returns x_hat and its expected cost, with integer recourse
+        x_hat is rounded and the trades of each scenario are rounded
+        to whole packages.
+        """
+        x = recourse.round_down(x_hat) if self.cfg.integer else x_hat
+        plant_cost = self.cfg.crop_arrays().plant_cost
+
+        return Result(
+            plant_cost @ x + recourse.costs(x) @ recourse.probability, x
+        )
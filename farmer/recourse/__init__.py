@@ -0,0 +1,6 @@
+"""
+Closed form recourse of the farmer problem.
+"""
+
+from .model import Block, add_recourse
+from .recourse import Recourse
@@ -0,0 +1,94 @@
+"""
+Second stage variables and constraints of the farmer problem for models
+that have it, the variables of all crops in all scenarios are added
+as one block so the model size and the build time only depend on
+the number of crops and scenarios.
+for crop c in scenario s with yield Y[c, s] the constraint is
+
+    Y[c, s] * x[c] + sign[c] * t_1[c, s] - t_2[c, s] >= rhs[c]
+
+where for required crops t_1 is the bought and t_2 is the sold weight,
+sign is 1 and rhs is the requirement, and for other crops t_1 is
+the weight sold in the high price up to the demand and t_2 the weight
+sold in the low price, sign is -1 and rhs is zero.
+"""
+
+import dataclasses
+import typing
+
+import numpy as np
+import scipy.sparse as sparse
+
+from farmer.backend import Backend
+from farmer.config import Crops
+
+
+@dataclasses.dataclass
+class Block:
+    """
+    Block is the indices of the second stage variables and constraints,
+    they are ordered by crop and then by scenario.
+    """
+
+    t_1: np.ndarray
+    t_2: np.ndarray
+    constraints: np.ndarray
+
+
+def add_recourse(
+    model: Backend,
+    x: np.ndarray,
+    crops: Crops,
+    yields: np.ndarray,
+    probability: np.ndarray,
+    package: float = 0,
+    penalty: typing.Optional[float] = None,
+) -> Block:
+    """
+    add_recourse adds the second stage of the crops with the given
+    first stage variables (x), yields (a row for each crop) and scenario
+    probabilities to the model. trade variables count packages and are
+    integer when package is positive. when penalty is given each
+    constraint has a slack with this cost so the model is always feasible.
+    """
+    scenarios = len(probability)
+    count = len(crops) * scenarios
+    integer = package > 0
+    package = package if integer else 1
+
+    def spread(values: np.ndarray) -> np.ndarray:
+        # crop values for each of their scenarios
+        return np.repeat(values, scenarios)
+
+    sign = np.where(crops.required, 1.0, -1.0)
+    weight = np.tile(probability, len(crops)) * package
+
+    # sales in the high price are limited by the demand
+    t_1 = model.add_variables(
+        count,
+        ub=spread(np.where(crops.required, np.inf, crops.threshold / package)),
+        obj=spread(sign * crops.price) * weight,
+        integer=integer,
+    )
+    t_2 = model.add_variables(
+        count, obj=-spread(crops.surplus_price) * weight, integer=integer
+    )
+
+    production = sparse.csr_matrix(
+        (yields.ravel(), (np.arange(count), spread(np.arange(len(crops))))),
+        shape=(count, len(crops)),
+    )
+    terms = [
+        (x, production),
+        (t_1, sparse.diags(spread(sign) * package)),
+        (t_2, -package * sparse.identity(count)),
+    ]
+    if penalty is not None:
+        slack = model.add_variables(count, obj=penalty)
+        terms.append((slack, sparse.identity(count)))
+
+    constraints = model.add_constraints(
+        terms, ">", spread(np.where(crops.required, crops.threshold, 0))
+    )
+
+    return Block(t_1, t_2, constraints)
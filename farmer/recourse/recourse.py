@@ -0,0 +1,267 @@
+"""
+Second stage of the farmer problem is separable by crop and scenario
+and each part is a tiny LP with a known solution:
+shortfall of required crops (wheat and corn) is bought and their surplus
+is sold, other crops (beet) are sold in the high price up to their demand
+and then in the low price.
+so for a crop with production P the recourse cost is
+
+    constant + below * min(P, threshold) + above * max(P - threshold, 0)
+
+that is convex and piecewise linear in the planted area.
+Here it is evaluated for all scenarios with numpy instead of gurobi.
+With integer recourse the trades are rounded to whole packages against
+the farmer, so the cost of each scenario is still known but it is not
+convex anymore and only costs and round_down use it, the other methods
+are for the continuous relaxation.
+"""
+
+import typing
+
+import numpy as np
+
+from farmer.backend import Work
+from farmer.config import Config
+
+# packages are counted with this tolerance so a production that fills
+# whole packages up to rounding errors is not a package short
+TOLERANCE = 1e-9
+
+
+class Recourse:
+    """
+    Recourse is a vectorized oracle for the expected recourse cost
+    of the given scenarios (all of them by default) and its subgradient.
+    It has the same solve signature as the benders sub problem.
+    """
+
+    def __init__(
+        self, cfg: Config, scenarios: typing.Optional[typing.List[int]] = None
+    ):
+        self.cfg = cfg
+
+        self.probability = cfg.scenario_probabilities()
+        if scenarios is not None:
+            self.probability = self.probability[scenarios]
+
+        crops = cfg.crop_arrays()
+        self.required = crops.required
+        self.threshold = crops.threshold
+        # cost of producing nothing in a scenario and its expected value
+        # in the given scenarios
+        self.base = np.where(crops.required, crops.price * crops.threshold, 0)
+        self.constant = self.probability.sum() * self.base
+        self.below = -crops.price
+        self.above = -crops.surplus_price
+
+        # produced weight for each unit of area in each scenario,
+        # it is stored by crop so each crop is a contiguous row.
+        self.yields = cfg.yields()
+        if scenarios is not None:
+            self.yields = np.ascontiguousarray(self.yields[:, scenarios])
+        self.expected_yields = self.yields @ self.probability
+
+    def evaluate(self, x: np.ndarray) -> typing.Tuple[np.ndarray, np.ndarray]:
+        """
+        evaluate returns the expected recourse cost and its subgradient
+        for each crop with the given planted areas.
+        the cost is written as constant + below * P + (above - below) * excess
+        so only the excess production needs a pass over the scenarios.
+        """
+        excess = self.yields * x[:, np.newaxis]
+        excess -= self.threshold[:, np.newaxis]
+        np.maximum(excess, 0, out=excess)
+
+        value = (
+            self.constant
+            + self.below * self.expected_yields * x
+            + (self.above - self.below) * (excess @ self.probability)
+        )
+        slope = self.below * self.expected_yields + (
+            self.above - self.below
+        ) * (np.where(excess > 0, self.yields, 0) @ self.probability)
+        return value, slope
+
+    def costs(self, x: np.ndarray) -> np.ndarray:
+        """
+        costs returns the recourse cost of each scenario
+        with the given planted areas.
+        """
+        if self.cfg.integer:
+            return self._integer_costs(x)
+
+        excess = self.yields * x[:, np.newaxis]
+        excess -= self.threshold[:, np.newaxis]
+        np.maximum(excess, 0, out=excess)
+
+        return (
+            self.base.sum()
+            + (self.below * x) @ self.yields
+            + (self.above - self.below) @ excess
+        )
+
+    def _integer_costs(self, x: np.ndarray) -> np.ndarray:
+        # shortfall of required crops is bought in the packages that cover it
+        # and their surplus is sold in the packages that it fills,
+        # other crops are sold in the packages that they fill.
+        package = self.cfg.package
+        production = self.yields * x[:, np.newaxis]
+        threshold = self.threshold[:, np.newaxis]
+
+        shortfall = np.ceil(
+            np.maximum(threshold - production, 0) / package - TOLERANCE
+        )
+        surplus = np.floor(
+            np.maximum(production - threshold, 0) / package + TOLERANCE
+        )
+        sold = np.floor(production / package + TOLERANCE)
+        high = np.minimum(sold, threshold // package)
+
+        required = self.required[:, np.newaxis]
+        below = np.where(required, -shortfall, high)
+        above = np.where(required, surplus, sold - high)
+
+        return package * (self.below @ below + self.above @ above)
+
+    def round_down(self, x: np.ndarray) -> np.ndarray:
+        """
+        round_down returns the largest areas that are not above x and
+        a scenario production or its distance from the requirement
+        is a whole number of packages on them. the integer recourse cost
+        only changes on these points and it is constant between them
+        so rounding down never increases the total cost.
+        """
+        package = self.cfg.package
+        # demands of the crops without a requirement do not change the points
+        offset = np.where(self.required, self.threshold, 0)[:, np.newaxis]
+
+        production = self.yields * x[:, np.newaxis]
+        points = (
+            np.floor((production - offset) / package + TOLERANCE) * package
+            + offset
+        ) / self.yields
+
+        return np.clip(points.max(axis=1), 0, x)
+
+    def solve(self, x: np.ndarray) -> typing.Tuple[float, np.ndarray]:
+        """
+        Solve the recourse with given values for xs,
+        it returns the expected cost and its subgradient.
+        """
+        value, slope = self.evaluate(np.asarray(x, dtype=float))
+
+        return float(value.sum()), slope
+
+    def work(self) -> Work:
+        """
+        work is the LP engine work that is none for the closed form.
+        """
+        return Work()
+
+    def minimize(
+        self, crop: int, cost: float, upper: float
+    ) -> typing.Tuple[float, float]:
+        """
+        minimize finds the area in [0, upper] that minimizes
+        cost * x plus the recourse cost of the given crop.
+        the objective is convex so its minimum is on the first kink
+        (or bound) with a non-negative right derivative,
+        that is found by a binary search over the sorted kinks.
+        """
+        with np.errstate(divide="ignore"):
+            kinks = self.threshold[crop] / self.yields[crop]
+        candidates = np.unique(
+            np.concatenate([[0, upper], kinks[(kinks > 0) & (kinks < upper)]])
+        )
+
+        yields = self.yields[crop]
+        jump = self.above[crop] - self.below[crop]
+
+        def derivative(x: float) -> float:
+            # kinks are compared directly so a scenario is on its higher
+            # slope exactly from its own kink without rounding errors.
+            return (
+                cost
+                + self.below[crop] * self.expected_yields[crop]
+                + jump * (np.where(kinks <= x, yields, 0) @ self.probability)
+            )
+
+        low, high = 0, len(candidates) - 1
+        while low < high:
+            middle = (low + high) // 2
+            if derivative(candidates[middle]) >= 0:
+                high = middle
+            else:
+                low = middle + 1
+
+        x = float(candidates[low])
+        value, _ = self.evaluate_crop(crop, x)
+        return cost * x + value, x
+
+    def breakpoints(
+        self, crop: int, upper: float
+    ) -> typing.Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        breakpoints returns the kinks of the expected recourse cost of
+        the given crop in [0, upper] with the bounds, the cost on them and
+        its right derivative on them that is infinite on upper.
+        the cost is linear between the breakpoints so they describe it
+        completely and are computed once with cumulative sums over
+        the scenarios sorted by their kinks.
+        """
+        yields = self.yields[crop]
+        with np.errstate(divide="ignore"):
+            kinks = self.threshold[crop] / yields
+        order = np.argsort(kinks)
+        kinks = kinks[order]
+
+        # probability and expected yield of the scenarios that
+        # exceed their threshold up to each kink
+        probability = np.concatenate([[0], np.cumsum(self.probability[order])])
+        expected = np.concatenate(
+            [[0], np.cumsum((self.probability * yields)[order])]
+        )
+
+        points = np.unique(
+            np.concatenate([[0, upper], kinks[(kinks > 0) & (kinks < upper)]])
+        )
+        exceeded = np.searchsorted(kinks, points, side="right")
+
+        jump = self.above[crop] - self.below[crop]
+        values = (
+            self.constant[crop]
+            + self.below[crop] * self.expected_yields[crop] * points
+            + jump
+            * (
+                points * expected[exceeded]
+                - self.threshold[crop] * probability[exceeded]
+            )
+        )
+        slopes = (
+            self.below[crop] * self.expected_yields[crop]
+            + jump * expected[exceeded]
+        )
+        slopes[-1] = np.inf
+
+        return points, values, slopes
+
+    def evaluate_crop(self, crop: int, x: float) -> typing.Tuple[float, float]:
+        """
+        evaluate_crop returns the expected recourse cost of the given crop
+        and its subgradient.
+        """
+        yields = self.yields[crop]
+        excess = yields * x
+        excess -= self.threshold[crop]
+        np.maximum(excess, 0, out=excess)
+
+        jump = self.above[crop] - self.below[crop]
+        value = (
+            self.constant[crop]
+            + self.below[crop] * self.expected_yields[crop] * x
+            + jump * (excess @ self.probability)
+        )
+        slope = self.below[crop] * self.expected_yields[crop] + jump * (
+            np.where(excess > 0, yields, 0) @ self.probability
+        )
+        return float(value), float(slope)
@@ -0,0 +1,10 @@
+"""
+Scenario reduction of the farmer problem.
+"""
+
+from .reduction import (
+    Reduction,
+    merge_duplicates,
+    forward_selection,
+    backward_reduction,
+)
@@ -0,0 +1,179 @@
+"""
+Scenario reduction replaces the scenarios with a few of them that
+carry the probabilities of the removed ones.
+the distance of the reduced distribution from the original one is the
+Kantorovich distance with the euclidean distance of the yield deviations,
+every removed scenario moves its probability to the closest kept one.
+distances between all pairs of scenarios are kept in memory
+so it is meant for thousands of scenarios, not millions.
+"""
+
+import dataclasses
+import typing
+
+import numpy as np
+import scipy.spatial.distance as distance
+
+from farmer.config import Config
+
+
+@dataclasses.dataclass
+class Reduction:
+    """
+    Reduction is the reduced configuration, its distance from the original
+    one and the original index of each of its scenarios.
+    """
+
+    cfg: Config
+    distance: float
+    representatives: np.ndarray
+
+
+def merge_duplicates(cfg: Config) -> Reduction:
+    """
+    merge_duplicates merges the equal scenarios into their first one
+    and adds up their probabilities.
+    """
+    _, first, inverse = np.unique(
+        np.asarray(cfg.scenarios, dtype=float),
+        axis=0,
+        return_index=True,
+        return_inverse=True,
+    )
+    order = np.argsort(first)
+    probabilities = np.bincount(
+        inverse.ravel(), weights=cfg.scenario_probabilities()
+    )
+
+    return Reduction(
+        dataclasses.replace(
+            cfg,
+            scenarios=np.asarray(cfg.scenarios, dtype=float)[first[order]],
+            probabilities=probabilities[order],
+        ),
+        0.0,
+        first[order],
+    )
+
+
+def _redistribute(
+    merged: Reduction, distances: np.ndarray, kept: np.ndarray
+) -> Reduction:
+    # each scenario gives its probability to its closest kept scenario,
+    # distances has a zero diagonal so kept ones keep their own.
+    kept = np.sort(kept)
+    closest = np.argmin(distances[:, kept], axis=1)
+    probabilities = merged.cfg.scenario_probabilities()
+    nearest = distances[np.arange(len(closest)), kept[closest]]
+
+    return Reduction(
+        dataclasses.replace(
+            merged.cfg,
+            scenarios=np.asarray(merged.cfg.scenarios, dtype=float)[kept],
+            probabilities=np.bincount(
+                closest, weights=probabilities, minlength=len(kept)
+            ),
+        ),
+        float(probabilities @ nearest),
+        merged.representatives[kept],
+    )
+
+
+def forward_selection(
+    cfg: Config,
+    count: typing.Optional[int] = None,
+    tolerance: typing.Optional[float] = None,
+) -> Reduction:
+    """
+    forward_selection selects scenarios one by one, each time the one
+    that reduces the distance the most, until there are count of them
+    or the distance is at most tolerance (when it is given).
+    it is the faster choice when only a few scenarios are kept.
+    """
+    merged = merge_duplicates(cfg)
+    probabilities = merged.cfg.scenario_probabilities()
+    distances = distance.cdist(
+        merged.cfg.deviations(), merged.cfg.deviations()
+    )
+
+    size = len(probabilities)
+    count = size if count is None else min(max(count, 1), size)
+
+    # distance of each scenario from its closest selected scenario
+    nearest = np.full(size, np.inf)
+    selected = np.zeros(size, dtype=bool)
+    kept: typing.List[int] = []
+
+    while len(kept) < count:
+        candidates = np.flatnonzero(~selected)
+        # selected scenarios are at zero distance so only the others count
+        z = probabilities @ np.minimum(
+            nearest[:, np.newaxis], distances[:, candidates]
+        )
+        best = int(candidates[np.argmin(z)])
+
+        kept.append(best)
+        selected[best] = True
+        nearest = np.minimum(nearest, distances[:, best])
+
+        if tolerance is not None and probabilities @ nearest <= tolerance:
+            break
+
+    return _redistribute(merged, distances, np.array(kept))
+
+
+def backward_reduction(
+    cfg: Config,
+    count: typing.Optional[int] = None,
+    tolerance: typing.Optional[float] = None,
+) -> Reduction:
+    """
+    backward_reduction removes scenarios one by one, each time the one
+    that increases the distance the least, while there are more than
+    count of them and the distance stays at most tolerance
+    (when it is given).
+    it is the faster choice when only a few scenarios are removed.
+    """
+    merged = merge_duplicates(cfg)
+    probabilities = merged.cfg.scenario_probabilities()
+    distances = distance.cdist(
+        merged.cfg.deviations(), merged.cfg.deviations()
+    )
+
+    size = len(probabilities)
+    count = 1 if count is None else min(max(count, 1), size)
+
+    # a kept scenario is never the closest kept one of itself
+    np.fill_diagonal(distances, np.inf)
+    kept = np.ones(size, dtype=bool)
+    rows = np.arange(size)
+
+    while kept.sum() > count:
+        columns = np.flatnonzero(kept)
+        order = np.argpartition(distances[:, columns], 1, axis=1)
+        first = distances[rows, columns[order[:, 0]]]
+        second = distances[rows, columns[order[:, 1]]]
+
+        # removing l moves the removed scenarios that are closest to it
+        # to their second closest kept scenario and moves l itself
+        # to its closest kept scenario.
+        removed = ~kept
+        z = (
+            probabilities[removed] @ first[removed]
+            + np.bincount(
+                columns[order[removed, 0]],
+                weights=probabilities[removed]
+                * (second[removed] - first[removed]),
+                minlength=size,
+            )
+            + probabilities * np.where(kept, first, 0)
+        )
+        z[removed] = np.inf
+
+        worst = int(np.argmin(z))
+        if tolerance is not None and z[worst] > tolerance:
+            break
+        kept[worst] = False
+
+    np.fill_diagonal(distances, 0)
+    return _redistribute(merged, distances, np.flatnonzero(kept))
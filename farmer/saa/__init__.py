@@ -0,0 +1,6 @@
+"""
+Sample average approximation of the farmer problem.
+"""
+
+from .generator import Generator, NormalYields
+from .saa import SAA, Estimate, Bounds
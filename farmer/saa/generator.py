@@ -0,0 +1,47 @@
+"""
+Scenario generators draw yield deviations of the crops.
+Draws are arrays with a row for each scenario and a column for each crop
+so they can be used as Config.scenarios directly.
+"""
+
+import abc
+import dataclasses
+import typing
+
+import numpy as np
+
+
+class Generator(abc.ABC):
+    @abc.abstractmethod
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        """
+        sample draws deviations of size scenarios.
+        """
+
+
+@dataclasses.dataclass
+class NormalYields(Generator):
+    """
+    NormalYields draws correlated normal deviations for the crops,
+    they are wheat, corn and beet by default.
+    deviations are clipped at -1 so yields never become negative.
+    """
+
+    mean: typing.Sequence[float] = (0.0, 0.0, 0.0)
+    std: typing.Sequence[float] = (0.1, 0.1, 0.1)
+    correlation: typing.Sequence[typing.Sequence[float]] = (
+        (1.0, 0.0, 0.0),
+        (0.0, 1.0, 0.0),
+        (0.0, 0.0, 1.0),
+    )
+
+    def sample(self, size: int, rng: np.random.Generator) -> np.ndarray:
+        # covariance is diag(std) @ correlation @ diag(std)
+        std = np.asarray(self.std, dtype=float)
+        factor = std[:, np.newaxis] * np.linalg.cholesky(
+            np.asarray(self.correlation, dtype=float)
+        )
+
+        draws = rng.standard_normal((size, len(std))) @ factor.T
+        draws += np.asarray(self.mean, dtype=float)
+        return np.maximum(draws, -1)
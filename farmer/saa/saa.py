@@ -0,0 +1,194 @@
+"""
+Sample average approximation with statistical bounds.
+The SAA problem is solved on independent samples (replications)
+with any of the solvers, the mean of their optimal values is
+a lower bound estimator and the cost of a candidate solution on
+a large independent sample is an upper bound estimator.
+"""
+
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import typing
+
+import numpy as np
+import scipy.stats
+
+from farmer.config import Config
+from farmer.recourse import Recourse
+from farmer.solver import Solver, Result
+
+from .generator import Generator
+
+
+@dataclasses.dataclass
+class Estimate:
+    """
+    Estimate is a sample mean with its standard error and
+    its one-sided confidence interval.
+    """
+
+    mean: float
+    std: float
+    lower: float
+    upper: float
+
+
+@dataclasses.dataclass
+class Bounds:
+    """
+    Bounds of the optimal value with a given sample size.
+    gap is the conservative optimality gap of x.
+    """
+
+    size: int
+    lower: Estimate
+    upper: Estimate
+    gap: float
+    x: typing.Tuple[float, ...]
+
+
+def _solve(solver: typing.Callable[[Config], Solver], cfg: Config) -> Result:
+    return solver(cfg).solve()
+
+
+def _project(x: typing.Sequence[float], area: float) -> np.ndarray:
+    """
+    _project returns the closest areas to x that are non-negative and
+    sum up to at most area. when x plants more than area they are
+    x - theta clipped at zero with the theta that they sum up to area.
+    """
+    x = np.maximum(np.asarray(x, dtype=float), 0)
+    if x.sum() <= area:
+        return x
+
+    descending = np.sort(x)[::-1]
+    excess = np.cumsum(descending) - area
+    count = np.flatnonzero(
+        descending > excess / np.arange(1, len(descending) + 1)
+    )[-1]
+    return np.maximum(x - excess[count] / (count + 1), 0)
+
+
+class SAA:
+    """
+    SAA solves replications of the problem with solver(cfg) where
+    cfg has the sampled scenarios. the solver optimal value must be
+    the SAA optimal value.
+    replications are solved in the given number of worker processes
+    or in the current one when it is zero.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        generator: Generator,
+        solver: typing.Callable[[Config], Solver],
+        replications: int = 10,
+        evaluation_size: int = 100 * 1000,
+        confidence: float = 0.95,
+        workers: int = 0,
+        seed: int = 0,
+    ):
+        self.cfg = cfg
+        self.generator = generator
+        self.solver = solver
+        self.replications = replications
+        self.evaluation_size = evaluation_size
+        self.confidence = confidence
+        self.workers = workers
+        self.rng = np.random.default_rng(seed)
+
+    def sample(self, size: int) -> Config:
+        """
+        sample returns the configuration with size sampled scenarios.
+        """
+        return dataclasses.replace(
+            self.cfg,
+            scenarios=self.generator.sample(size, self.rng),
+            probabilities=[],
+        )
+
+    def replicate(self, size: int) -> typing.List[Result]:
+        """
+        replicate solves the SAA problem on independent samples.
+        """
+        cfgs = [self.sample(size) for _ in range(self.replications)]
+
+        if self.workers <= 0:
+            return [_solve(self.solver, cfg) for cfg in cfgs]
+
+        with concurrent.futures.ProcessPoolExecutor(
+            max_workers=self.workers,
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            return list(executor.map(_solve, [self.solver] * len(cfgs), cfgs))
+
+    def lower_bound(self, results: typing.List[Result]) -> Estimate:
+        """
+        lower_bound estimates the optimal value lower bound from
+        the replications optimal values.
+        """
+        values = np.array([result.z_star for result in results])
+        mean = float(values.mean())
+        std = float(values.std(ddof=1) / np.sqrt(len(values)))
+        width = (
+            float(scipy.stats.t.ppf(self.confidence, len(values) - 1)) * std
+        )
+
+        return Estimate(mean, std, mean - width, mean + width)
+
+    def costs(
+        self, x: typing.Sequence[float], recourse: Recourse
+    ) -> np.ndarray:
+        """
+        costs returns the total cost of x in each scenario of the recourse.
+        """
+        x = np.asarray(x, dtype=float)
+        plant_cost = self.cfg.crop_arrays().plant_cost
+
+        return plant_cost @ x + recourse.costs(x)
+
+    def upper_bound(self, x: typing.Sequence[float]) -> Estimate:
+        """
+        upper_bound estimates the cost of x on a new independent sample
+        that is an upper bound of the optimal value.
+        """
+        costs = self.costs(x, Recourse(self.sample(self.evaluation_size)))
+        mean = float(costs.mean())
+        std = float(costs.std(ddof=1) / np.sqrt(len(costs)))
+        width = float(scipy.stats.norm.ppf(self.confidence)) * std
+
+        return Estimate(mean, std, mean - width, mean + width)
+
+    def solve(self, size: int) -> Bounds:
+        """
+        solve estimates the bounds with the given sample size.
+        the candidate solution is the replication solution with the least
+        cost on a screening sample and it is evaluated on another one.
+        replication solutions that plant more than the area are
+        projected on it first so the candidate is always feasible.
+        """
+        results = self.replicate(size)
+        lower = self.lower_bound(results)
+
+        screening = Recourse(self.sample(self.evaluation_size))
+        candidates = [_project(result.x, self.cfg.area) for result in results]
+        x = min(candidates, key=lambda x: self.costs(x, screening).mean())
+        upper = self.upper_bound(x)
+
+        return Bounds(
+            size, lower, upper, upper.upper - lower.lower, tuple(x.tolist())
+        )
+
+    def select(self, sizes: typing.Sequence[int], gap: float) -> Bounds:
+        """
+        select returns the bounds of the smallest sample size that
+        its relative gap is at most the given gap,
+        or the bounds of the largest one.
+        """
+        for size in sorted(sizes):
+            bounds = self.solve(size)
+            if bounds.gap <= gap * abs(bounds.upper.mean):
+                break
+        return bounds
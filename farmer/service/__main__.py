@@ -0,0 +1,43 @@
+"""
+Runs the solve service on localhost, for example:
+
+    python -m farmer.service --port 8750 --workers 4 --backend highs
+
+each line that is sent to it is a JSON job like
+{"id": 1, "method": "benders", "config": {"scenarios": [0.2, 0, -0.2]}}
+and the progress and result of each job are sent back as JSON lines.
+"""
+
+import argparse
+import asyncio
+
+from .service import Service, serve
+
+
+async def _main(args: argparse.Namespace):
+    async with Service(
+        args.workers, args.backend, args.delay, args.batch_size, args.capacity
+    ) as service:
+        print(f"listening on {args.host}:{args.port}", flush=True)
+        await serve(service, args.host, args.port)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8750)
+    parser.add_argument("--workers", type=int, default=2)
+    parser.add_argument("--backend", default="highs")
+    parser.add_argument("--delay", type=float, default=0.005)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--capacity", type=int, default=8)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(_main(args))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()
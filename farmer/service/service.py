@@ -0,0 +1,389 @@
+"""
+Local solve service. jobs are queued and the jobs that arrive together
+and share a method, options and recourse are sent as one batch to
+a worker process that keeps the models it has built for their recourse,
+so a job only updates plant costs and the area of warm models.
+progress rows and results are streamed back to each job.
+"""
+
+import asyncio
+import dataclasses
+import itertools
+import json
+import multiprocessing
+import threading
+import typing
+
+from farmer.config import Config
+from farmer.solver.pool import split
+from farmer.sweep import order
+
+from . import worker
+
+Message = typing.Dict[str, typing.Any]
+
+
+@dataclasses.dataclass
+class Job:
+    """
+    Job is a configuration to solve with the method, that is "benders",
+    "lagrange" or "pha", and its options.
+    """
+
+    method: str
+    cfg: Config
+    options: typing.Dict[str, typing.Any] = dataclasses.field(
+        default_factory=dict
+    )
+
+    def key(self) -> str:
+        """
+        key is the same for the jobs that can be solved on the same models,
+        jobs of warm methods only need the same recourse and other jobs
+        need the same configuration.
+        """
+        if self.method in worker.WARM:
+            digest = self.cfg.recourse_digest()
+        else:
+            digest = self.cfg.digest()
+        options = json.dumps(self.options, sort_keys=True, default=repr)
+        return f"{self.method}-{digest}-{options}"
+
+
+class Service:
+    """
+    Service solves jobs in the given number of worker processes with
+    the given backend. jobs that arrive within delay seconds of the first
+    one are batched, up to batch_size jobs, and jobs with the same
+    configuration in a batch are solved once.
+    a batch goes to the least busy worker that has its models and to
+    an idle worker when they are all busy, each worker keeps the models
+    of its last capacity keys.
+    when a worker process dies its jobs get an error message and
+    it is replaced by a new worker.
+    """
+
+    def __init__(
+        self,
+        workers: int = 2,
+        backend: str = "gurobi",
+        delay: float = 0.005,
+        batch_size: int = 64,
+        capacity: int = 8,
+    ):
+        self.workers = workers
+        self.backend = backend
+        self.delay = delay
+        self.batch_size = batch_size
+        self.capacity = capacity
+
+        self.counter = itertools.count()
+        self.streams: typing.Dict[int, asyncio.Queue] = {}
+        self.load = [0] * workers
+        # ids of the jobs that were sent to each worker and have no
+        # result or error yet
+        self.pending: typing.List[typing.Set[int]] = [
+            set() for _ in range(workers)
+        ]
+        self.affinity: typing.Dict[str, typing.List[int]] = {}
+
+        self.connections: typing.List[typing.Any] = []
+        self.processes: typing.List[multiprocessing.Process] = []
+        self.tasks: typing.List[asyncio.Future] = []
+
+    async def start(self):
+        """
+        start starts the worker processes and the batching of jobs.
+        """
+        self.loop = asyncio.get_event_loop()
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.outboxes: typing.List[asyncio.Queue] = [
+            asyncio.Queue() for _ in range(self.workers)
+        ]
+        self.senders: typing.List[asyncio.Future] = []
+        self.closing = False
+
+        for index in range(self.workers):
+            self._spawn(index)
+
+        self.tasks.append(asyncio.ensure_future(self._batch()))
+
+    def _spawn(self, index: int):
+        # gurobi environments must not be shared with forked children
+        context = multiprocessing.get_context("spawn")
+        parent, child = context.Pipe()
+        process = context.Process(
+            target=worker.run,
+            args=(child, self.backend, self.capacity),
+            daemon=True,
+        )
+        process.start()
+        sender = asyncio.ensure_future(
+            self._send(parent, self.outboxes[index])
+        )
+        if index < len(self.processes):
+            self.connections[index] = parent
+            self.processes[index] = process
+            self.senders[index] = sender
+        else:
+            self.connections.append(parent)
+            self.processes.append(process)
+            self.senders.append(sender)
+        threading.Thread(
+            target=self._receive, args=(index, parent), daemon=True
+        ).start()
+
+    def _restart(self, index: int, connection):
+        """
+        _restart fails the jobs that were sent to a worker that died
+        and replaces it with a new worker without models.
+        """
+        if self.closing or self.connections[index] is not connection:
+            return
+
+        self.senders[index].cancel()
+        connection.close()
+        self.processes[index].kill()
+        self.processes[index].join()
+
+        ids = list(self.pending[index])
+        self.pending[index].clear()
+        self.load[index] = 0
+        for warm in self.affinity.values():
+            if index in warm:
+                warm.remove(index)
+        # batches that were queued for the dead worker are failed too
+        self.outboxes[index] = asyncio.Queue()
+        self._deliver(-1, ("error", ids, "the worker process died"))
+
+        self._spawn(index)
+
+    async def close(self):
+        """
+        close stops the workers after their queued batches.
+        """
+        self.closing = True
+        for outbox in self.outboxes:
+            await outbox.put(None)
+        for task in self.tasks:
+            task.cancel()
+        await asyncio.gather(
+            *self.senders, *self.tasks, return_exceptions=True
+        )
+        for process in self.processes:
+            await self.loop.run_in_executor(None, process.join)
+        self.senders = []
+        self.tasks = []
+        self.processes = []
+
+    async def __aenter__(self) -> "Service":
+        await self.start()
+        return self
+
+    async def __aexit__(self, *_):
+        await self.close()
+
+    async def submit(self, job: Job) -> typing.AsyncIterator[Message]:
+        """
+        submit queues the job and yields its progress messages,
+        that have the recorded row, until its result or error message.
+        """
+        index = next(self.counter)
+        stream: asyncio.Queue = asyncio.Queue()
+        self.streams[index] = stream
+        await self.queue.put((index, job))
+
+        try:
+            while True:
+                message = await stream.get()
+                yield message
+                if message["type"] != "progress":
+                    return
+        finally:
+            self.streams.pop(index, None)
+
+    async def solve(self, job: Job) -> Message:
+        """
+        solve returns the result or error message of the job.
+        """
+        message: Message = {}
+        async for message in self.submit(job):
+            pass
+        return message
+
+    async def _batch(self):
+        while True:
+            jobs = [await self.queue.get()]
+            deadline = self.loop.time() + self.delay
+            while len(jobs) < self.batch_size:
+                timeout = deadline - self.loop.time()
+                try:
+                    if timeout > 0:
+                        jobs.append(
+                            await asyncio.wait_for(self.queue.get(), timeout)
+                        )
+                    else:
+                        jobs.append(self.queue.get_nowait())
+                except (asyncio.TimeoutError, asyncio.QueueEmpty):
+                    break
+
+            # a job that cannot be batched only fails itself
+            # pylint: disable=broad-except
+            groups: typing.Dict[str, typing.List[typing.Tuple[int, Job]]] = {}
+            for index, job in jobs:
+                try:
+                    key = job.key()
+                except Exception as error:
+                    self._deliver(-1, ("error", [index], repr(error)))
+                    continue
+                groups.setdefault(key, []).append((index, job))
+            for key, members in groups.items():
+                try:
+                    await self._dispatch(key, members)
+                except Exception as error:
+                    ids = [index for index, _ in members]
+                    self._deliver(-1, ("error", ids, repr(error)))
+
+    async def _dispatch(
+        self, key: str, members: typing.List[typing.Tuple[int, Job]]
+    ):
+        tasks: typing.Dict[str, worker.Task] = {}
+        for index, job in members:
+            digest = job.cfg.digest()
+            if digest not in tasks:
+                tasks[digest] = ([], job.method, job.cfg, job.options)
+            tasks[digest][0].append(index)
+
+        batch = list(tasks.values())
+        if batch[0][1] in worker.WARM:
+            batch = [batch[i] for i in order([task[2] for task in batch])]
+
+        # the batch is split between the idle workers that have its
+        # models, it goes to the least busy one of them when they are all
+        # busy and to the least busy worker when none of them has them.
+        warm = self.affinity.setdefault(key, [])
+        chosen = [i for i in warm if self.load[i] == 0][: len(batch)]
+        if not chosen:
+            chosen = [
+                min(warm or range(self.workers), key=lambda i: self.load[i])
+            ]
+            if self.load[chosen[0]] > 0:
+                idle = min(range(self.workers), key=lambda i: self.load[i])
+                if self.load[idle] == 0:
+                    chosen = [idle]
+
+        for index, part in zip(chosen, split(batch, len(chosen))):
+            if index not in warm:
+                warm.append(index)
+            self.load[index] += 1
+            for task in part:
+                self.pending[index].update(task[0])
+            await self.outboxes[index].put((key, part))
+
+    async def _send(self, connection, outbox: asyncio.Queue):
+        # sends are blocking so they run in threads in order
+        while True:
+            message = await outbox.get()
+            await self.loop.run_in_executor(None, connection.send, message)
+            if message is None:
+                return
+
+    def _receive(self, index: int, connection):
+        while True:
+            try:
+                message = connection.recv()
+            except (EOFError, OSError):
+                if self.closing:
+                    return
+                # the worker died, messages that it sent before
+                # are delivered first
+                self.loop.call_soon_threadsafe(
+                    self._restart, index, connection
+                )
+                return
+            self.loop.call_soon_threadsafe(self._deliver, index, message)
+
+    def _deliver(self, index: int, message: typing.Tuple):
+        kind, ids, payload = message
+        if kind == "done":
+            self.load[index] -= 1
+            return
+
+        if kind != "progress" and index >= 0:
+            self.pending[index].difference_update(ids)
+
+        if kind == "progress":
+            content = {"type": kind, "row": payload}
+        elif kind == "result":
+            content = {"type": kind, **payload}
+        else:
+            content = {"type": kind, "error": payload}
+
+        for job in ids:
+            stream = self.streams.get(job)
+            if stream is not None:
+                stream.put_nowait(content)
+
+
+async def serve(service: Service, host: str = "127.0.0.1", port: int = 8750):
+    """
+    serve accepts JSON lines of jobs on the address, each job has an id,
+    a method, a config that is given to Config.from_dict and options.
+    the messages of each job are written back as JSON lines with its id.
+    """
+
+    async def handle(
+        reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ):
+        lock = asyncio.Lock()
+        streams = []
+
+        async def write(message: Message):
+            async with lock:
+                writer.write(
+                    json.dumps(message, default=float).encode() + b"\n"
+                )
+                await writer.drain()
+
+        async def stream(request: Message):
+            try:
+                job = Job(
+                    request["method"],
+                    Config.from_dict(request.get("config", {})),
+                    request.get("options", {}),
+                )
+            except (AttributeError, KeyError, TypeError, ValueError) as error:
+                await write(
+                    {
+                        "id": request.get("id"),
+                        "type": "error",
+                        "error": repr(error),
+                    }
+                )
+                return
+            async for message in service.submit(job):
+                await write({"id": request.get("id"), **message})
+
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+                if not isinstance(request, dict):
+                    raise TypeError("a job must be a JSON object")
+            except (TypeError, ValueError) as error:
+                await write(
+                    {"id": None, "type": "error", "error": repr(error)}
+                )
+                continue
+            streams.append(asyncio.ensure_future(stream(request)))
+
+        await asyncio.gather(*streams)
+        writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    async with server:
+        await server.serve_forever()
@@ -0,0 +1,144 @@
+"""
+Worker process of the solve service. it keeps the models of the last
+recourses that it has solved so a job with the same scenarios and recourse
+only updates the plant costs and the area of the built models.
+"""
+
+import collections
+import multiprocessing.connection
+import time
+import typing
+
+from farmer.config import Config
+from farmer.solver import Recorder, Solver, create
+
+# ids of the jobs with the configuration, their method, configuration
+# and options
+Task = typing.Tuple[
+    typing.List[int], str, Config, typing.Dict[str, typing.Any]
+]
+
+# methods that keep their models between jobs with the same recourse
+WARM = ("benders", "pha")
+
+
+class Models:
+    """
+    Models keeps the built models of the last capacity keys and
+    closes the least recently used ones.
+    """
+
+    def __init__(self, capacity: int):
+        self.capacity = capacity
+        self.models: typing.OrderedDict[str, typing.Any] = (
+            collections.OrderedDict()
+        )
+
+    def get(self, key: str) -> typing.Any:
+        if key not in self.models:
+            return None
+        self.models.move_to_end(key)
+        return self.models[key]
+
+    def put(self, key: str, models: typing.Any):
+        self.models[key] = models
+        while len(self.models) > self.capacity:
+            _, evicted = self.models.popitem(last=False)
+            _close(evicted)
+
+    def drop(self, key: str):
+        if key in self.models:
+            _close(self.models.pop(key))
+
+
+def _close(models: typing.Any):
+    # benders keeps a master problem and a pool and PHA only a pool
+    pool = models[1] if isinstance(models, tuple) else models
+    pool.close()
+
+
+def _iterate(method: str, solver: Solver, models: typing.Any):
+    if method == "benders":
+        master_problem, sub_problems = models
+        master_problem.update(solver.cfg)
+        return solver.iterate(master_problem, sub_problems)
+    models.broadcast("update", solver.cfg)
+    return solver.iterate(models)
+
+
+def _solve(
+    connection: multiprocessing.connection.Connection,
+    key: str,
+    task: Task,
+    backend: str,
+    models: Models,
+    size: int,
+):
+    ids, method, cfg, options = task
+    recorder = Recorder(
+        capacity=0,
+        callbacks=[lambda row: connection.send(("progress", ids, row))],
+    )
+    start = time.perf_counter()
+    # the service runs a job in one process
+    options = {
+        name: value for name, value in options.items() if name != "workers"
+    }
+    solver = create(method, cfg, backend, options, recorder)
+
+    warm = method in WARM and models.get(key) is not None
+    if method not in WARM:
+        result = solver.solve()
+    else:
+        if not warm:
+            models.put(key, solver.build())
+        result = _iterate(method, solver, models.get(key))
+
+    profile = result.profile
+    connection.send(
+        (
+            "result",
+            ids,
+            {
+                "z_star": result.z_star,
+                "x": list(result.x),
+                "lower_bound": profile.lower_bound if profile else None,
+                "upper_bound": profile.upper_bound if profile else None,
+                "iterations": recorder.count,
+                "warm": warm,
+                "batch": size,
+                "time": time.perf_counter() - start,
+            },
+        )
+    )
+
+
+def run(
+    connection: multiprocessing.connection.Connection,
+    backend: str,
+    capacity: int,
+):
+    """
+    run solves the batches of tasks that it receives until it receives
+    None. a batch is a key and tasks with the same recourse in the order
+    that they are solved, progress rows, results and errors are sent back
+    with the ids of their jobs and done is sent when the batch is solved.
+    """
+    models = Models(capacity)
+    while True:
+        message = connection.recv()
+        if message is None:
+            break
+
+        key, tasks = message
+        for task in tasks:
+            try:
+                _solve(connection, key, task, backend, models, len(tasks))
+            except Exception as exception:  # pylint: disable=broad-except
+                # a failed run may leave its models in any state
+                models.drop(key)
+                connection.send(("error", task[0], repr(exception)))
+        connection.send(("done", key, None))
+
+    for key in list(models.models):
+        models.drop(key)
@@ -1,2 +1,6 @@
 from .result import Result
 from .solver import Solver
+from .recorder import Recorder, CSVWriter, crop_columns
+from .profile import Profile
+from .cache import Cache, key
+from .factory import METHODS, create
@@ -0,0 +1,235 @@
+"""
+Cache of solver results on disk. results are addressed by a hash of the
+solver type, its configuration and its parameters so a solver that is
+created again with the same data returns the stored result and replays
+the stored iterations into its recorder instead of solving.
+"""
+
+import collections
+import dataclasses
+import functools
+import hashlib
+import os
+import types
+import typing
+
+import numpy as np
+
+from farmer.config import Config
+
+from .profile import Profile
+from .result import Result
+from .solver import Solver
+
+# solver attributes that change how a result is found but not which one
+EXCLUDED = ("recorder", "profile", "workers", "cut_store")
+
+# values that are hashed with their repr
+STABLE = (bool, int, float, complex, str, bytes, np.generic)
+
+Entry = typing.Tuple[Result, typing.Dict[str, np.ndarray]]
+
+
+def _update(digest, value):
+    # values are written with their type so 1 and 1.0 or
+    # a list and a tuple of the same items have different keys
+    digest.update(type(value).__qualname__.encode())
+    if isinstance(value, Config):
+        digest.update(value.digest().encode())
+    elif dataclasses.is_dataclass(value):
+        for field in dataclasses.fields(value):
+            digest.update(field.name.encode())
+            _update(digest, getattr(value, field.name))
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode())
+            _update(digest, value[key])
+    elif isinstance(value, (set, frozenset)):
+        _update(digest, sorted(value, key=repr))
+    elif isinstance(value, (list, tuple)):
+        digest.update(str(len(value)).encode())
+        for item in value:
+            _update(digest, item)
+    elif isinstance(value, np.ndarray):
+        array = np.ascontiguousarray(value)
+        digest.update(f"{array.dtype.str}{array.shape}".encode())
+        digest.update(array.tobytes())
+    elif isinstance(value, functools.partial):
+        _update(digest, value.func)
+        _update(digest, list(value.args))
+        _update(digest, dict(value.keywords))
+    elif isinstance(value, types.CodeType):
+        digest.update(value.co_code)
+        _update(digest, list(value.co_consts))
+        _update(digest, list(value.co_names))
+    elif isinstance(value, types.FunctionType):
+        # functions like rou_transform are hashed with their code,
+        # defaults and captured values
+        _update(digest, value.__code__)
+        _update(digest, list(value.__defaults__ or ()))
+        _update(digest, dict(value.__kwdefaults__ or {}))
+        _update(
+            digest, [cell.cell_contents for cell in value.__closure__ or ()]
+        )
+    elif value is None or isinstance(value, STABLE):
+        digest.update(repr(value).encode())
+    else:
+        # other objects may have an address in their repr
+        raise TypeError(f"{type(value).__qualname__} has no stable hash")
+
+
+def key(solver: Solver) -> str:
+    """
+    key returns the address of the solver result, it is computed
+    from the solver attributes so it is only stable before solving.
+    it raises TypeError on attributes that have no stable hash
+    between processes.
+    """
+    digest = hashlib.sha256()
+    _update(
+        digest,
+        {
+            name: value
+            for name, value in vars(solver).items()
+            if name not in EXCLUDED
+        },
+    )
+    return f"{type(solver).__qualname__}-{digest.hexdigest()}"
+
+
+class Cache:
+    """
+    Cache keeps the results with their iterations as files in the given
+    directory and removes the least recently used ones when they are
+    larger than max_size bytes. the last memory entries are also kept
+    in memory so repeated requests in a process do not read files.
+    hits and misses count the solves that were and were not cached.
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        max_size: int = 256 * 1024 * 1024,
+        memory: int = 128,
+    ):
+        self.directory = directory
+        self.max_size = max_size
+        self.memory = memory
+        os.makedirs(directory, exist_ok=True)
+
+        self.entries: typing.OrderedDict[str, Entry] = (
+            collections.OrderedDict()
+        )
+        self.hits = 0
+        self.misses = 0
+
+    def path(self, address: str) -> str:
+        return os.path.join(self.directory, f"{address}.npz")
+
+    def solve(self, solver: Solver) -> Result:
+        """
+        solve returns the cached result of the solver or solves and caches
+        it. on a hit the cached iterations are recorded with the solver
+        recorder and the cached bounds are set on its profile.
+        """
+        address = key(solver)
+        entry = self._get(address)
+        if entry is None:
+            self.misses += 1
+            result = solver.solve()
+            self._put(address, (result, solver.iterations))
+            return result
+
+        self.hits += 1
+        cached, columns = entry
+        names = list(columns)
+        for values in zip(*columns.values()):
+            solver.recorder.record(
+                dict(zip(names, (float(value) for value in values)))
+            )
+        profile = cached.profile
+        if profile is not None:
+            solver.profile.bounds(profile.lower_bound, profile.upper_bound)
+        return Result(cached.z_star, cached.x, solver.profile)
+
+    def _remember(self, address: str, entry: Entry):
+        self.entries[address] = entry
+        self.entries.move_to_end(address)
+        while len(self.entries) > self.memory:
+            self.entries.popitem(last=False)
+
+    def _get(self, address: str) -> typing.Optional[Entry]:
+        if address in self.entries:
+            self.entries.move_to_end(address)
+            return self.entries[address]
+
+        path = self.path(address)
+        try:
+            with np.load(path) as data:
+                result = Result(data["z_star"], data["x"], Profile())
+                result.profile.bounds(*data["bounds"])
+                columns = dict(zip(data["names"], data["rows"].T))
+            # the access time is the modification time for eviction
+            os.utime(path)
+        except (OSError, ValueError, KeyError):
+            return None
+
+        entry = (result, columns)
+        self._remember(address, entry)
+        return entry
+
+    def _put(self, address: str, entry: Entry):
+        result, columns = entry
+        bounds = [-np.inf, np.inf]
+        if result.profile is not None:
+            bounds = [result.profile.lower_bound, result.profile.upper_bound]
+        # a disabled recorder has no columns
+        rows = np.empty((0, 0))
+        if columns:
+            rows = np.array(list(columns.values()), dtype=float)
+
+        path = self.path(address)
+        temporary = f"{path}.{os.getpid()}.tmp"
+        with open(temporary, "wb") as file:
+            np.savez(
+                file,
+                z_star=result.z_star,
+                x=np.array(result.x),
+                bounds=np.array(bounds, dtype=float),
+                names=np.array(list(columns), dtype=str),
+                rows=rows.T,
+            )
+        os.replace(temporary, path)
+
+        self._remember(address, entry)
+        self._evict()
+
+    def _evict(self):
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".npz"):
+                continue
+            try:
+                stat = os.stat(os.path.join(self.directory, name))
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, name))
+
+        size = sum(file_size for _, file_size, _ in files)
+        for _, file_size, name in sorted(files):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(os.path.join(self.directory, name))
+            except OSError:
+                pass
+            size -= file_size
+
+    @property
+    def size(self) -> int:
+        """
+        size is the number of cached results on disk.
+        """
+        return sum(
+            name.endswith(".npz") for name in os.listdir(self.directory)
+        )
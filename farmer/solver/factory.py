@@ -0,0 +1,89 @@
+"""
+Factory of the solvers by their method name. methods are imported here so
+a process only pays the import time of the method that it uses.
+"""
+
+import functools
+import math
+import typing
+
+from farmer.config import Config
+
+from .recorder import Recorder
+from .solver import Solver
+
+METHODS = ("benders", "lagrange", "pha")
+
+# the default upper bound is the cost of the expected value solution
+LAGRANGE = {
+    "lower_bound": -math.inf,
+    "k_1_bound": 4,
+    "k_bound": 1000,
+}
+
+
+def grow(factor: float, limit: float, rou: float) -> float:
+    """
+    grow is the rou transform of PHA solvers.
+    """
+    return min(factor * rou, limit)
+
+
+def create(
+    method: str,
+    cfg: Config,
+    backend: str,
+    options: typing.Mapping[str, typing.Any],
+    recorder: typing.Optional[Recorder] = None,
+) -> Solver:
+    """
+    create returns the solver of the method, options are the solver
+    arguments except lagrange parameters that are given as a "parameters"
+    mapping and PHA parameters that are epsilon, max_iterations,
+    the growth factor and limit of rou, cost_rou, balance, fix_after,
+    fix_tolerance, gap and bound_period.
+    lagrange uses the level method, that stops on the gap, by default and
+    its upper_bound is the cost of the expected value solution by default.
+    """
+    # pylint: disable=import-outside-toplevel
+    options = dict(options)
+
+    if method == "benders":
+        from farmer.benders import Benders
+
+        return Benders(cfg, backend=backend, recorder=recorder, **options)
+    if method == "lagrange":
+        from farmer.lagrange import (
+            Lagrange,
+            Parameters as LagrangeParameters,
+            expected_value_bound,
+        )
+
+        values = {**LAGRANGE, **options.pop("parameters", {})}
+        if "upper_bound" not in values:
+            values["upper_bound"] = expected_value_bound(cfg, backend)
+        parameters = LagrangeParameters(**values)
+        options.setdefault("strategy", "level")
+        return Lagrange(
+            cfg, parameters, backend=backend, recorder=recorder, **options
+        )
+    if method == "pha":
+        from farmer.pha import PHA, Parameters as PHAParameters
+
+        parameters = PHAParameters(
+            options.pop("epsilon", 0.01),
+            functools.partial(
+                grow, options.pop("growth", 1.1), options.pop("limit", 100)
+            ),
+            options.pop("max_iterations", None),
+            options.pop("cost_rou", False),
+            options.pop("balance", None),
+            options.pop("fix_after", None),
+            options.pop("fix_tolerance", 1e-4),
+            options.pop("gap", None),
+            options.pop("bound_period", 10),
+        )
+        return PHA(
+            cfg, parameters, backend=backend, recorder=recorder, **options
+        )
+    raise ValueError(f"unknown method {method}")
@@ -0,0 +1,165 @@
+"""
+Pool of long-lived worker processes that own a shard of problems.
+Problems are built once in their worker and stay there for the whole run
+so gurobi can re-solve them from their previous basis.
+"""
+
+import multiprocessing
+import multiprocessing.connection
+import typing
+
+T = typing.TypeVar("T")
+
+
+def split(
+    items: typing.Sequence[T], count: int
+) -> typing.List[typing.List[T]]:
+    """
+    split divides items into count contiguous chunks with nearly equal sizes.
+    """
+    count = max(1, min(count, len(items)))
+    return [
+        list(items[i * len(items) // count : (i + 1) * len(items) // count])
+        for i in range(count)
+    ]
+
+
+def _call(problems, method, arguments):
+    return [
+        getattr(problem, method)(*args)
+        for problem, args in zip(problems, arguments)
+    ]
+
+
+def _worker(
+    connection: multiprocessing.connection.Connection,
+    factory: typing.Callable[[typing.Any], typing.Any],
+    items: typing.List[typing.Any],
+):
+    try:
+        problems = [factory(item) for item in items]
+    except Exception as exception:  # pylint: disable=broad-except
+        connection.send(("error", exception))
+        return
+    connection.send(("ready", None))
+
+    while True:
+        message = connection.recv()
+        if message is None:
+            return
+        method, arguments = message
+        try:
+            connection.send(("ok", _call(problems, method, arguments)))
+        except Exception as exception:  # pylint: disable=broad-except
+            connection.send(("error", exception))
+
+
+class ShardPool:
+    """
+    ShardPool builds factory(item) for each of the given items and
+    calls methods on them. items are divided between workers and each worker
+    keeps its problems for the pool lifetime. with zero workers
+    the problems live in the current process.
+    """
+
+    def __init__(
+        self,
+        factory: typing.Callable[[typing.Any], typing.Any],
+        items: typing.Sequence[typing.Any],
+        workers: int = 0,
+    ):
+        self.size = len(items)
+        self.problems: typing.List[typing.Any] = []
+        self.shards: typing.List[typing.List[int]] = []
+        self.connections: typing.List[
+            multiprocessing.connection.Connection
+        ] = []
+        self.processes: typing.List[multiprocessing.Process] = []
+
+        if workers <= 0:
+            self.problems = [factory(item) for item in items]
+            return
+
+        # gurobi environments must not be shared with forked children
+        context = multiprocessing.get_context("spawn")
+        self.shards = split(range(len(items)), workers)
+        for shard in self.shards:
+            parent, child = context.Pipe()
+            process = context.Process(
+                target=_worker,
+                args=(child, factory, [items[i] for i in shard]),
+                daemon=True,
+            )
+            process.start()
+            self.connections.append(parent)
+            self.processes.append(process)
+
+        try:
+            self._gather()
+        except BaseException:
+            self.close()
+            raise
+
+    def broadcast(self, method: str, *args) -> typing.List[typing.Any]:
+        """
+        broadcast calls method with the same arguments on every problem.
+        """
+        return self.scatter(method, [args] * self.size)
+
+    def scatter(
+        self, method: str, arguments: typing.Sequence[typing.Tuple]
+    ) -> typing.List[typing.Any]:
+        """
+        scatter calls method on each problem with its own arguments
+        and returns the results in the items order.
+        """
+        if not self.processes:
+            return _call(self.problems, method, arguments)
+
+        for connection, shard in zip(self.connections, self.shards):
+            connection.send((method, [arguments[i] for i in shard]))
+
+        results: typing.List[typing.Any] = [None] * self.size
+        for payload, shard in zip(self._gather(), self.shards):
+            for i, result in zip(shard, payload):
+                results[i] = result
+        return results
+
+    def _gather(self) -> typing.List[typing.Any]:
+        """
+        _gather returns the reply of each worker. every reply is read
+        before the first error is raised so a failed call does not leave
+        replies that the next call would read as its own.
+        """
+        payloads = []
+        errors = []
+        for connection in self.connections:
+            status, payload = connection.recv()
+            if status == "error":
+                errors.append(payload)
+            payloads.append(payload)
+        if errors:
+            raise errors[0]
+        return payloads
+
+    def close(self):
+        """
+        close stops the workers and releases their problems.
+        """
+        for connection in self.connections:
+            try:
+                connection.send(None)
+            except (BrokenPipeError, OSError):
+                pass
+            connection.close()
+        for process in self.processes:
+            process.join()
+        self.connections = []
+        self.processes = []
+        self.problems = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -0,0 +1,75 @@
+"""
+Profile of a solver run, where the time went and how much work
+the LP/QP engines did.
+"""
+
+import contextlib
+import math
+import time
+import typing
+
+from farmer.backend import Work
+
+Hook = typing.Callable[[str, float, "Profile"], None]
+
+
+class Profile:
+    """
+    Profile keeps the total time and the number of runs of each phase
+    of a solver, the engines work and the final bounds of the optimal value.
+    hook is called with the phase name, its time and the profile
+    whenever a phase is done.
+    """
+
+    def __init__(self, hook: typing.Optional[Hook] = None):
+        self.hook = hook
+
+        self.times: typing.Dict[str, float] = {}
+        self.counts: typing.Dict[str, int] = {}
+        self.work = Work()
+
+        self.lower_bound = -math.inf
+        self.upper_bound = math.inf
+
+    @contextlib.contextmanager
+    def phase(self, name: str):
+        """
+        phase times the code of its with block as the named phase.
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            self.times[name] = self.times.get(name, 0.0) + elapsed
+            self.counts[name] = self.counts.get(name, 0) + 1
+            if self.hook is not None:
+                self.hook(name, elapsed, self)
+
+    def bounds(self, lower_bound: float, upper_bound: float):
+        self.lower_bound = lower_bound
+        self.upper_bound = upper_bound
+
+    @property
+    def gap(self) -> float:
+        """
+        gap is the relative gap of the bounds.
+        """
+        if math.isinf(self.lower_bound) or math.isinf(self.upper_bound):
+            return math.inf
+        return (self.upper_bound - self.lower_bound) / max(
+            abs(self.upper_bound), 1
+        )
+
+    def __getstate__(self):
+        # hooks are usually closures that cannot be pickled
+        state = dict(self.__dict__)
+        state["hook"] = None
+        return state
+
+    def __repr__(self) -> str:
+        return (
+            f"Profile(times={self.times}, counts={self.counts}, "
+            f"work={self.work}, lower_bound={self.lower_bound}, "
+            f"upper_bound={self.upper_bound})"
+        )
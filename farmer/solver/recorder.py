@@ -0,0 +1,130 @@
+"""
+Recorder of the solvers iterations.
+Each iteration is a row of named floats that is stored in numpy columns
+and is passed to the callbacks as soon as it is recorded so a run
+can be watched while it is solving.
+"""
+
+import csv
+import math
+import typing
+
+import numpy as np
+
+Row = typing.Dict[str, typing.Optional[float]]
+
+
+def crop_columns(name: str, values: typing.Iterable[float]) -> Row:
+    """
+    crop_columns returns the row items of a value for each crop
+    that are named like x_1, x_2, ...
+    """
+    return {
+        f"{name}_{index + 1}": float(value)
+        for index, value in enumerate(values)
+    }
+
+
+class Recorder:
+    """
+    Recorder stores the iterations in preallocated numpy columns that
+    are named by the keys of the first row, missing and None values
+    are stored as nan.
+    the columns grow as needed when capacity is None and otherwise they are
+    a ring buffer that keeps the last capacity rows, so zero capacity
+    keeps nothing and only calls the callbacks.
+    a disabled recorder ignores the rows.
+    """
+
+    def __init__(
+        self,
+        capacity: typing.Optional[int] = None,
+        callbacks: typing.Sequence[typing.Callable[[Row], None]] = (),
+        enabled: bool = True,
+    ):
+        self.capacity = capacity
+        self.callbacks = list(callbacks)
+        self.enabled = enabled
+
+        self.names: typing.List[str] = []
+        self.data = np.empty((0, 0))
+        # number of recorded rows, including the overwritten ones
+        self.count = 0
+
+    def __len__(self) -> int:
+        if self.capacity is None:
+            return self.count
+        return min(self.count, self.capacity)
+
+    def _allocate(self, names: typing.List[str]):
+        self.names = names
+        size = 64 if self.capacity is None else self.capacity
+        self.data = np.full((size, len(names)), np.nan)
+
+    def record(self, row: Row):
+        """
+        record stores the row and passes it to the callbacks.
+        """
+        if not self.enabled:
+            return
+
+        if not self.names:
+            self._allocate(list(row))
+
+        if self.capacity is None and self.count == len(self.data):
+            self.data = np.concatenate(
+                [self.data, np.full(self.data.shape, np.nan)]
+            )
+
+        if len(self.data) > 0:
+            self.data[self.count % len(self.data)] = [
+                math.nan if row.get(name) is None else row[name]
+                for name in self.names
+            ]
+        self.count += 1
+
+        for callback in self.callbacks:
+            callback(row)
+
+    def columns(self) -> typing.Dict[str, np.ndarray]:
+        """
+        columns returns the stored rows in their recording order
+        as a column for each name, that is accepted by pandas.DataFrame.
+        """
+        size = len(self)
+        start = self.count - size
+        if len(self.data) > 0:
+            rows = self.data[(start + np.arange(size)) % len(self.data)]
+        else:
+            rows = np.empty((0, len(self.names)))
+
+        return {name: rows[:, i] for i, name in enumerate(self.names)}
+
+
+class CSVWriter:
+    """
+    CSVWriter is a recorder callback that appends each row to a CSV file
+    and flushes it so the file can be read during the run.
+    """
+
+    def __init__(self, path: str):
+        self.file = open(path, "w", newline="")
+        self.writer: typing.Optional[csv.DictWriter] = None
+
+    def __call__(self, row: Row):
+        if self.writer is None:
+            self.writer = csv.DictWriter(
+                self.file, fieldnames=list(row), extrasaction="ignore"
+            )
+            self.writer.writeheader()
+        self.writer.writerow(row)
+        self.file.flush()
+
+    def close(self):
+        self.file.close()
+
+    def __enter__(self) -> "CSVWriter":
+        return self
+
+    def __exit__(self, *_):
+        self.close()
@@ -1,9 +1,34 @@
 import dataclasses
+import typing
+
+from .profile import Profile
 
 
 @dataclasses.dataclass
 class Result:
+    """
+    Result is the optimal value and the planted area of each crop,
+    x_1, x_2 and x_3 are the areas of the first three crops.
+    """
+
     z_star: float
-    x_1: float
-    x_2: float
-    x_3: float
+    x: typing.Tuple[float, ...]
+    profile: typing.Optional[Profile] = dataclasses.field(
+        default=None, repr=False, compare=False
+    )
+
+    def __post_init__(self):
+        self.z_star = float(self.z_star)
+        self.x = tuple(float(value) for value in self.x)
+
+    @property
+    def x_1(self) -> float:
+        return self.x[0]
+
+    @property
+    def x_2(self) -> float:
+        return self.x[1]
+
+    @property
+    def x_3(self) -> float:
+        return self.x[2]
@@ -1,9 +1,27 @@
 import abc
+import typing
 
+import numpy as np
+
+from .profile import Profile
+from .recorder import Recorder
 from .result import Result
 
 
 class Solver(abc.ABC):
+    """
+    Solver records its iterations with recorder and iterations
+    returns the recorded ones as columns.
+    profile times the phases of the solver and is attached to the result.
+    """
+
+    recorder: Recorder
+    profile: Profile
+
+    @property
+    def iterations(self) -> typing.Dict[str, np.ndarray]:
+        return self.recorder.columns()
+
     @abc.abstractmethod
     def solve(self) -> Result:
         pass
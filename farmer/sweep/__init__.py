@@ -0,0 +1,5 @@
+"""
+Parametric sweeps of the farmer problem.
+"""
+
+from .sweep import Sweep, apply, first_stage, order
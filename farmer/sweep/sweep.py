@@ -0,0 +1,183 @@
+"""
+Sweep solves the farmer problem for a grid of configuration changes.
+Points that only change the plant costs or the area have the same recourse
+so they share one built benders model and its cuts stay valid for all of
+them, each point is only a few coefficient changes and iterations away
+from its nearest solved neighbor. points with different recourse are
+solved independently in parallel.
+"""
+
+import concurrent.futures
+import dataclasses
+import multiprocessing
+import time
+import typing
+
+import numpy as np
+
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.solver import Recorder, crop_columns
+
+Delta = typing.Dict[str, float]
+
+
+def first_stage(key: str) -> bool:
+    """
+    first_stage returns true for the changes that only affect the first
+    stage and keep benders cuts valid, the area and plant costs.
+    """
+    return key == "area" or key.endswith(".plant_cost")
+
+
+def apply(cfg: Config, delta: Delta) -> Config:
+    """
+    apply returns the configuration with the given changes, keys are
+    Config fields like "area" or crop fields like "wheat.sell_price",
+    they are Crops fields like "wheat.surplus_price" when cfg has crops.
+    """
+    changes: typing.Dict[str, typing.Any] = {}
+    for key, value in delta.items():
+        if "." not in key:
+            changes[key] = value
+            continue
+
+        name, field = key.split(".")
+        if cfg.crops is None:
+            changes[name] = dataclasses.replace(
+                changes.get(name, getattr(cfg, name)), **{field: value}
+            )
+            continue
+
+        crops = changes.get("crops", cfg.crops)
+        values = np.array(getattr(crops, field))
+        values[crops.index(name)] = value
+        changes["crops"] = dataclasses.replace(crops, **{field: values})
+    return dataclasses.replace(cfg, **changes)
+
+
+def _first_stage(cfg: Config) -> np.ndarray:
+    return np.concatenate([[cfg.area], cfg.crop_arrays().plant_cost])
+
+
+def order(cfgs: typing.List[Config]) -> typing.List[int]:
+    """
+    order returns the configurations in a nearest neighbor chain so
+    each one is solved right after its closest solved point.
+    """
+    points = np.array([_first_stage(cfg) for cfg in cfgs])
+    points /= np.maximum(np.abs(points).max(axis=0), 1)
+
+    chain = [0]
+    remaining = list(range(1, len(cfgs)))
+    while remaining:
+        distances = np.abs(points[remaining] - points[chain[-1]]).sum(axis=1)
+        chain.append(remaining.pop(int(np.argmin(distances))))
+    return chain
+
+
+def _solve(
+    points: typing.List[typing.Tuple[int, Config]],
+    options: typing.Dict[str, typing.Any],
+) -> typing.List[typing.Dict[str, float]]:
+    """
+    _solve solves points with the same recourse on one benders model.
+    """
+    cfgs = [cfg for _, cfg in points]
+    rows = []
+
+    start = time.perf_counter()
+    master_problem, sub_problems = Benders(cfgs[0], **options).build()
+    build_time = time.perf_counter() - start
+
+    with sub_problems:
+        for position in order(cfgs):
+            index, cfg = points[position]
+            master_problem.update(cfg)
+
+            benders = Benders(cfg, **options)
+            start = time.perf_counter()
+            result = benders.iterate(master_problem, sub_problems)
+
+            row = {"point": index, "z_star": result.z_star}
+            row.update(crop_columns("x", result.x))
+            row.update(
+                {
+                    "iterations": len(benders.recorder),
+                    "cuts": master_problem.cuts,
+                    "time": time.perf_counter() - start,
+                    "build_time": build_time,
+                }
+            )
+            rows.append(row)
+            build_time = 0.0
+
+    return rows
+
+
+class Sweep:
+    """
+    Sweep solves the configurations of the grid changes with benders,
+    options are passed to Benders and points with different recourse
+    are solved in the given number of worker processes or in the current
+    one when it is zero.
+    """
+
+    def __init__(
+        self,
+        cfg: Config,
+        grid: typing.Sequence[Delta],
+        workers: int = 0,
+        **options,
+    ):
+        self.cfg = cfg
+        self.grid = list(grid)
+        self.workers = workers
+        self.options = options
+
+    def groups(self) -> typing.List[typing.List[typing.Tuple[int, Config]]]:
+        """
+        groups returns the points grouped by their recourse changes.
+        """
+        groups: typing.Dict[
+            typing.Tuple, typing.List[typing.Tuple[int, Config]]
+        ] = {}
+        for index, delta in enumerate(self.grid):
+            key = tuple(
+                sorted(
+                    (name, value)
+                    for name, value in delta.items()
+                    if not first_stage(name)
+                )
+            )
+            groups.setdefault(key, []).append((index, apply(self.cfg, delta)))
+        return list(groups.values())
+
+    def solve(self) -> typing.Dict[str, np.ndarray]:
+        """
+        solve returns a table with the changes and the solution of
+        each point in the grid order, that is accepted by pandas.DataFrame.
+        changes that a point does not have are NaN.
+        """
+        groups = self.groups()
+        if self.workers <= 0:
+            solutions = [_solve(points, self.options) for points in groups]
+        else:
+            with concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            ) as executor:
+                solutions = list(
+                    executor.map(_solve, groups, [self.options] * len(groups))
+                )
+
+        rows = {row["point"]: row for rows in solutions for row in rows}
+        # the recorder takes its columns from the first row so every row
+        # has all the changed keys and the ones a point does not change
+        # are NaN
+        keys = dict.fromkeys(key for delta in self.grid for key in delta)
+        recorder = Recorder()
+        for index, delta in enumerate(self.grid):
+            changes = {key: delta.get(key, np.nan) for key in keys}
+            recorder.record({**changes, **rows[index]})
+        return recorder.columns()
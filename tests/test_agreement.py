@@ -0,0 +1,151 @@
+"""
+Agreement checks of the solvers on small instances with the license-free
+HiGHS backend: the closed form recourse against the LP sub problem and
+every method against the extensive form.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.benders.sub_problem import CheckedSubProblem, SubProblem
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.lagrange import (
+    Lagrange,
+    Parameters as LagrangeParameters,
+    expected_value_bound,
+)
+from farmer.lagrange.sub_problems import (
+    CropSubProblem,
+    ParametricSubProblem,
+    RecourseSubProblem,
+)
+from farmer.pha import PHA, Parameters as PHAParameters
+from farmer.recourse import Recourse
+from farmer.solver.factory import LAGRANGE
+
+BACKEND = "highs"
+REL_TOL = 1e-3
+
+
+def _sampled() -> Config:
+    rng = np.random.default_rng(0)
+    return Config(
+        scenarios=rng.uniform(-0.3, 0.3, (8, 3)).tolist(),
+        probabilities=rng.dirichlet(np.ones(8)).tolist(),
+    )
+
+
+CONFIGS = {
+    "uniform": Config(scenarios=[0.2, 0, -0.2]),
+    "weighted": Config(
+        scenarios=[0.2, 0, -0.2], probabilities=[0.5, 0.3, 0.2]
+    ),
+    "sampled": _sampled(),
+}
+
+
+@pytest.fixture(name="cfg", params=list(CONFIGS), scope="module")
+def fixture_cfg(request) -> Config:
+    return CONFIGS[request.param]
+
+
+@pytest.fixture(name="optimum", scope="module")
+def fixture_optimum(cfg: Config) -> float:
+    return Extensive(cfg, backend=BACKEND).solve().z_star
+
+
+def _points(cfg: Config) -> np.ndarray:
+    # random plans on the area with the vertices of the simplex
+    rng = np.random.default_rng(1)
+    crops = len(cfg.crop_arrays())
+    return cfg.area * np.vstack(
+        [np.eye(crops), rng.dirichlet(np.ones(crops), 20)]
+    )
+
+
+def test_checked_sub_problem(cfg: Config):
+    scenarios = list(range(len(cfg.scenarios)))
+    groups = [None, scenarios[::2], scenarios[1::2]]
+    for group in groups:
+        sub_problem = CheckedSubProblem(cfg, group, backend=BACKEND)
+        for x in _points(cfg):
+            sub_problem.solve(x)
+
+
+def test_checked_sub_problem_fails():
+    cfg = CONFIGS["uniform"]
+    sub_problem = CheckedSubProblem(cfg, backend=BACKEND)
+    sub_problem.recourse = Recourse(CONFIGS["weighted"])
+    with pytest.raises(ValueError):
+        sub_problem.solve(_points(cfg)[-1])
+
+
+def test_oracle_matches_lp(cfg: Config):
+    sub_problem = SubProblem(cfg, backend=BACKEND)
+    recourse = Recourse(cfg)
+    probabilities = cfg.scenario_probabilities()
+    for x in _points(cfg):
+        expected, _ = sub_problem.solve(x)
+        value, _ = recourse.solve(x)
+        assert math.isclose(value, expected, rel_tol=1e-6, abs_tol=1e-6)
+        assert math.isclose(
+            recourse.costs(x) @ probabilities, value, rel_tol=1e-9
+        )
+
+
+def test_parametric_matches_oracle(cfg: Config):
+    recourse = Recourse(cfg)
+    plant_cost = cfg.crop_arrays().plant_cost
+    for crop, cost in enumerate(plant_cost):
+        lp = CropSubProblem(cfg, crop, BACKEND)
+        oracle = RecourseSubProblem(cfg, recourse, crop, cost)
+        parametric = ParametricSubProblem(cfg, recourse, crop, cost)
+        for _lambda in np.linspace(-1000, 1000, 41):
+            expected, _ = lp.solve(_lambda)
+            for sub_problem in (oracle, parametric):
+                value, x = sub_problem.solve(_lambda)
+                assert math.isclose(value, expected, abs_tol=1e-4)
+                assert 0 <= x <= cfg.area
+
+
+@pytest.mark.parametrize("recourse", ["lp", "oracle", "check"])
+@pytest.mark.parametrize("groups", [1, 3])
+def test_benders(cfg: Config, optimum: float, recourse: str, groups: int):
+    result = Benders(
+        cfg, epsilon=1e-3, groups=groups, recourse=recourse, backend=BACKEND
+    ).solve()
+    assert math.isclose(result.z_star, optimum, rel_tol=REL_TOL)
+
+
+@pytest.mark.parametrize("recourse", ["lp", "oracle", "parametric"])
+def test_lagrange(cfg: Config, optimum: float, recourse: str):
+    result = Lagrange(
+        cfg,
+        LagrangeParameters(
+            **LAGRANGE, upper_bound=expected_value_bound(cfg, BACKEND)
+        ),
+        recourse=recourse,
+        backend=BACKEND,
+        strategy="level",
+    ).solve()
+    assert math.isclose(result.z_star, optimum, rel_tol=REL_TOL)
+
+
+@pytest.mark.parametrize("gap", [None, 1e-3])
+def test_pha(cfg: Config, optimum: float, gap):
+    result = PHA(
+        cfg,
+        PHAParameters(
+            1e-3,
+            lambda rou: min(1.1 * rou, 100),
+            max_iterations=500,
+            gap=gap,
+        ),
+        backend=BACKEND,
+    ).solve()
+    assert math.isclose(result.z_star, optimum, rel_tol=REL_TOL)
+    assert math.isclose(sum(result.x), cfg.area, rel_tol=REL_TOL)
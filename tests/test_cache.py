@@ -0,0 +1,116 @@
+"""
+Tests of the on-disk cache of solver results.
+"""
+
+import functools
+import os
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.pha import PHA, Parameters as PHAParameters
+from farmer.solver import Cache, Recorder, key
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2])
+
+
+def _benders(cfg: Config = CFG, **options) -> Benders:
+    return Benders(cfg, epsilon=1e-3, backend=BACKEND, **options)
+
+
+def _pha(rou_transform) -> PHA:
+    return PHA(CFG, PHAParameters(1e-3, rou_transform), backend=BACKEND)
+
+
+def _scaled(factor: float):
+    return lambda rou: factor * rou
+
+
+def _clipped(rou: float, limit: float) -> float:
+    return min(rou, limit)
+
+
+def test_key():
+    assert key(_benders()) == key(_benders(recorder=Recorder(capacity=0)))
+    assert key(_benders()) != key(_benders(Config(scenarios=[0.2, -0.2])))
+    assert key(_benders()) != key(_benders(groups=3))
+    assert key(_benders()).startswith("Benders-")
+
+
+def test_function_key():
+    # functions are hashed with their code and captured values
+    assert key(_pha(_scaled(1.1))) == key(_pha(_scaled(1.1)))
+    assert key(_pha(_scaled(1.1))) != key(_pha(_scaled(1.2)))
+    assert key(_pha(lambda rou: 1.1 * rou)) != key(_pha(lambda rou: rou))
+
+    # partials are hashed with their function and arguments
+    assert key(_pha(functools.partial(_clipped, limit=10))) == key(
+        _pha(functools.partial(_clipped, limit=10))
+    )
+    assert key(_pha(functools.partial(_clipped, limit=10))) != key(
+        _pha(functools.partial(_clipped, limit=20))
+    )
+
+
+def test_unstable_value():
+    limit = object()
+    with pytest.raises(TypeError):
+        key(_pha(lambda rou: rou if limit else 0))
+
+
+def test_hit(tmp_path):
+    cache = Cache(str(tmp_path))
+    solved = _benders()
+    result = cache.solve(solved)
+
+    # a new process reads the result and its iterations from the file
+    cache = Cache(str(tmp_path))
+    cached = _benders()
+    hit = cache.solve(cached)
+
+    assert (cache.hits, cache.misses) == (1, 0)
+    assert hit.z_star == result.z_star
+    assert hit.x == pytest.approx(result.x)
+    assert hit.profile is cached.profile
+    assert hit.profile.upper_bound == solved.profile.upper_bound
+    for name, values in solved.iterations.items():
+        np.testing.assert_array_equal(cached.iterations[name], values)
+
+
+def test_disabled_recorder(tmp_path):
+    cache = Cache(str(tmp_path))
+    result = cache.solve(_benders(recorder=Recorder(enabled=False)))
+    hit = Cache(str(tmp_path)).solve(_benders())
+
+    assert hit.z_star == result.z_star
+
+
+def test_damaged_file(tmp_path):
+    cache = Cache(str(tmp_path))
+    with open(cache.path(key(_benders())), "w") as file:
+        file.write("not a result")
+
+    cache.solve(_benders())
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert Cache(str(tmp_path)).solve(_benders()).z_star < 0
+
+
+def test_eviction(tmp_path):
+    cache = Cache(str(tmp_path), memory=1)
+    cfgs = [Config(scenarios=[0.2, 0, -0.2], area=area) for area in (3, 4)]
+    cache.solve(_benders(cfgs[0]))
+    size = os.path.getsize(cache.path(key(_benders(cfgs[0]))))
+
+    # the least recently used file is removed when the files are too large
+    cache.max_size = size + size // 2
+    os.utime(cache.path(key(_benders(cfgs[0]))), (0, 0))
+    cache.solve(_benders(cfgs[1]))
+
+    assert cache.size == 1
+    assert os.path.exists(cache.path(key(_benders(cfgs[1]))))
+
+    # the memory keeps the last entries
+    assert list(cache.entries) == [key(_benders(cfgs[1]))]
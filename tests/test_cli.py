@@ -0,0 +1,135 @@
+"""
+Tests of the farmer command.
+"""
+
+import json
+
+import numpy as np
+import pytest
+
+from farmer.cli import main
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.lagrange import expected_value_bound
+from farmer.solver import create
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2], area=450)
+
+
+@pytest.fixture(name="files")
+def fixture_files(tmp_path):
+    config = tmp_path / "farmer.json"
+    config.write_text(json.dumps({"area": CFG.area}))
+    scenarios = tmp_path / "yields.csv"
+    scenarios.write_text("# deviations\n0.2\n0\n-0.2\n")
+    return ["--config", str(config), "--scenarios", str(scenarios)]
+
+
+def _run(capsys, *argv: str):
+    code = main(["--backend", BACKEND, *argv])
+    lines = capsys.readouterr().out.splitlines()
+    return code, [json.loads(line) for line in lines]
+
+
+@pytest.mark.parametrize("method", ["benders", "lagrange", "pha"])
+def test_methods(capsys, files, method: str):
+    code, messages = _run(capsys, "--method", method, *files)
+
+    optimum = Extensive(CFG, backend=BACKEND).solve().z_star
+    result = messages[-1]
+    assert code == 0
+    assert result["type"] == "result"
+    assert result["z_star"] == pytest.approx(optimum, rel=1e-2)
+    assert result["iterations"] == len(messages) - 1
+    assert all(message["type"] == "iteration" for message in messages[:-1])
+
+
+def test_lagrange_defaults(capsys, files):
+    code, messages = _run(capsys, "--method", "lagrange", "--quiet", *files)
+
+    # the level method stops on the gap with the expected value bound
+    result = messages[-1]
+    assert code == 0
+    assert result["iterations"] < 100
+    assert result["upper_bound"] < 0
+    assert result["lower_bound"] <= result["upper_bound"]
+
+    solver = create("lagrange", CFG, BACKEND, {})
+    assert solver.strategy == "level"
+    assert solver.upper_bound == expected_value_bound(CFG, BACKEND)
+    given = {"parameters": {"upper_bound": 0}, "strategy": "subgradient"}
+    solver = create("lagrange", CFG, BACKEND, given)
+    assert (solver.strategy, solver.upper_bound) == ("subgradient", 0)
+
+
+def test_options_and_output(tmp_path, files):
+    output = tmp_path / "out.jsonl"
+    code = main(
+        [
+            "--backend",
+            BACKEND,
+            "--option",
+            "recourse=oracle",
+            "--option",
+            "epsilon=1e-6",
+            "--quiet",
+            "--output",
+            str(output),
+            *files,
+        ]
+    )
+
+    messages = [json.loads(line) for line in output.read_text().splitlines()]
+    assert code == 0
+    assert [message["type"] for message in messages] == ["result"]
+    assert sum(messages[0]["x"]) == pytest.approx(CFG.area)
+
+
+def test_npy_probabilities(capsys, tmp_path, files):
+    path = tmp_path / "probabilities.npy"
+    np.save(path, np.array([0.5, 0.3, 0.2]))
+    code, messages = _run(
+        capsys, "--quiet", "--probabilities", str(path), *files
+    )
+
+    weighted = Config(
+        scenarios=CFG.scenarios, probabilities=[0.5, 0.3, 0.2], area=450
+    )
+    assert code == 0
+    assert messages[-1]["z_star"] == pytest.approx(
+        Extensive(weighted, backend=BACKEND).solve().z_star, rel=1e-3
+    )
+
+
+def test_cache(capsys, tmp_path, files):
+    cache = ["--cache", str(tmp_path / "cache")]
+    _, solved = _run(capsys, *cache, *files)
+    _, cached = _run(capsys, *cache, *files)
+
+    # the cached iterations are written again
+    assert [message["type"] for message in cached] == [
+        message["type"] for message in solved
+    ]
+    assert cached[-1]["z_star"] == solved[-1]["z_star"]
+
+
+@pytest.mark.parametrize(
+    "argv",
+    [
+        ["--scenarios", "missing.csv"],
+        ["--option", "unknown=1", "--scenarios", "{scenarios}"],
+        ["--method", "pha"],
+    ],
+)
+def test_errors(capsys, files, argv):
+    argv = [arg.replace("{scenarios}", files[3]) for arg in argv]
+    code, messages = _run(capsys, *argv)
+
+    assert code == 1
+    assert [message["type"] for message in messages] == ["error"]
+
+
+def test_bad_option():
+    with pytest.raises(SystemExit):
+        main(["--option", "no-value"])
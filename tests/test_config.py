@@ -0,0 +1,58 @@
+"""
+Tests of the configuration of the farmer problem.
+"""
+
+import numpy as np
+import pytest
+
+from farmer.config import Config
+
+
+def test_from_dict():
+    cfg = Config.from_dict(
+        {
+            "scenarios": [0.2, 0, -0.2],
+            "area": 400,
+            "wheat": {"plant_cost": 100},
+        }
+    )
+
+    assert list(cfg.scenarios) == [0.2, 0, -0.2]
+    assert cfg.area == 400
+    # seeds only change the given fields of their defaults
+    assert cfg.wheat.plant_cost == 100
+    assert cfg.wheat.produce_rate == Config().wheat.produce_rate
+    assert cfg.corn == Config().corn
+    assert Config.from_dict({}) == Config()
+
+
+def test_from_dict_crops():
+    crops = Config().crop_arrays()
+    cfg = Config.from_dict(
+        {
+            "scenarios": [0],
+            "crops": {
+                "names": list(crops.names),
+                "plant_cost": crops.plant_cost.tolist(),
+                "produce_rate": crops.produce_rate.tolist(),
+                "required": crops.required.tolist(),
+                "threshold": crops.threshold.tolist(),
+                "price": crops.price.tolist(),
+                "surplus_price": crops.surplus_price.tolist(),
+            },
+        }
+    )
+
+    assert cfg.digest() == Config(scenarios=[0], crops=crops).digest()
+    np.testing.assert_array_equal(
+        cfg.crop_arrays().plant_cost, [150, 230, 260]
+    )
+
+
+@pytest.mark.parametrize(
+    "data",
+    [{"unknown": 1}, {"wheat": {"unknown": 1}}, {"crops": {"names": []}}],
+)
+def test_from_dict_unknown_fields(data):
+    with pytest.raises(TypeError):
+        Config.from_dict(data)
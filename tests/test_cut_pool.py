@@ -0,0 +1,86 @@
+"""
+Tests of the Benders cut pool and the master problem cut management.
+"""
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.benders.cut_pool import CutPool
+from farmer.benders.master_problem import MasterProblem
+from farmer.config import Config
+from farmer.extensive import Extensive
+
+BACKEND = "highs"
+
+
+def _pool() -> CutPool:
+    pool = CutPool(area=500, crops=2)
+    pool.add(-100.0, np.array([-1.0, -2.0]), 0, 0)
+    pool.add(-100.0, np.array([-1.0, -2.0]), 1, 1)
+    return pool
+
+
+def test_dominated():
+    pool = _pool()
+
+    # duplicates and weaker cuts of the same group are dominated
+    assert pool.dominated(-100.0, np.array([-1.0, -2.0]), 0)
+    assert pool.dominated(-101.0, np.array([-1.0, -2.0]), 0)
+    assert pool.dominated(-100.0, np.array([-1.0, -3.0]), 0)
+    # a cut that is higher on some vertex of the first stage set is not
+    assert not pool.dominated(-99.0, np.array([-1.0, -2.0]), 0)
+    assert not pool.dominated(-100.0, np.array([-1.0, -1.0]), 0)
+    assert not pool.dominated(-200.0, np.array([0.0, -1.0]), 0)
+
+
+def test_dominates():
+    pool = _pool()
+    mask = pool.dominates(-99.0, np.array([-1.0, -2.0]), 0)
+    np.testing.assert_array_equal(mask, [True, False])
+
+    pool.drop(mask)
+    assert len(pool) == 1
+    assert list(pool.group) == [1]
+
+
+def test_update():
+    pool = _pool()
+    pool.age[:] = 2
+
+    # the first cut is tight and the second one is loose
+    violated = pool.update(np.array([10.0, 20.0]), np.array([-150.0, -100.0]))
+
+    np.testing.assert_allclose(pool.slack, [0, 50])
+    np.testing.assert_array_equal(pool.age, [0, 3])
+    assert not violated.any()
+
+    violated = pool.update(np.array([10.0, 20.0]), np.array([-151.0, 0.0]))
+    np.testing.assert_array_equal(violated, [True, False])
+
+
+def test_master_problem_rejects_dominated_cuts():
+    master_problem = MasterProblem(Config(), backend=BACKEND)
+    pi = np.array([-300.0, -200.0, -100.0])
+
+    assert master_problem.add_cut(-1000.0, pi)
+    assert not master_problem.add_cut(-1000.0, pi)
+    assert not master_problem.add_cut(-2000.0, pi)
+    assert master_problem.cuts == 1
+
+    # a stronger cut replaces the dominated one in the model
+    assert master_problem.add_cut(-500.0, pi)
+    assert master_problem.cuts == 1
+    assert master_problem.pool.lhs.tolist() == [-500.0]
+
+
+def test_max_age():
+    cfg = Config(scenarios=[0.2, 0.1, 0, -0.1, -0.2])
+    optimum = Extensive(cfg, backend=BACKEND).solve().z_star
+
+    benders = Benders(cfg, epsilon=1e-3, groups=5, max_age=1, backend=BACKEND)
+    result = benders.solve()
+    columns = benders.recorder.columns()
+
+    assert result.z_star == pytest.approx(optimum, rel=1e-6)
+    assert columns["retired"].max() > 0
@@ -0,0 +1,63 @@
+"""
+Tests of the on-disk Benders cut store.
+"""
+
+import dataclasses
+import os
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders, CutStore
+from farmer.benders.cut_pool import CutPool
+from farmer.config import Config
+from farmer.extensive import Extensive
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0.1, 0, -0.1, -0.2])
+
+
+def test_save_and_load(tmp_path):
+    store = CutStore(str(tmp_path))
+    pool = CutPool(CFG.area, 3)
+    pool.add(-100.0, np.array([-1.0, -2.0, -3.0]), 0, 0)
+    pool.add(-200.0, np.array([-3.0, -2.0, -1.0]), 1, -1)
+    store.save(CFG, 2, pool)
+
+    cuts = store.load(CFG, 2)
+    assert [(lhs, group) for lhs, _, group in cuts] == [(-100, 0), (-200, 1)]
+    np.testing.assert_array_equal(cuts[1][1], [-3, -2, -1])
+
+    # cuts are stored for each recourse and number of groups
+    assert store.load(CFG, 1) == []
+    assert store.load(dataclasses.replace(CFG, scenarios=[0.2]), 2) == []
+    # plant costs and the area do not change the recourse
+    assert len(store.load(dataclasses.replace(CFG, area=400), 2)) == 2
+    assert os.listdir(tmp_path) == [os.path.basename(store.path(CFG, 2))]
+
+
+def test_damaged_file(tmp_path):
+    store = CutStore(str(tmp_path))
+    with open(store.path(CFG, 1), "w") as file:
+        file.write("not a cut store")
+
+    assert store.load(CFG, 1) == []
+
+
+def test_warm_start(tmp_path):
+    store = CutStore(str(tmp_path))
+    cold = Benders(CFG, epsilon=1e-3, backend=BACKEND, cut_store=store)
+    cold.solve()
+
+    # a re-plan with other plant costs starts from the stored cuts
+    cfg = dataclasses.replace(
+        CFG, wheat=dataclasses.replace(CFG.wheat, plant_cost=170), area=450
+    )
+    warm = Benders(cfg, epsilon=1e-3, backend=BACKEND, cut_store=store)
+    result = warm.solve()
+
+    assert result.z_star == pytest.approx(
+        Extensive(cfg, backend=BACKEND).solve().z_star, rel=1e-6
+    )
+    assert len(warm.recorder) < len(cold.recorder)
+    assert warm.recorder.columns()["cuts"][0] > 0
@@ -0,0 +1,108 @@
+"""
+Tests of the integer recourse with whole trade packages.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.lagrange import Lagrange, Parameters as LagrangeParameters
+from farmer.pha import PHA, Parameters as PHAParameters
+from farmer.recourse import Recourse
+
+BACKEND = "highs"
+SCENARIOS = [0.2, 0, -0.2]
+CFG = Config(scenarios=SCENARIOS, package=10)
+
+
+def _total(recourse: Recourse, x: np.ndarray) -> float:
+    plant_cost = recourse.cfg.crop_arrays().plant_cost
+    return plant_cost @ x + recourse.costs(x) @ recourse.probability
+
+
+def _points(count: int) -> np.ndarray:
+    # random plans on the area
+    rng = np.random.default_rng(0)
+    return CFG.area * rng.dirichlet(np.ones(3), count)
+
+
+def test_integer_costs():
+    recourse = Recourse(Config(scenarios=[0], package=10))
+
+    # wheat and corn are 25 and 30 short of their requirement so they buy
+    # 3 packages each and the 260 of beet are sold in 26 packages
+    x = np.array([70.0, 70.0, 13.0])
+    expected = 238 * 30 + 210 * 30 - 36 * 260
+
+    assert recourse.costs(x) == pytest.approx([expected])
+
+
+def test_integer_costs_are_rounded_against_the_farmer():
+    integer = Recourse(CFG)
+    continuous = Recourse(Config(scenarios=SCENARIOS))
+    # each trade loses at most a package at its highest price
+    loss = 10 * (238 + 210 + 36)
+
+    for x in _points(100):
+        difference = integer.costs(x) - continuous.costs(x)
+        assert (difference >= -1e-6).all()
+        assert (difference <= loss).all()
+
+    # whole packages are not rounded
+    x = np.array([100.0, 100.0, 300.0])
+    np.testing.assert_allclose(integer.costs(x), continuous.costs(x))
+
+
+def test_round_down():
+    recourse = Recourse(CFG)
+    for x in _points(100):
+        rounded = recourse.round_down(x)
+        assert (rounded <= x).all() and (rounded >= 0).all()
+        np.testing.assert_allclose(recourse.round_down(rounded), rounded)
+        assert _total(recourse, rounded) <= _total(recourse, x) + 1e-6
+
+
+def test_extensive():
+    recourse = Recourse(CFG)
+    result = Extensive(CFG, backend=BACKEND).solve()
+    x = np.array(result.x)
+    relaxation = Extensive(Config(scenarios=SCENARIOS), backend=BACKEND)
+
+    assert result.z_star == pytest.approx(_total(recourse, x), rel=1e-6)
+    assert result.z_star >= relaxation.solve().z_star
+    # no rounded plan on the area costs less than the MIP optimum
+    best = min(_total(recourse, recourse.round_down(x)) for x in _points(1000))
+    assert result.z_star <= best + 1e-6
+
+
+def test_pha():
+    recourse = Recourse(CFG)
+    optimum = Extensive(CFG, backend=BACKEND).solve().z_star
+    result = PHA(
+        CFG,
+        PHAParameters(1e-3, lambda rou: min(1.1 * rou, 100), 10),
+        backend=BACKEND,
+    ).solve()
+    x = np.array(result.x)
+
+    # the result is a rounded plan on the area and its integer cost
+    assert x.sum() <= CFG.area + 1e-6
+    np.testing.assert_allclose(recourse.round_down(x), x)
+    assert result.z_star == pytest.approx(_total(recourse, x), rel=1e-6)
+    assert result.z_star >= optimum - 1e-6
+
+
+def test_convex_methods_reject_integer_recourse():
+    with pytest.raises(ValueError):
+        Benders(CFG, epsilon=1e-3, backend=BACKEND)
+    with pytest.raises(ValueError):
+        Lagrange(
+            CFG,
+            LagrangeParameters(-math.inf, 0, 4, 1000),
+            recourse="oracle",
+            backend=BACKEND,
+        )
@@ -0,0 +1,59 @@
+"""
+Tests of the Lagrange strategies and their backends.
+"""
+
+import math
+
+import pytest
+
+from farmer.backend.highs import Highs
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.lagrange import Lagrange, Parameters, expected_value_bound
+from farmer.lagrange import level
+
+CFG = Config(scenarios=[0.2, 0, -0.2])
+
+
+def _parameters(upper_bound: float) -> Parameters:
+    return Parameters(-math.inf, upper_bound, 4, 1000, gap=1e-6)
+
+
+@pytest.mark.parametrize(
+    "recourse, backend",
+    [("lp", "gurobi"), ("oracle", "highs"), ("parametric", "highs")],
+)
+def test_default_backend(recourse: str, backend: str):
+    solver = Lagrange(CFG, _parameters(0), recourse=recourse)
+    assert solver.backend == backend
+
+
+@pytest.mark.parametrize("recourse", ["oracle", "parametric"])
+def test_level_is_license_free(monkeypatch, recourse: str):
+    backends = []
+
+    def create(name, model):
+        backends.append(name)
+        return Highs(model)
+
+    monkeypatch.setattr(level, "create", create)
+    solver = Lagrange(CFG, _parameters(0), recourse=recourse, strategy="level")
+    solver.solve()
+    assert backends == ["highs"]
+
+
+def test_level_stops_on_gap():
+    optimum = Extensive(CFG, backend="highs").solve().z_star
+    level_method = Lagrange(
+        CFG, _parameters(0), recourse="oracle", strategy="level"
+    )
+    result = level_method.solve()
+
+    assert result.z_star == pytest.approx(optimum, rel=1e-6)
+    assert level_method.k < 100
+
+
+def test_expected_value_bound():
+    optimum = Extensive(CFG, backend="highs").solve().z_star
+    bound = expected_value_bound(CFG, "highs")
+    assert optimum <= bound < 0.9 * optimum
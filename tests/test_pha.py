@@ -0,0 +1,68 @@
+"""
+Tests of the PHA base problems and the reuse of their models.
+"""
+
+import dataclasses
+
+import numpy as np
+import pytest
+
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.pha import PHA, Parameters
+from farmer.pha.base_problem import BaseProblem
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2])
+CHANGED = dataclasses.replace(
+    CFG, area=450, wheat=dataclasses.replace(CFG.wheat, plant_cost=100)
+)
+
+
+def _base_problem(cfg: Config) -> BaseProblem:
+    return BaseProblem(0, cfg.deviations()[0], 1 / 3, cfg, BACKEND)
+
+
+@pytest.mark.parametrize(
+    "rou, x_hat",
+    [(np.zeros(3), np.zeros(3)), (np.full(3, 0.5), np.array([150, 80, 220]))],
+)
+def test_update(rou, x_hat):
+    _lambda = np.array([10.0, -5.0, -5.0])
+    updated = _base_problem(CFG)
+    updated.solve(_lambda, rou, x_hat)
+    updated.fix(np.array([2]), np.array([100.0]))
+    updated.update(CHANGED)
+
+    # the updated problem is the one of the new plant costs and area
+    # without the fixed crops
+    z, x = updated.solve(_lambda, rou, x_hat)
+    z_built, x_built = _base_problem(CHANGED).solve(_lambda, rou, x_hat)
+
+    assert z == pytest.approx(z_built, rel=1e-6)
+    np.testing.assert_allclose(x, x_built, atol=1e-4)
+    assert x.sum() <= CHANGED.area + 1e-6
+
+
+def _pha(cfg: Config) -> PHA:
+    return PHA(
+        cfg,
+        Parameters(1e-3, lambda rou: min(1.1 * rou, 100), gap=1e-4),
+        backend=BACKEND,
+    )
+
+
+def test_iterate():
+    pha = _pha(CFG)
+    with pha.build() as base_problems:
+        first = pha.iterate(base_problems)
+
+        # the base problems of a run are reused for a new configuration
+        # with the same recourse
+        base_problems.broadcast("update", CHANGED)
+        second = _pha(CHANGED).iterate(base_problems)
+
+    for cfg, result in ((CFG, first), (CHANGED, second)):
+        optimum = Extensive(cfg, backend=BACKEND).solve().z_star
+        assert result.z_star == pytest.approx(optimum, rel=1e-3)
+    assert first.z_star == pytest.approx(_pha(CFG).solve().z_star)
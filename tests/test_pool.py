@@ -0,0 +1,45 @@
+"""
+Tests of the pool of worker processes that own a shard of problems.
+"""
+
+import pytest
+
+from farmer.solver.pool import ShardPool, split
+
+
+class Problem:
+    """
+    Problem is a picklable problem that fails on negative arguments.
+    """
+
+    def __init__(self, item: int):
+        self.item = item
+
+    def scale(self, factor: int) -> int:
+        if factor < 0:
+            raise ValueError(f"{self.item} got {factor}")
+        return self.item * factor
+
+
+def test_split():
+    assert split(range(5), 2) == [[0, 1], [2, 3, 4]]
+    assert split(range(2), 4) == [[0], [1]]
+    assert split([], 3) == [[]]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_scatter(workers: int):
+    with ShardPool(Problem, range(5), workers) as pool:
+        assert pool.broadcast("scale", 2) == [0, 2, 4, 6, 8]
+        squares = pool.scatter("scale", [(i,) for i in range(5)])
+        assert squares == [0, 1, 4, 9, 16]
+
+
+def test_error_drains_every_worker():
+    with ShardPool(Problem, range(6), 3) as pool:
+        # the first and last workers fail and the first error is raised
+        with pytest.raises(ValueError, match="0 got -1"):
+            pool.scatter("scale", [(-1,), (1,), (1,), (1,), (1,), (-1,)])
+
+        # the next call reads its own replies
+        assert pool.broadcast("scale", 3) == [0, 3, 6, 9, 12, 15]
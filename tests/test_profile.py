@@ -0,0 +1,98 @@
+"""
+Tests of the profile of the solvers phases and engines work.
+"""
+
+import math
+import pickle
+
+import pytest
+
+from farmer.backend import Work
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.pha import PHA, Parameters as PHAParameters
+from farmer.solver import Profile
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2])
+
+
+def test_phase():
+    calls = []
+    profile = Profile(lambda name, elapsed, _: calls.append((name, elapsed)))
+    for _ in range(3):
+        with profile.phase("master"):
+            pass
+    with pytest.raises(RuntimeError):
+        with profile.phase("cuts"):
+            raise RuntimeError
+
+    # a phase that raises is still timed
+    assert profile.counts == {"master": 3, "cuts": 1}
+    assert [name for name, _ in calls] == ["master"] * 3 + ["cuts"]
+    assert profile.times["master"] == pytest.approx(
+        sum(elapsed for name, elapsed in calls if name == "master")
+    )
+
+
+def test_gap():
+    profile = Profile()
+    assert profile.gap == math.inf
+
+    profile.bounds(-110, -100)
+    assert profile.gap == pytest.approx(0.1)
+    profile.bounds(-0.5, 0.5)
+    assert profile.gap == 1
+
+
+def test_pickle():
+    profile = Profile(lambda *_: None)
+    with profile.phase("build"):
+        pass
+    profile.work = Work(2, 10, 0)
+
+    # hooks are dropped and the measures are kept
+    copy = pickle.loads(pickle.dumps(profile))
+    assert copy.hook is None
+    assert copy.counts == {"build": 1}
+    assert copy.work == Work(2, 10, 0)
+
+
+@pytest.mark.parametrize(
+    "solver, phases",
+    [
+        (
+            Benders(CFG, epsilon=1e-3, backend=BACKEND),
+            {"build", "master", "sub_problems", "cuts"},
+        ),
+        (
+            PHA(
+                CFG,
+                PHAParameters(1e-3, lambda rou: min(1.1 * rou, 100), gap=1e-3),
+                backend=BACKEND,
+            ),
+            {"build", "base_problems", "update"},
+        ),
+    ],
+)
+def test_solver_profile(solver, phases):
+    optimum = Extensive(CFG, backend=BACKEND).solve().z_star
+    result = solver.solve()
+    profile = result.profile
+
+    assert profile is solver.profile
+    assert phases <= set(profile.times)
+    assert profile.counts["build"] == 1
+    assert profile.work.calls > 0
+    assert profile.work.simplex_iterations > 0
+    assert profile.lower_bound <= optimum + 1e-6
+    assert profile.upper_bound == pytest.approx(result.z_star)
+
+
+def test_extensive_profile():
+    result = Extensive(CFG, backend=BACKEND).solve()
+
+    assert result.profile.work.calls == 1
+    assert result.profile.lower_bound == result.profile.upper_bound
+    assert result.profile.gap == 0
@@ -0,0 +1,113 @@
+"""
+Tests of the recorder of the solvers iterations.
+"""
+
+import csv
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.solver import CSVWriter, Recorder, crop_columns
+
+BACKEND = "highs"
+
+
+def _rows(count: int):
+    return [{"k": k, "z": 10.0 * k} for k in range(count)]
+
+
+def test_crop_columns():
+    assert crop_columns("x", [1, 2.5]) == {"x_1": 1.0, "x_2": 2.5}
+
+
+def test_growing_columns():
+    recorder = Recorder()
+    for row in _rows(100):
+        recorder.record(row)
+
+    columns = recorder.columns()
+    assert len(recorder) == 100
+    assert list(columns) == ["k", "z"]
+    np.testing.assert_array_equal(columns["k"], np.arange(100))
+    np.testing.assert_array_equal(columns["z"], 10 * np.arange(100))
+
+
+def test_missing_values():
+    recorder = Recorder()
+    recorder.record({"k": 0, "radius": None})
+    recorder.record({"k": 1, "other": 3.0})
+
+    columns = recorder.columns()
+    assert list(columns) == ["k", "radius"]
+    assert np.isnan(columns["radius"]).all()
+
+
+@pytest.mark.parametrize("count", [0, 3, 5, 12])
+def test_ring(count: int):
+    recorder = Recorder(capacity=5)
+    for row in _rows(count):
+        recorder.record(row)
+
+    assert len(recorder) == min(count, 5)
+    np.testing.assert_array_equal(
+        recorder.columns()["k"] if count else [],
+        np.arange(max(count - 5, 0), count),
+    )
+
+
+def test_callbacks():
+    rows = []
+    recorder = Recorder(capacity=0, callbacks=[rows.append])
+    for row in _rows(3):
+        recorder.record(row)
+
+    # zero capacity keeps nothing but still calls the callbacks
+    assert rows == _rows(3)
+    assert len(recorder) == 0
+    assert recorder.columns()["k"].shape == (0,)
+
+
+def test_disabled():
+    rows = []
+    recorder = Recorder(callbacks=[rows.append], enabled=False)
+    for row in _rows(3):
+        recorder.record(row)
+
+    assert rows == []
+    assert len(recorder) == 0
+    assert recorder.columns() == {}
+
+
+def test_csv_writer(tmp_path):
+    path = tmp_path / "rows.csv"
+    with CSVWriter(str(path)) as writer:
+        writer({"k": 0, "z": 1.5})
+        # the file is readable during the run
+        with open(path) as file:
+            assert list(csv.DictReader(file)) == [{"k": "0", "z": "1.5"}]
+        writer({"k": 1, "z": 2.5, "other": 1})
+
+    with open(path) as file:
+        assert list(csv.DictReader(file)) == [
+            {"k": "0", "z": "1.5"},
+            {"k": "1", "z": "2.5"},
+        ]
+
+
+def test_solver_rows():
+    rows = []
+    recorder = Recorder(callbacks=[rows.append])
+    benders = Benders(
+        Config(scenarios=[0.2, 0, -0.2]),
+        epsilon=1e-3,
+        backend=BACKEND,
+        recorder=recorder,
+    )
+    benders.solve()
+
+    columns = recorder.columns()
+    assert len(rows) == len(recorder) > 0
+    np.testing.assert_array_equal(columns["k"], [row["k"] for row in rows])
+    assert {"x_1", "x_2", "x_3", "z_lb"} <= set(columns)
@@ -0,0 +1,125 @@
+"""
+Tests of the scenario reduction and the scenario probabilities.
+"""
+
+import itertools
+
+import numpy as np
+import pytest
+import scipy.spatial.distance as distance
+
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.reduction import (
+    backward_reduction,
+    forward_selection,
+    merge_duplicates,
+)
+
+REDUCTIONS = [forward_selection, backward_reduction]
+
+
+def _sampled(size: int = 12) -> Config:
+    rng = np.random.default_rng(0)
+    return Config(
+        scenarios=rng.uniform(-0.3, 0.3, (size, 3)).tolist(),
+        probabilities=rng.dirichlet(np.ones(size)).tolist(),
+    )
+
+
+def _distance(cfg: Config, kept: np.ndarray) -> float:
+    # kantorovich distance of moving every scenario to its closest kept one
+    distances = distance.cdist(cfg.deviations(), cfg.deviations()[kept])
+    return float(cfg.scenario_probabilities() @ distances.min(axis=1))
+
+
+def test_probabilities():
+    assert Config(scenarios=[0.2, 0, -0.2]).scenario_probabilities() == (
+        pytest.approx([1 / 3] * 3)
+    )
+    for probabilities in ([0.5, 0.5], [0.5, 0.6, -0.1], [0.5, 0.3, 0.3]):
+        with pytest.raises(ValueError):
+            Config(
+                scenarios=[0.2, 0, -0.2], probabilities=probabilities
+            ).scenario_probabilities()
+    with pytest.raises(ValueError):
+        Config().scenario_probabilities()
+
+
+def test_merge_duplicates():
+    cfg = Config(
+        scenarios=[0.2, 0, 0.2, -0.2, 0],
+        probabilities=[0.1, 0.2, 0.3, 0.15, 0.25],
+    )
+    reduction = merge_duplicates(cfg)
+
+    assert list(reduction.cfg.scenarios) == [0.2, 0, -0.2]
+    assert list(reduction.cfg.probabilities) == pytest.approx(
+        [0.4, 0.45, 0.15]
+    )
+    assert list(reduction.representatives) == [0, 1, 3]
+    assert reduction.distance == 0
+
+
+@pytest.mark.parametrize("reduce", REDUCTIONS)
+def test_reduction(reduce):
+    cfg = _sampled()
+    reduction = reduce(cfg, 4)
+
+    assert len(reduction.cfg.scenarios) == 4
+    assert reduction.cfg.scenario_probabilities().sum() == pytest.approx(1)
+    np.testing.assert_array_equal(
+        reduction.cfg.deviations(),
+        cfg.deviations()[reduction.representatives],
+    )
+    assert reduction.distance == pytest.approx(
+        _distance(cfg, reduction.representatives)
+    )
+
+    # probabilities are moved to the closest kept scenario
+    closest = distance.cdist(
+        cfg.deviations(), reduction.cfg.deviations()
+    ).argmin(axis=1)
+    np.testing.assert_allclose(
+        reduction.cfg.probabilities,
+        np.bincount(closest, weights=cfg.scenario_probabilities()),
+    )
+
+
+@pytest.mark.parametrize("reduce", REDUCTIONS)
+def test_reduction_is_greedy_optimal(reduce):
+    # keeping one scenario with forward selection and removing one with
+    # backward reduction are the best reductions of their size
+    cfg = _sampled()
+    size = len(cfg.scenarios)
+    count = 1 if reduce is forward_selection else size - 1
+
+    best = min(
+        _distance(cfg, np.array(kept))
+        for kept in itertools.combinations(range(size), count)
+    )
+    assert reduce(cfg, count).distance == pytest.approx(best)
+
+
+@pytest.mark.parametrize("reduce", REDUCTIONS)
+def test_tolerance(reduce):
+    cfg = _sampled()
+    everything = reduce(cfg, len(cfg.scenarios))
+    assert everything.distance == 0
+    assert len(everything.cfg.scenarios) == len(cfg.scenarios)
+
+    # forward selection adds scenarios up to count and backward reduction
+    # removes them down to count while the distance is within tolerance
+    count = None if reduce is forward_selection else 1
+    reduction = reduce(cfg, count, tolerance=0.05)
+    assert reduction.distance <= 0.05
+    assert len(reduction.cfg.scenarios) > 1
+
+
+def test_reduced_optimal_value():
+    cfg = _sampled(40)
+    optimum = Extensive(cfg, backend="highs").solve().z_star
+    reduction = forward_selection(cfg, 10)
+    reduced = Extensive(reduction.cfg, backend="highs").solve().z_star
+
+    assert reduced == pytest.approx(optimum, rel=0.05)
@@ -0,0 +1,109 @@
+"""
+Tests of the sample average approximation and its scenario generators.
+"""
+
+import math
+
+import numpy as np
+import pytest
+
+from farmer.benders import Benders
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.lagrange import Lagrange, Parameters
+from farmer.saa import SAA, NormalYields
+from farmer.saa.saa import _project
+from farmer.solver import Solver
+
+BACKEND = "highs"
+
+
+def _benders(cfg: Config) -> Solver:
+    return Benders(cfg, epsilon=1e-3, recourse="oracle", backend=BACKEND)
+
+
+def _lagrange(cfg: Config) -> Solver:
+    return Lagrange(
+        cfg,
+        Parameters(-math.inf, 0, 4, 1000),
+        recourse="parametric",
+        backend=BACKEND,
+        strategy="level",
+    )
+
+
+def _saa(solver) -> SAA:
+    return SAA(Config(), NormalYields(), solver, 5, 10 * 1000)
+
+
+@pytest.mark.parametrize(
+    "x, expected",
+    [
+        ((100, 200, 100), (100, 200, 100)),
+        ((-10, 200, 100), (0, 200, 100)),
+        ((500, 84, 294), (353, 0, 147)),
+        ((600, 0, 0), (500, 0, 0)),
+    ],
+)
+def test_project(x, expected):
+    np.testing.assert_allclose(_project(x, 500), expected)
+
+
+def test_normal_yields():
+    generator = NormalYields(
+        mean=(0.0, 0.1, 0.0),
+        std=(0.1, 0.2, 2.0),
+        correlation=((1.0, 0.8, 0.0), (0.8, 1.0, 0.0), (0.0, 0.0, 1.0)),
+    )
+    draws = generator.sample(100 * 1000, np.random.default_rng(0))
+
+    assert draws.shape == (100 * 1000, 3)
+    assert draws.min() == -1
+    np.testing.assert_allclose(draws[:, :2].mean(axis=0), (0, 0.1), atol=0.01)
+    np.testing.assert_allclose(draws[:, :2].std(axis=0), (0.1, 0.2), rtol=0.01)
+    assert math.isclose(
+        np.corrcoef(draws[:, 0], draws[:, 1])[0, 1], 0.8, abs_tol=0.01
+    )
+
+
+def test_correlated_deviations():
+    # deviations that are equal for all crops are the scalar scenarios
+    scalar = Config(scenarios=[0.2, 0, -0.2])
+    rows = Config(scenarios=[[0.2] * 3, [0] * 3, [-0.2] * 3])
+
+    np.testing.assert_array_equal(scalar.deviations(), rows.deviations())
+    assert scalar.recourse_digest() == rows.recourse_digest()
+    with pytest.raises(ValueError):
+        Config(scenarios=[[0.2, 0.1]]).deviations()
+
+    cfg = Config(scenarios=[[0.2, -0.2, 0], [-0.2, 0.2, 0]])
+    assert Extensive(cfg, backend=BACKEND).solve().z_star == pytest.approx(
+        _benders(cfg).solve().z_star, rel=1e-3
+    )
+
+
+def test_solve():
+    bounds = _saa(_benders).solve(50)
+
+    assert sum(bounds.x) <= 500 + 1e-6
+    assert bounds.lower.lower < bounds.lower.mean < bounds.lower.upper
+    assert 0 <= bounds.gap <= 0.05 * abs(bounds.upper.mean)
+
+
+def test_solve_lower_bound_solutions():
+    # lagrange solutions of the sub-problems plant more than the area
+    results = _saa(_lagrange).replicate(50)
+    assert max(sum(result.x) for result in results) > 500
+
+    bounds = _saa(_lagrange).solve(50)
+    assert sum(bounds.x) <= 500 + 1e-6
+    assert bounds.gap >= 0
+
+
+def test_select():
+    saa = _saa(_benders)
+    bounds = saa.select([100, 20], gap=1)
+    assert bounds.size == 20
+
+    bounds = saa.select([20, 40], gap=0)
+    assert bounds.size == 40
@@ -0,0 +1,156 @@
+"""
+Tests of the local solve service.
+"""
+
+import asyncio
+import dataclasses
+import json
+import socket
+
+import numpy as np
+import pytest
+
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.service import Job, Service, serve
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2])
+BENDERS = {"epsilon": 1e-4, "recourse": "oracle"}
+
+
+def _run(test, **options):
+    async def main():
+        async with Service(backend=BACKEND, **options) as service:
+            return await test(service)
+
+    return asyncio.run(main())
+
+
+def test_solve():
+    cfgs = [dataclasses.replace(CFG, area=area) for area in (500, 450)]
+
+    async def test(service: Service):
+        first = await service.solve(Job("benders", cfgs[0], BENDERS))
+        second = await service.solve(Job("benders", cfgs[1], BENDERS))
+        return first, second
+
+    results = _run(test, workers=1)
+
+    for cfg, result in zip(cfgs, results):
+        assert result["type"] == "result"
+        optimum = Extensive(cfg, backend=BACKEND).solve().z_star
+        assert result["z_star"] == pytest.approx(optimum, rel=1e-3)
+    # the second job only updates the area of the first models
+    assert [result["warm"] for result in results] == [False, True]
+
+
+def test_batch():
+    cfgs = [CFG, CFG, dataclasses.replace(CFG, area=450)]
+
+    async def test(service: Service):
+        return await asyncio.gather(
+            *(service.solve(Job("benders", cfg, BENDERS)) for cfg in cfgs)
+        )
+
+    results = _run(test, workers=2, delay=0.5)
+
+    # jobs of the same recourse are batched and equal ones are solved once
+    assert [result["batch"] for result in results] == [2, 2, 2]
+    assert results[0]["z_star"] == results[1]["z_star"]
+
+
+def test_failed_job():
+    async def test(service: Service):
+        failed = await service.solve(Job("unknown", CFG))
+        solved = await service.solve(Job("benders", CFG, BENDERS))
+        return failed, solved
+
+    failed, solved = _run(test, workers=1)
+
+    assert failed["type"] == "error"
+    assert solved["type"] == "result"
+
+
+def test_worker_death():
+    # a job that takes many iterations so its worker is killed while
+    # it is solving
+    scenarios = np.linspace(-0.3, 0.3, 50).tolist()
+    long = Job(
+        "pha",
+        Config(scenarios=scenarios),
+        {"epsilon": 1e-12, "max_iterations": 100 * 1000},
+    )
+
+    async def test(service: Service):
+        messages = []
+        async for message in service.submit(long):
+            messages.append(message)
+            if len(messages) == 1:
+                service.processes[0].kill()
+        solved = await service.solve(Job("benders", CFG, BENDERS))
+        return messages, solved, service.load
+
+    messages, solved, load = _run(test, workers=1)
+
+    assert messages[0]["type"] == "progress"
+    assert messages[-1] == {
+        "type": "error",
+        "error": "the worker process died",
+    }
+    # the worker is replaced by a new one
+    assert solved["type"] == "result"
+    assert solved["warm"] is False
+    assert load == [0]
+
+
+def _port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def test_serve():
+    port = _port()
+    lines = [
+        b"[1]\n",
+        b"3\n",
+        b"not json\n",
+        b'{"id": 1, "config": {}}\n',
+        b'{"id": 2, "method": "benders", "config": [1]}\n',
+        json.dumps(
+            {
+                "id": 3,
+                "method": "benders",
+                "config": {"scenarios": CFG.scenarios},
+                "options": BENDERS,
+            }
+        ).encode()
+        + b"\n",
+    ]
+
+    async def test(service: Service):
+        server = asyncio.ensure_future(serve(service, port=port))
+        await asyncio.sleep(0.5)
+        reader, writer = await asyncio.open_connection("127.0.0.1", port)
+        for line in lines:
+            writer.write(line)
+        writer.write_eof()
+
+        messages = []
+        while True:
+            line = await reader.readline()
+            if not line:
+                break
+            messages.append(json.loads(line))
+        writer.close()
+        server.cancel()
+        return messages
+
+    messages = _run(test, workers=1)
+
+    # every line that is not a job gets an error line
+    errors = [message for message in messages if message["type"] == "error"]
+    assert [message["id"] for message in errors] == [None, None, None, 1, 2]
+    assert messages[-1]["id"] == 3
+    assert messages[-1]["type"] == "result"
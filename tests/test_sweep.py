@@ -0,0 +1,83 @@
+"""
+Tests of the parametric sweeps.
+"""
+
+import numpy as np
+import pytest
+
+from farmer.config import Config
+from farmer.extensive import Extensive
+from farmer.sweep import Sweep, apply, first_stage, order
+
+BACKEND = "highs"
+CFG = Config(scenarios=[0.2, 0, -0.2])
+
+
+def test_first_stage():
+    assert first_stage("area")
+    assert first_stage("beet.plant_cost")
+    assert not first_stage("wheat.sell_price")
+    assert not first_stage("package")
+
+
+def test_apply():
+    cfg = apply(
+        CFG, {"area": 400, "wheat.plant_cost": 100, "wheat.produce_rate": 3}
+    )
+
+    assert cfg.area == 400
+    assert (cfg.wheat.plant_cost, cfg.wheat.produce_rate) == (100, 3)
+    assert cfg.corn == CFG.corn
+
+    crops = apply(
+        Config(scenarios=CFG.scenarios, crops=CFG.crop_arrays()),
+        {"corn.plant_cost": 100},
+    )
+    np.testing.assert_array_equal(
+        crops.crop_arrays().plant_cost, [150, 100, 260]
+    )
+
+
+def test_order():
+    cfgs = [apply(CFG, {"area": area}) for area in (500, 300, 450, 350)]
+    assert order(cfgs) == [0, 2, 3, 1]
+
+
+def test_groups():
+    grid = [
+        {"area": 400},
+        {"wheat.sell_price": 200},
+        {"area": 300},
+        {"wheat.sell_price": 200, "corn.plant_cost": 200},
+    ]
+    groups = Sweep(CFG, grid, backend=BACKEND).groups()
+
+    assert [[index for index, _ in points] for points in groups] == [
+        [0, 2],
+        [1, 3],
+    ]
+
+
+@pytest.mark.parametrize("workers", [0, 2])
+def test_solve(workers: int):
+    grid = [
+        {"area": area, "wheat.sell_price": price}
+        for area in (400, 500)
+        for price in (170, 200)
+    ] + [{"beet.plant_cost": 300}]
+    table = Sweep(
+        CFG, grid, workers, epsilon=1e-4, backend=BACKEND, recourse="oracle"
+    ).solve()
+
+    np.testing.assert_array_equal(table["point"], np.arange(len(grid)))
+    np.testing.assert_array_equal(table["area"][:4], [400, 400, 500, 500])
+    # the changes that a point does not have are NaN
+    assert np.isnan(table["area"][4])
+    assert table["beet.plant_cost"][4] == 300
+    for index, delta in enumerate(grid):
+        optimum = Extensive(apply(CFG, delta), backend=BACKEND).solve().z_star
+        assert table["z_star"][index] == pytest.approx(optimum, rel=1e-3)
+
+    # points of a group after the first one reuse its model
+    np.testing.assert_array_equal(table["build_time"][2:4], 0)
+    assert (table["build_time"][[0, 1, 4]] > 0).all()